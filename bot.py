@@ -5,6 +5,10 @@ import logging
 from dotenv import load_dotenv
 from utils.database import Database
 from utils.config import Config
+from utils.config_watcher import ConfigWatcher
+from utils.guild_settings import GuildSettingsStore
+from utils.role_queue import RoleMutationQueue
+from utils.auto_role_queue import AutoRoleQueue
 
 # .env 파일 로드
 load_dotenv()
@@ -30,18 +34,31 @@ class DiscordBot(commands.Bot):
             help_command=None  # 기본 help 명령어 비활성화
         )
         self.db = Database()
-        self.config = Config()
+        # Kubernetes에서는 ConfigMap 디렉터리에 마운트된 파일 경로를 CONFIG_PATH로 지정
+        self.config = Config(os.getenv('CONFIG_PATH', 'data/config.json'))
+        # ConfigMap이 바뀌면 재시작 없이 바뀐 설정만 반영
+        self.config_watcher = ConfigWatcher(self.config, interval=5.0)
+        # 서버별 설정 (환영 메시지, 레벨링, 뉴스/주식 스케줄, 주식 알림)은 SQLite에 저장
+        self.guild_settings = GuildSettingsStore(self.db, self.config)
+        # 멤버 역할 변경 요청 병합 큐 (반응 역할, /role, 자동 역할 공용)
+        self.role_queue = RoleMutationQueue(window=1.0)
+        # 신규 멤버 자동 역할 대기열 (종료 시 역할 변경 큐보다 먼저 비움)
+        self.auto_roles = AutoRoleQueue(self.db, self.role_queue)
 
     async def setup_hook(self):
         """봇 시작 시 초기화"""
         logger.info('데이터베이스 초기화 중...')
         await self.db.setup()
+        # 이전 버전의 config.json에 남아 있는 서버별 설정을 한 번만 DB로 옮김
+        await self.guild_settings.import_from_config()
+        self.config_watcher.start()
 
         logger.info('Cogs 로딩 중...')
         cogs = [
             'cogs.welcome',
             'cogs.moderation',
             'cogs.roles',
+            'cogs.role_panels',
             'cogs.utility',
             'cogs.leveling',
             'cogs.news',
@@ -78,6 +95,18 @@ class DiscordBot(commands.Bot):
 
         logger.info('봇이 정상적으로 시작되었습니다.')
 
+    async def close(self):
+        """봇 종료 시 리소스 정리"""
+        # 자동 역할 대기열을 역할 변경 큐로 넘긴 뒤 대기 중인 역할 변경을 모두 처리
+        await self.auto_roles.close()
+        await self.role_queue.close()
+        self.config_watcher.close()
+        await super().close()
+        logger.info('설정 파일 저장 중...')
+        await self.config.close()
+        logger.info('데이터베이스 연결 종료 중...')
+        await self.db.close()
+
     async def on_command_error(self, ctx, error):
         """명령어 오류 처리"""
         if isinstance(error, commands.CommandNotFound):
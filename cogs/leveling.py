@@ -1,17 +1,83 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, timedelta
 import logging
+from utils.cooldown import CooldownTracker
+from utils.leaderboard_cache import LeaderboardCache
+from utils.level_announcer import LevelUpAnnouncer
 
 logger = logging.getLogger(__name__)
 
+class LeaderboardView(discord.ui.View):
+    """순위표 이전/다음 페이지 버튼 (캐시된 스냅샷에서 페이지 조회)"""
+
+    def __init__(self, cog, guild: discord.Guild, requester: discord.abc.User, page: int, total_pages: int):
+        super().__init__(timeout=120)
+        self.cog = cog
+        self.guild = guild
+        self.requester = requester
+        self.page = page
+        self.total_pages = total_pages
+        self.message = None
+        self._update_buttons()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """순위표를 연 사용자만 페이지 이동 가능"""
+        if interaction.user.id != self.requester.id:
+            await interaction.response.send_message('❌ 순위표를 연 사용자만 페이지를 넘길 수 있습니다. `/leaderboard`를 사용해주세요.', ephemeral=True)
+            return False
+        return True
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page <= 1
+        self.next_page.disabled = self.page >= self.total_pages
+
+    async def _show_page(self, interaction: discord.Interaction, page: int):
+        embed, total_pages = await self.cog.build_leaderboard_embed(self.guild, page, self.requester)
+        if embed is None:
+            await interaction.response.send_message('❌ 해당 페이지에 데이터가 없습니다.', ephemeral=True)
+            return
+
+        self.page = page
+        self.total_pages = total_pages
+        self._update_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ 이전", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="다음 ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
         self.config = bot.config
-        self.last_message_times = {}  # 쿨다운 관리
+        self.guild_settings = bot.guild_settings
+        self.cooldowns = CooldownTracker(max_entries=100000)  # XP 쿨다운 관리
+
+        # 순위표 스냅샷 캐시 (XP 기록 시 해당 서버만 무효화, 10초 이내에 만든 스냅샷은 유지)
+        self.leaderboard_cache = LeaderboardCache(self.db, ttl=30.0, page_size=10)
+        self.db.add_xp_flush_listener(self.leaderboard_cache.invalidate)
+
+        # 채널별 레벨업 알림 (한가하면 바로 전송, 전송 직후 2초 동안 몰린 알림은 합치고 rate limit에 걸리면 최대 5초까지 늘림)
+        self.announcer = LevelUpAnnouncer(window=2.0, max_interval=5.0, max_pending=20)
+
+    def cog_unload(self):
+        self.db.remove_xp_flush_listener(self.leaderboard_cache.invalidate)
+        self.announcer.close()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -20,45 +86,32 @@ class Leveling(commands.Cog):
         if message.author.bot or not message.guild:
             return
 
+        # 서버별 레벨링 설정 스냅샷
+        settings = await self.guild_settings.leveling_settings(message.guild.id)
+
         # 레벨링 시스템이 비활성화되어 있으면 무시
-        if not self.config.get('leveling', 'enabled', default=True):
+        if not settings.enabled:
             return
 
-        # 쿨다운 확인
+        # 쿨다운 확인 (통과 시 현재 시각 기록)
         user_key = (message.guild.id, message.author.id)
-        cooldown = self.config.get('leveling', 'xp_cooldown', default=60)
-
-        if user_key in self.last_message_times:
-            time_diff = (datetime.now() - self.last_message_times[user_key]).total_seconds()
-            if time_diff < cooldown:
-                return
+        if not self.cooldowns.hit(user_key, settings.xp_cooldown):
+            return
 
         # XP 부여
-        xp_amount = self.config.get('leveling', 'xp_per_message', default=10)
-        new_level = await self.db.add_xp(message.guild.id, message.author.id, xp_amount)
-
-        # 마지막 메시지 시간 업데이트
-        self.last_message_times[user_key] = datetime.now()
+        new_level = await self.db.add_xp(message.guild.id, message.author.id, settings.xp_per_message)
 
         # 레벨업 알림
         if new_level is not None:
-            if self.config.get('leveling', 'announce_level_up', default=True):
-                level_up_msg = self.config.get(
-                    'leveling',
-                    'level_up_message',
-                    default='🎊 {mention}님이 레벨 {level}에 도달했습니다!'
-                )
-                level_up_msg = level_up_msg.format(
+            if settings.announce_level_up:
+                level_up_msg = settings.level_up_message.format(
                     mention=message.author.mention,
                     name=message.author.name,
                     level=new_level
                 )
 
-                try:
-                    await message.channel.send(level_up_msg, delete_after=10)
-                    logger.info(f'{message.author.name}이(가) 레벨 {new_level}에 도달')
-                except Exception as e:
-                    logger.error(f'레벨업 메시지 전송 오류: {e}')
+                self.announcer.announce(message.channel, level_up_msg, priority=new_level)
+                logger.info(f'{message.author.name}이(가) 레벨 {new_level}에 도달')
 
     @app_commands.command(name="rank", description="자신 또는 다른 사용자의 레벨을 확인합니다")
     @app_commands.describe(member="레벨을 확인할 멤버 (선택사항)")
@@ -68,7 +121,7 @@ class Leveling(commands.Cog):
             member = interaction.user
 
         try:
-            user_data = await self.db.get_user_level(interaction.guild.id, member.id)
+            user_data = await self.db.get_user_level_with_rank(interaction.guild.id, member.id)
 
             if not user_data:
                 await interaction.response.send_message(
@@ -77,14 +130,10 @@ class Leveling(commands.Cog):
                 )
                 return
 
-            xp, level, total_messages = user_data
-            rank = await self.db.get_user_rank(interaction.guild.id, member.id)
+            xp, level, total_messages, rank = user_data
 
             # 다음 레벨까지 필요한 XP
-            next_level_xp = self._xp_for_level(level + 1)
-            current_level_xp = self._xp_for_level(level)
-            xp_progress = xp - current_level_xp
-            xp_needed = next_level_xp - current_level_xp
+            xp_progress, xp_needed = self.db.curve.progress(xp, level)
 
             # 진행률 바
             progress = int((xp_progress / xp_needed) * 20)
@@ -118,9 +167,46 @@ class Leveling(commands.Cog):
             await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
             logger.error(f'레벨 조회 오류: {e}')
 
-    def _xp_for_level(self, level: int) -> int:
-        """특정 레벨에 도달하기 위한 총 XP"""
-        return 5 * (level ** 2) + 50 * level + 100
+    async def build_leaderboard_embed(self, guild: discord.Guild, page: int, requester: discord.abc.User):
+        """순위표 페이지 임베드 생성 ((임베드, 전체 페이지 수), 데이터가 없으면 임베드는 None)"""
+        limit = self.leaderboard_cache.page_size
+        page_data, total_count = await self.leaderboard_cache.get_page(guild.id, page)
+        total_pages = (total_count + limit - 1) // limit
+
+        if not page_data:
+            return None, total_pages
+
+        offset = (page - 1) * limit
+
+        embed = discord.Embed(
+            title=f"🏆 {guild.name} 레벨 순위표",
+            description=f"페이지 {page}",
+            color=discord.Color.gold()
+        )
+
+        leaderboard_text = ""
+        for idx, (user_id, xp, level, total_messages) in enumerate(page_data, start=offset + 1):
+            member = guild.get_member(user_id)
+            if member:
+                # 메달 이모지
+                medal = ""
+                if idx == 1:
+                    medal = "🥇"
+                elif idx == 2:
+                    medal = "🥈"
+                elif idx == 3:
+                    medal = "🥉"
+                else:
+                    medal = f"**{idx}.**"
+
+                leaderboard_text += f"{medal} {member.name} - 레벨 **{level}** (XP: {xp:,})\n"
+
+        embed.description = leaderboard_text if leaderboard_text else "데이터가 없습니다."
+
+        embed.set_footer(text=f"페이지 {page}/{total_pages} • 요청자: {requester.name}")
+        embed.timestamp = discord.utils.utcnow()
+
+        return embed, total_pages
 
     @app_commands.command(name="leaderboard", description="서버 레벨 순위표를 확인합니다")
     @app_commands.describe(page="페이지 번호 (1페이지당 10명)")
@@ -131,53 +217,19 @@ class Leveling(commands.Cog):
             return
 
         try:
-            limit = 10
-            offset = (page - 1) * limit
-
-            # 전체 데이터를 가져와서 오프셋 적용
-            all_data = await self.db.get_leaderboard(interaction.guild.id, limit=1000)
+            embed, total_pages = await self.build_leaderboard_embed(interaction.guild, page, interaction.user)
 
-            if not all_data:
+            if not total_pages:
                 await interaction.response.send_message('아직 레벨 데이터가 없습니다.', ephemeral=True)
                 return
 
-            # 페이지네이션
-            page_data = all_data[offset:offset + limit]
-
-            if not page_data:
+            if embed is None:
                 await interaction.response.send_message('❌ 해당 페이지에 데이터가 없습니다.', ephemeral=True)
                 return
 
-            embed = discord.Embed(
-                title=f"🏆 {interaction.guild.name} 레벨 순위표",
-                description=f"페이지 {page}",
-                color=discord.Color.gold()
-            )
-
-            leaderboard_text = ""
-            for idx, (user_id, xp, level, total_messages) in enumerate(page_data, start=offset + 1):
-                member = interaction.guild.get_member(user_id)
-                if member:
-                    # 메달 이모지
-                    medal = ""
-                    if idx == 1:
-                        medal = "🥇"
-                    elif idx == 2:
-                        medal = "🥈"
-                    elif idx == 3:
-                        medal = "🥉"
-                    else:
-                        medal = f"**{idx}.**"
-
-                    leaderboard_text += f"{medal} {member.name} - 레벨 **{level}** (XP: {xp:,})\n"
-
-            embed.description = leaderboard_text if leaderboard_text else "데이터가 없습니다."
-
-            total_pages = (len(all_data) + limit - 1) // limit
-            embed.set_footer(text=f"페이지 {page}/{total_pages} • 요청자: {interaction.user.name}")
-            embed.timestamp = discord.utils.utcnow()
-
-            await interaction.response.send_message(embed=embed)
+            view = LeaderboardView(self, interaction.guild, interaction.user, page, total_pages)
+            await interaction.response.send_message(embed=embed, view=view)
+            view.message = await interaction.original_response()
 
         except Exception as e:
             await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
@@ -197,19 +249,11 @@ class Leveling(commands.Cog):
 
         try:
             # 해당 레벨에 필요한 XP 계산
-            required_xp = self._xp_for_level(level)
-
-            # 데이터베이스 직접 업데이트
-            await self.db.add_xp(member.guild.id, member.id, 0)  # 초기화
-            # XP 설정을 위해 직접 SQL 실행
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as db:
-                await db.execute('''
-                    UPDATE user_levels
-                    SET xp = ?, level = ?
-                    WHERE guild_id = ? AND user_id = ?
-                ''', (required_xp, level, interaction.guild.id, member.id))
-                await db.commit()
+            required_xp = self.db.curve.xp_for_level(level)
+
+            await self.db.set_user_level(interaction.guild.id, member.id, required_xp, level)
+            # 관리자 변경은 바로 순위표에 반영
+            self.leaderboard_cache.invalidate([interaction.guild.id], force=True)
 
             embed = discord.Embed(
                 title="✅ 레벨 설정",
@@ -226,5 +270,57 @@ class Leveling(commands.Cog):
             await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
             logger.error(f'레벨 설정 오류: {e}')
 
+    @app_commands.command(name="levelsettings", description="이 서버의 레벨링 설정을 변경합니다 (관리자 전용)")
+    @app_commands.describe(
+        enabled="레벨링 사용 여부",
+        xp_per_message="메시지당 XP",
+        xp_cooldown="XP 획득 쿨다운 (초)",
+        announce_level_up="레벨업 알림 여부"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def levelsettings(
+        self,
+        interaction: discord.Interaction,
+        enabled: bool = None,
+        xp_per_message: int = None,
+        xp_cooldown: int = None,
+        announce_level_up: bool = None
+    ):
+        """서버별 레벨링 설정"""
+        updates = {}
+
+        if enabled is not None:
+            updates['enabled'] = enabled
+        if xp_per_message is not None:
+            if xp_per_message < 0:
+                await interaction.response.send_message('❌ 메시지당 XP는 0 이상이어야 합니다.', ephemeral=True)
+                return
+            updates['xp_per_message'] = xp_per_message
+        if xp_cooldown is not None:
+            if xp_cooldown < 0:
+                await interaction.response.send_message('❌ 쿨다운은 0초 이상이어야 합니다.', ephemeral=True)
+                return
+            updates['xp_cooldown'] = xp_cooldown
+        if announce_level_up is not None:
+            updates['announce_level_up'] = announce_level_up
+
+        if not updates:
+            await interaction.response.send_message('❌ 변경할 설정을 하나 이상 입력해주세요.', ephemeral=True)
+            return
+
+        await self.guild_settings.set_leveling(interaction.guild.id, **updates)
+
+        embed = discord.Embed(
+            title="✅ 레벨링 설정 완료",
+            description="이 서버의 레벨링 설정이 업데이트되었습니다.",
+            color=discord.Color.green()
+        )
+
+        for key, value in updates.items():
+            embed.add_field(name=key, value=str(value), inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        logger.info(f'{interaction.user.name}이(가) 레벨링 설정 변경: {updates}')
+
 async def setup(bot):
     await bot.add_cog(Leveling(bot))
@@ -6,6 +6,7 @@ import feedparser
 from datetime import datetime, time
 import logging
 import asyncio
+from utils.guild_settings import normalize_time
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ class News(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = bot.config
+        self.guild_settings = bot.guild_settings
 
         # 뉴스 소스 (RSS 피드)
         self.news_sources = {
@@ -33,24 +35,15 @@ class News(commands.Cog):
         now = datetime.now()
         current_time = now.strftime("%H:%M")
 
-        # 모든 길드의 뉴스 스케줄 확인
-        news_schedules = self.config.get('news_schedules', default={})
-
-        for guild_id_str, schedule_info in news_schedules.items():
-            if not schedule_info.get('enabled', False):
-                continue
-
-            scheduled_time = schedule_info.get('time', '09:00')
-            channel_id = schedule_info.get('channel_id')
-            news_type = schedule_info.get('news_type', '구글_뉴스_한국')
-
-            if current_time == scheduled_time and channel_id:
-                guild = self.bot.get_guild(int(guild_id_str))
+        # 지금 전송할 스케줄만 인덱스로 조회 (전체 서버를 훑지 않음)
+        for schedule in await self.guild_settings.get_due_news_schedules(current_time):
+            if schedule.channel_id:
+                guild = self.bot.get_guild(schedule.guild_id)
                 if guild:
-                    channel = guild.get_channel(channel_id)
+                    channel = guild.get_channel(schedule.channel_id)
                     if channel:
                         try:
-                            await self.send_news_summary(channel, news_type)
+                            await self.send_news_summary(channel, schedule.news_type)
                             logger.info(f'뉴스를 {guild.name}의 {channel.name}에 전송했습니다.')
                         except Exception as e:
                             logger.error(f'뉴스 전송 오류: {e}')
@@ -200,10 +193,8 @@ class News(commands.Cog):
         """뉴스 자동 전송 스케줄 설정"""
         # 시간 형식 검증
         try:
-            hour, minute = map(int, time.split(':'))
-            if not (0 <= hour < 24 and 0 <= minute < 60):
-                raise ValueError
-        except:
+            time = normalize_time(time)
+        except ValueError:
             await interaction.response.send_message(
                 '❌ 올바른 시간 형식을 입력해주세요. (예: 09:00, 18:30)',
                 ephemeral=True
@@ -211,17 +202,7 @@ class News(commands.Cog):
             return
 
         # 설정 저장
-        guild_id = str(interaction.guild.id)
-        if 'news_schedules' not in self.config.config:
-            self.config.config['news_schedules'] = {}
-
-        self.config.config['news_schedules'][guild_id] = {
-            'enabled': True,
-            'channel_id': channel.id,
-            'time': time,
-            'news_type': news_type.value
-        }
-        self.config._save_config(self.config.config)
+        await self.guild_settings.set_news_schedule(interaction.guild.id, channel.id, time, news_type.value)
 
         embed = discord.Embed(
             title="✅ 뉴스 자동 전송 설정",
@@ -241,15 +222,10 @@ class News(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def stopnews(self, interaction: discord.Interaction):
         """뉴스 자동 전송 중지"""
-        guild_id = str(interaction.guild.id)
-
-        if 'news_schedules' not in self.config.config or guild_id not in self.config.config['news_schedules']:
+        if not await self.guild_settings.set_news_enabled(interaction.guild.id, False):
             await interaction.response.send_message('❌ 설정된 뉴스 스케줄이 없습니다.', ephemeral=True)
             return
 
-        self.config.config['news_schedules'][guild_id]['enabled'] = False
-        self.config._save_config(self.config.config)
-
         embed = discord.Embed(
             title="✅ 뉴스 자동 전송 중지",
             description="뉴스 자동 전송이 중지되었습니다.",
@@ -265,19 +241,16 @@ class News(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def newsstatus(self, interaction: discord.Interaction):
         """뉴스 스케줄 상태 확인"""
-        guild_id = str(interaction.guild.id)
-
-        news_schedules = self.config.get('news_schedules', default={})
-        schedule_info = news_schedules.get(guild_id)
+        schedule = await self.guild_settings.get_news_schedule(interaction.guild.id)
 
-        if not schedule_info:
+        if not schedule:
             await interaction.response.send_message('📰 설정된 뉴스 스케줄이 없습니다.', ephemeral=True)
             return
 
-        enabled = schedule_info.get('enabled', False)
-        channel_id = schedule_info.get('channel_id')
-        scheduled_time = schedule_info.get('time', '미설정')
-        news_type = schedule_info.get('news_type', '미설정')
+        enabled = schedule.enabled
+        channel_id = schedule.channel_id
+        scheduled_time = schedule.time
+        news_type = schedule.news_type
 
         channel = interaction.guild.get_channel(channel_id) if channel_id else None
 
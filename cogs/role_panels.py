@@ -0,0 +1,479 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 버튼(5x5)과 선택 메뉴 옵션 모두 최대 25개
+MAX_PANEL_ROLES = 25
+
+class RolePanelButton(discord.ui.Button):
+    """누를 때마다 역할 하나를 부여/해제하는 버튼"""
+
+    def __init__(self, panel_id: int, role_id: int, label: str, emoji: Optional[str]):
+        super().__init__(
+            style=discord.ButtonStyle.secondary,
+            label=label,
+            emoji=emoji or None,
+            custom_id=f'role_panel:{panel_id}:{role_id}'
+        )
+        self.role_id = role_id
+
+    async def callback(self, interaction: discord.Interaction):
+        await self.view.toggle(interaction, [self.role_id])
+
+class RolePanelSelect(discord.ui.Select):
+    """선택한 역할들을 한 번에 부여/해제하는 선택 메뉴"""
+
+    def __init__(self, panel_id: int, roles: list):
+        options = [
+            discord.SelectOption(label=label, value=str(role_id), emoji=emoji or None)
+            for role_id, label, emoji in roles
+        ]
+        super().__init__(
+            placeholder="부여/해제할 역할을 선택하세요",
+            min_values=1,
+            max_values=len(options),
+            options=options,
+            custom_id=f'role_panel:{panel_id}:select'
+        )
+
+    async def callback(self, interaction: discord.Interaction):
+        await self.view.toggle(interaction, [int(value) for value in self.values])
+
+class RolePanelView(discord.ui.View):
+    """역할 패널 (재시작 후에도 custom_id로 다시 연결되는 영구 View)"""
+
+    def __init__(self, cog, panel_id: int, style: str, roles: list):
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.panel_id = panel_id
+        if style == 'select':
+            self.add_item(RolePanelSelect(panel_id, roles))
+        else:
+            for role_id, label, emoji in roles:
+                self.add_item(RolePanelButton(panel_id, role_id, label, emoji))
+
+    async def toggle(self, interaction: discord.Interaction, role_ids: list):
+        """선택한 역할을 가지고 있으면 해제, 없으면 부여 (멤버 수정 한 번으로 처리)"""
+        guild = interaction.guild
+        member = interaction.user
+        roles = [guild.get_role(role_id) for role_id in role_ids]
+        roles = [role for role in roles if role and not role.managed and role.position < guild.me.top_role.position]
+
+        if not roles:
+            await interaction.response.send_message('❌ 이 역할은 더 이상 부여할 수 없습니다. 관리자에게 문의하세요.', ephemeral=True)
+            return
+
+        to_add = [role for role in roles if member.get_role(role.id) is None]
+        to_remove = [role for role in roles if member.get_role(role.id) is not None]
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            await self.cog.bot.role_queue.edit(member, add=to_add, remove=to_remove, reason="역할 패널")
+        except discord.Forbidden:
+            await interaction.followup.send('❌ 역할을 관리할 권한이 없습니다.', ephemeral=True)
+            return
+        except Exception as e:
+            await interaction.followup.send('❌ 역할 변경 중 오류가 발생했습니다.', ephemeral=True)
+            logger.error(f'역할 패널 #{self.panel_id} 역할 변경 오류: {e}')
+            return
+
+        lines = [f'✅ {role.mention} 역할을 받았습니다.' for role in to_add]
+        lines += [f'➖ {role.mention} 역할을 해제했습니다.' for role in to_remove]
+        await interaction.followup.send('\n'.join(lines), ephemeral=True)
+
+class RolePanels(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = bot.db
+        # panel_id -> 현재 연결된 View
+        self._views = {}
+
+    async def cog_load(self):
+        """DB에 저장된 역할 패널을 메시지에 다시 연결"""
+        restored = 0
+        for panel_id, guild_id, channel_id, message_id, title, description, style in await self.db.get_role_panels():
+            if not message_id:
+                continue
+            roles = await self.db.get_role_panel_roles(panel_id)
+            if roles:
+                self._attach_view(panel_id, message_id, style, roles)
+                restored += 1
+        logger.info(f'역할 패널 {restored}개 복원')
+
+    def cog_unload(self):
+        for view in self._views.values():
+            view.stop()
+        self._views.clear()
+
+    def _attach_view(self, panel_id: int, message_id: int, style: str, roles: list):
+        view = RolePanelView(self, panel_id, style, roles)
+        old_view = self._views.pop(panel_id, None)
+        if old_view:
+            old_view.stop()
+        self._views[panel_id] = view
+        self.bot.add_view(view, message_id=message_id)
+        return view
+
+    def _panel_embed(self, guild: discord.Guild, title: str, description: Optional[str], roles: list):
+        embed = discord.Embed(
+            title=title,
+            description=description or "아래에서 역할을 선택하면 부여되고, 다시 선택하면 해제됩니다.",
+            color=discord.Color.blurple()
+        )
+        if roles:
+            lines = []
+            for role_id, label, emoji in roles:
+                role = guild.get_role(role_id)
+                lines.append(f"{emoji + ' ' if emoji else ''}{role.mention if role else label}")
+            embed.add_field(name="역할", value="\n".join(lines), inline=False)
+        return embed
+
+    async def _get_guild_panel(self, guild_id: int, panel_id: int):
+        panel = await self.db.get_role_panel(panel_id)
+        if panel is None or panel[1] != guild_id:
+            return None
+        return panel
+
+    async def _refresh_panel(self, guild: discord.Guild, panel) -> bool:
+        """패널 메시지의 임베드와 버튼/선택 메뉴 갱신 (패널 채널이 없으면 False)"""
+        panel_id, _, channel_id, message_id, title, description, style = panel
+        roles = await self.db.get_role_panel_roles(panel_id)
+
+        channel = guild.get_channel_or_thread(channel_id)
+        if channel is None or not message_id:
+            return False
+        message = channel.get_partial_message(message_id)
+
+        if roles:
+            view = self._attach_view(panel_id, message_id, style, roles)
+        else:
+            view = None
+            old_view = self._views.pop(panel_id, None)
+            if old_view:
+                old_view.stop()
+        await message.edit(embed=self._panel_embed(guild, title, description, roles), view=view)
+        return True
+
+    def _check_role(self, interaction: discord.Interaction, role: discord.Role) -> Optional[str]:
+        """패널에 넣을 수 없는 역할이면 오류 메시지"""
+        if role.is_default() or role.managed:
+            return '❌ 이 역할은 패널에 추가할 수 없습니다.'
+        if role.position >= interaction.guild.me.top_role.position:
+            return '❌ 봇보다 높거나 같은 역할은 설정할 수 없습니다.'
+        if role.position >= interaction.user.top_role.position and interaction.user.id != interaction.guild.owner_id:
+            return '❌ 자신보다 높거나 같은 역할은 관리할 수 없습니다.'
+        return None
+
+    @app_commands.command(name="createrolepanel", description="버튼 또는 선택 메뉴로 역할을 받는 패널을 만듭니다")
+    @app_commands.describe(
+        title="패널 제목",
+        description="패널 설명",
+        style="버튼 또는 선택 메뉴"
+    )
+    @app_commands.choices(style=[
+        app_commands.Choice(name="버튼 (buttons)", value="buttons"),
+        app_commands.Choice(name="선택 메뉴 (select)", value="select")
+    ])
+    @app_commands.default_permissions(manage_roles=True)
+    async def createrolepanel(
+        self,
+        interaction: discord.Interaction,
+        title: str,
+        description: Optional[str] = None,
+        style: Optional[app_commands.Choice[str]] = None
+    ):
+        """역할 패널 생성"""
+        style_value = style.value if style else 'buttons'
+        try:
+            panel_id = await self.db.create_role_panel(
+                interaction.guild.id, interaction.channel.id, title, description, style_value
+            )
+            try:
+                message = await interaction.channel.send(embed=self._panel_embed(interaction.guild, title, description, []))
+            except discord.HTTPException:
+                # 패널 메시지를 보내지 못하면 다음 로드 때 복원되지 않도록 기록도 삭제
+                await self.db.delete_role_panel(panel_id)
+                raise
+            await self.db.set_role_panel_message(panel_id, message.id)
+
+            await interaction.response.send_message(
+                f'✅ 역할 패널 #{panel_id}을(를) 만들었습니다. `/addpanelrole panel_id:{panel_id}`로 역할을 추가하세요.',
+                ephemeral=True
+            )
+            logger.info(f'{interaction.user.name}이(가) 역할 패널 #{panel_id} 생성: {title}')
+
+        except discord.Forbidden:
+            await interaction.response.send_message('❌ 이 채널에 메시지를 보낼 권한이 없습니다.', ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'역할 패널 생성 오류: {e}')
+
+    @app_commands.command(name="addpanelrole", description="역할 패널에 역할을 추가합니다")
+    @app_commands.describe(
+        panel_id="역할 패널 번호",
+        role="추가할 역할",
+        label="버튼/옵션에 표시할 이름 (기본: 역할 이름)",
+        emoji="버튼/옵션에 표시할 이모지"
+    )
+    @app_commands.default_permissions(manage_roles=True)
+    async def addpanelrole(
+        self,
+        interaction: discord.Interaction,
+        panel_id: int,
+        role: discord.Role,
+        label: Optional[app_commands.Range[str, 1, 80]] = None,
+        emoji: Optional[str] = None
+    ):
+        """역할 패널에 역할 추가"""
+        error = self._check_role(interaction, role)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
+
+        try:
+            panel = await self._get_guild_panel(interaction.guild.id, panel_id)
+            if panel is None:
+                await interaction.response.send_message('❌ 해당 역할 패널을 찾을 수 없습니다.', ephemeral=True)
+                return
+
+            if len(await self.db.get_role_panel_roles(panel_id)) >= MAX_PANEL_ROLES:
+                await interaction.response.send_message(f'❌ 역할 패널에는 최대 {MAX_PANEL_ROLES}개의 역할만 추가할 수 있습니다.', ephemeral=True)
+                return
+
+            success = await self.db.add_role_panel_role(panel_id, role.id, label or role.name[:80], emoji)
+            if not success:
+                await interaction.response.send_message('❌ 이미 패널에 추가된 역할입니다.', ephemeral=True)
+                return
+
+            try:
+                refreshed = await self._refresh_panel(interaction.guild, panel)
+            except discord.NotFound:
+                refreshed = False
+            except discord.HTTPException:
+                # 잘못된 이모지 등으로 패널을 갱신할 수 없으면 추가를 되돌림
+                await self.db.remove_role_panel_role(panel_id, role.id)
+                await self._refresh_panel(interaction.guild, panel)
+                await interaction.response.send_message('❌ 패널을 갱신할 수 없습니다. 올바른 이모지인지 확인해주세요.', ephemeral=True)
+                return
+
+            if not refreshed:
+                await self.db.remove_role_panel_role(panel_id, role.id)
+                await interaction.response.send_message('❌ 역할 패널 메시지를 찾을 수 없습니다.', ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title="✅ 역할 패널에 역할 추가",
+                description=f'역할 패널 #{panel_id}에 {role.mention} 역할이 추가되었습니다.',
+                color=discord.Color.green()
+            )
+            embed.add_field(name="설정한 관리자", value=interaction.user.mention, inline=False)
+            embed.timestamp = discord.utils.utcnow()
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            logger.info(f'{interaction.user.name}이(가) 역할 패널 #{panel_id}에 역할 추가: {role.name}')
+
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'역할 패널 역할 추가 오류: {e}')
+
+    @app_commands.command(name="removepanelrole", description="역할 패널에서 역할을 제거합니다")
+    @app_commands.describe(panel_id="역할 패널 번호", role="제거할 역할")
+    @app_commands.default_permissions(manage_roles=True)
+    async def removepanelrole(self, interaction: discord.Interaction, panel_id: int, role: discord.Role):
+        """역할 패널에서 역할 제거"""
+        try:
+            panel = await self._get_guild_panel(interaction.guild.id, panel_id)
+            if panel is None:
+                await interaction.response.send_message('❌ 해당 역할 패널을 찾을 수 없습니다.', ephemeral=True)
+                return
+
+            if not await self.db.remove_role_panel_role(panel_id, role.id):
+                await interaction.response.send_message('❌ 패널에 없는 역할입니다.', ephemeral=True)
+                return
+
+            try:
+                await self._refresh_panel(interaction.guild, panel)
+            except discord.NotFound:
+                # 패널 메시지가 지워졌어도 설정 제거는 유지
+                pass
+
+            await interaction.response.send_message(f'✅ 역할 패널 #{panel_id}에서 {role.mention} 역할을 제거했습니다.', ephemeral=True)
+            logger.info(f'{interaction.user.name}이(가) 역할 패널 #{panel_id}에서 역할 제거: {role.name}')
+
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'역할 패널 역할 제거 오류: {e}')
+
+    @app_commands.command(name="deleterolepanel", description="역할 패널을 삭제합니다")
+    @app_commands.describe(panel_id="역할 패널 번호")
+    @app_commands.default_permissions(manage_roles=True)
+    async def deleterolepanel(self, interaction: discord.Interaction, panel_id: int):
+        """역할 패널 삭제"""
+        try:
+            panel = await self._get_guild_panel(interaction.guild.id, panel_id)
+            if panel is None:
+                await interaction.response.send_message('❌ 해당 역할 패널을 찾을 수 없습니다.', ephemeral=True)
+                return
+
+            await self.db.delete_role_panel(panel_id)
+            view = self._views.pop(panel_id, None)
+            if view:
+                view.stop()
+
+            channel = interaction.guild.get_channel_or_thread(panel[2])
+            if channel and panel[3]:
+                try:
+                    await channel.get_partial_message(panel[3]).delete()
+                except discord.HTTPException:
+                    pass
+
+            await interaction.response.send_message(f'✅ 역할 패널 #{panel_id}을(를) 삭제했습니다.', ephemeral=True)
+            logger.info(f'{interaction.user.name}이(가) 역할 패널 #{panel_id} 삭제')
+
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'역할 패널 삭제 오류: {e}')
+
+    @app_commands.command(name="migratereactionroles", description="반응 역할 메시지를 버튼/선택 메뉴 역할 패널로 옮깁니다")
+    @app_commands.describe(
+        message_id="옮길 반응 역할 메시지 ID (비우면 서버 전체)",
+        style="버튼 또는 선택 메뉴"
+    )
+    @app_commands.choices(style=[
+        app_commands.Choice(name="버튼 (buttons)", value="buttons"),
+        app_commands.Choice(name="선택 메뉴 (select)", value="select")
+    ])
+    @app_commands.default_permissions(manage_roles=True)
+    async def migratereactionroles(
+        self,
+        interaction: discord.Interaction,
+        message_id: Optional[str] = None,
+        style: Optional[app_commands.Choice[str]] = None
+    ):
+        """반응 역할을 역할 패널로 이전"""
+        guild = interaction.guild
+        index = self.db.reaction_roles
+
+        if message_id is not None:
+            try:
+                message_ids = [int(message_id)]
+            except ValueError:
+                await interaction.response.send_message('❌ 올바른 메시지 ID를 입력해주세요.', ephemeral=True)
+                return
+            if not index.is_panel(guild.id, message_ids[0]):
+                await interaction.response.send_message('❌ 이 서버에서 해당 메시지에 설정된 반응 역할이 없습니다.', ephemeral=True)
+                return
+        else:
+            message_ids = index.get_panels(guild.id)
+            if not message_ids:
+                await interaction.response.send_message('❌ 이 서버에 설정된 반응 역할이 없습니다.', ephemeral=True)
+                return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        migrated = []
+        skipped = []
+        for msg_id in message_ids:
+            try:
+                panel_ids = await self._migrate_message(guild, msg_id, style.value if style else 'buttons',
+                                                        fallback_channel=interaction.channel if message_id else None)
+            except Exception as e:
+                logger.error(f'반응 역할 이전 오류 ({msg_id}): {e}')
+                panel_ids = []
+
+            if not panel_ids:
+                skipped.append(str(msg_id))
+                continue
+
+            line = f'{msg_id} → 패널 ' + ', '.join(f'#{panel_id}' for panel_id in panel_ids)
+            # 역할이 삭제되었거나 일부 패널을 보내지 못해 남은 반응 역할은 그대로 유지
+            remaining = len(index.get_message_roles(msg_id))
+            if remaining:
+                line += f' (남은 반응 역할 {remaining}개)'
+            migrated.append(line)
+
+        embed = discord.Embed(
+            title="✅ 반응 역할 이전",
+            description=f'{len(migrated)}개 메시지를 역할 패널로 옮겼습니다.',
+            color=discord.Color.green() if migrated else discord.Color.orange()
+        )
+        if migrated:
+            embed.add_field(name="이전됨", value="\n".join(migrated)[:1024], inline=False)
+        if skipped:
+            embed.add_field(
+                name="건너뜀 (채널을 알 수 없거나 패널을 보낼 수 없음)",
+                value="\n".join(skipped)[:1024],
+                inline=False
+            )
+        embed.timestamp = discord.utils.utcnow()
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+        logger.info(f'{interaction.user.name}이(가) 반응 역할 {len(migrated)}개 메시지를 역할 패널로 이전')
+
+    async def _migrate_message(self, guild: discord.Guild, message_id: int, style: str, fallback_channel=None) -> list:
+        """반응 역할 메시지 하나를 역할 패널로 옮기고 옮긴 반응 역할 설정만 제거 (만든 패널 번호 목록, 옮기지 못하면 빈 목록)
+
+        역할이 MAX_PANEL_ROLES개를 넘으면 여러 패널로 나눠 보냄
+        """
+        index = self.db.reaction_roles
+        channel_id = index.get_channel(message_id)
+        channel = guild.get_channel_or_thread(channel_id) if channel_id else fallback_channel
+        if channel is None:
+            return []
+
+        entries = [
+            (role_id, emoji) for emoji, role_id in index.get_message_roles(message_id)
+            if guild.get_role(role_id) is not None
+        ]
+        if not entries:
+            return []
+
+        title = "역할 선택"
+        old_message = None
+        try:
+            old_message = await channel.fetch_message(message_id)
+            if old_message.embeds and old_message.embeds[0].title:
+                title = old_message.embeds[0].title
+        except discord.HTTPException:
+            pass
+
+        panel_ids = []
+        migrated = []
+        for start in range(0, len(entries), MAX_PANEL_ROLES):
+            chunk = entries[start:start + MAX_PANEL_ROLES]
+            panel_id = await self.db.create_role_panel(guild.id, channel.id, title, None, style)
+            for role_id, emoji in chunk:
+                await self.db.add_role_panel_role(panel_id, role_id, guild.get_role(role_id).name[:80], emoji)
+            roles = await self.db.get_role_panel_roles(panel_id)
+
+            try:
+                view = RolePanelView(self, panel_id, style, roles)
+                message = await channel.send(embed=self._panel_embed(guild, title, None, roles), view=view)
+            except discord.HTTPException:
+                # 보내지 못한 패널의 역할은 반응 역할로 남겨 둠
+                await self.db.delete_role_panel(panel_id)
+                break
+
+            # 보낸 메시지의 View는 전송 시 자동으로 연결됨
+            self._views[panel_id] = view
+            await self.db.set_role_panel_message(panel_id, message.id)
+            panel_ids.append(panel_id)
+            migrated.extend(emoji for _, emoji in chunk)
+
+        if migrated:
+            await self.db.remove_reaction_roles(message_id, migrated)
+
+        # 모든 반응 역할을 옮겼으면 이전 메시지의 반응은 더 이상 역할과 연결되지 않으므로 정리
+        if old_message and panel_ids and not index.get_message_roles(message_id):
+            try:
+                await old_message.clear_reactions()
+            except discord.HTTPException:
+                pass
+        return panel_ids
+
+async def setup(bot):
+    await bot.add_cog(RolePanels(bot))
@@ -1,7 +1,12 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from datetime import timedelta
+import asyncio
+from typing import Optional
 import logging
+from utils.bulk_roles import BulkRoleJob, BulkRoleRunner
+from utils.reaction_reconciler import ReactionRoleReconciler
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +14,35 @@ class Roles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
+        self.bulk_roles = BulkRoleRunner(self.db, bot.role_queue)
+        self.reconciler = ReactionRoleReconciler(self.db, bot.role_queue)
+        self._reconcile_task = None
+        self._resumed = False
+
+    def cog_unload(self):
+        # 진행 중인 대량 역할 작업은 running 상태로 남아 다음 시작 시 이어서 실행됨
+        self.bulk_roles.close()
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """반응 역할 동기화 및 중단된 대량 역할 작업 이어서 실행"""
+        if self._resumed:
+            return
+        self._resumed = True
+
+        # 꺼져 있던 동안 누락된 반응 추가/제거를 백그라운드에서 보정
+        self._reconcile_task = asyncio.create_task(self.reconciler.run(list(self.bot.guilds)))
+
+        for row in await self.db.get_running_bulk_role_jobs():
+            job = BulkRoleJob.from_row(row)
+            guild = self.bot.get_guild(job.guild_id)
+            if guild is None or self.bulk_roles.is_running(job.id):
+                continue
+            channel = guild.get_channel(job.channel_id)
+            logger.info(f'대량 역할 작업 #{job.id} 이어서 실행 ({guild.name}, {job.processed}명 처리됨)')
+            self.bulk_roles.start(guild, job, channel)
 
     @app_commands.command(name="autorole", description="신규 멤버에게 자동으로 부여할 역할을 설정합니다")
     @app_commands.describe(role="자동으로 부여할 역할")
@@ -86,13 +120,19 @@ class Roles(commands.Cog):
             await interaction.response.send_message('❌ 자신보다 높거나 같은 역할은 관리할 수 없습니다.', ephemeral=True)
             return
 
+        if action.value == "add" and role in member.roles:
+            await interaction.response.send_message(f'❌ {member.mention} 님은 이미 {role.mention} 역할을 가지고 있습니다.', ephemeral=True)
+            return
+        if action.value == "remove" and role not in member.roles:
+            await interaction.response.send_message(f'❌ {member.mention} 님은 {role.mention} 역할을 가지고 있지 않습니다.', ephemeral=True)
+            return
+
+        # 역할 변경 큐는 병합 구간과 재시도 대기 때문에 3초 응답 제한을 넘길 수 있으므로 먼저 응답을 미룸
+        await interaction.response.defer()
+
         try:
             if action.value == "add":
-                if role in member.roles:
-                    await interaction.response.send_message(f'❌ {member.mention} 님은 이미 {role.mention} 역할을 가지고 있습니다.', ephemeral=True)
-                    return
-
-                await member.add_roles(role, reason=f'{interaction.user.name}에 의한 역할 부여')
+                await self.bot.role_queue.add(member, role, reason=f'{interaction.user.name}에 의한 역할 부여')
 
                 embed = discord.Embed(
                     title="✅ 역할 부여",
@@ -102,11 +142,7 @@ class Roles(commands.Cog):
                 logger.info(f'{interaction.user.name}이(가) {member.name}에게 {role.name} 역할 부여')
 
             else:  # remove
-                if role not in member.roles:
-                    await interaction.response.send_message(f'❌ {member.mention} 님은 {role.mention} 역할을 가지고 있지 않습니다.', ephemeral=True)
-                    return
-
-                await member.remove_roles(role, reason=f'{interaction.user.name}에 의한 역할 제거')
+                await self.bot.role_queue.remove(member, role, reason=f'{interaction.user.name}에 의한 역할 제거')
 
                 embed = discord.Embed(
                     title="✅ 역할 제거",
@@ -118,12 +154,12 @@ class Roles(commands.Cog):
             embed.add_field(name="담당 관리자", value=interaction.user.mention, inline=False)
             embed.timestamp = discord.utils.utcnow()
 
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
 
         except discord.Forbidden:
-            await interaction.response.send_message('❌ 역할을 관리할 권한이 없습니다.', ephemeral=True)
+            await interaction.followup.send('❌ 역할을 관리할 권한이 없습니다.', ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            await interaction.followup.send(f'❌ 오류 발생: {e}', ephemeral=True)
             logger.error(f'역할 관리 오류: {e}')
 
     @app_commands.command(name="reactionrole", description="반응 역할을 설정합니다")
@@ -150,7 +186,7 @@ class Roles(commands.Cog):
             message = await interaction.channel.fetch_message(msg_id)
 
             # 데이터베이스에 저장
-            success = await self.db.add_reaction_role(interaction.guild.id, msg_id, emoji, role.id)
+            success = await self.db.add_reaction_role(interaction.guild.id, msg_id, emoji, role.id, interaction.channel.id)
 
             if not success:
                 await interaction.response.send_message('❌ 해당 메시지와 이모지 조합은 이미 설정되어 있습니다.', ephemeral=True)
@@ -183,15 +219,207 @@ class Roles(commands.Cog):
             await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
             logger.error(f'반응 역할 설정 오류: {e}')
 
+    @app_commands.command(name="removereactionrole", description="반응 역할 설정을 제거합니다")
+    @app_commands.describe(
+        message_id="반응 역할이 설정된 메시지 ID",
+        emoji="제거할 이모지"
+    )
+    @app_commands.default_permissions(manage_roles=True)
+    async def removereactionrole(self, interaction: discord.Interaction, message_id: str, emoji: str):
+        """반응 역할 제거"""
+        try:
+            msg_id = int(message_id)
+        except ValueError:
+            await interaction.response.send_message('❌ 올바른 메시지 ID를 입력해주세요.', ephemeral=True)
+            return
+
+        if not self.db.reaction_roles.is_panel(interaction.guild.id, msg_id):
+            await interaction.response.send_message('❌ 이 서버에서 해당 메시지에 설정된 반응 역할이 없습니다.', ephemeral=True)
+            return
+
+        try:
+            removed = await self.db.remove_reaction_role(msg_id, emoji)
+
+            if not removed:
+                await interaction.response.send_message('❌ 해당 메시지와 이모지 조합은 설정되어 있지 않습니다.', ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title="✅ 반응 역할 제거",
+                description=f'메시지의 {emoji} 반응 역할 설정이 제거되었습니다.',
+                color=discord.Color.orange()
+            )
+            embed.add_field(name="메시지 ID", value=message_id, inline=True)
+            embed.add_field(name="제거한 관리자", value=interaction.user.mention, inline=False)
+            embed.timestamp = discord.utils.utcnow()
+
+            await interaction.response.send_message(embed=embed)
+            logger.info(f'{interaction.user.name}이(가) 반응 역할 제거: {message_id} {emoji}')
+
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'반응 역할 제거 오류: {e}')
+
+    @app_commands.command(name="bulkrole", description="조건에 맞는 멤버 전체에게 역할을 부여하거나 제거합니다")
+    @app_commands.describe(
+        role="역할",
+        action="부여 또는 제거",
+        has_role="이 역할을 가진 멤버만 대상",
+        joined_within_days="최근 N일 이내 가입한 멤버만 대상",
+        joined_over_days="가입한 지 N일 이상 지난 멤버만 대상",
+        min_level="이 레벨 이상인 멤버만 대상",
+        dry_run="실제로 변경하지 않고 대상 인원만 확인"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="부여 (add)", value="add"),
+        app_commands.Choice(name="제거 (remove)", value="remove")
+    ])
+    @app_commands.default_permissions(manage_roles=True)
+    async def bulkrole(
+        self,
+        interaction: discord.Interaction,
+        role: discord.Role,
+        action: app_commands.Choice[str],
+        has_role: Optional[discord.Role] = None,
+        joined_within_days: Optional[app_commands.Range[int, 1, 3650]] = None,
+        joined_over_days: Optional[app_commands.Range[int, 1, 3650]] = None,
+        min_level: Optional[app_commands.Range[int, 1, 1000]] = None,
+        dry_run: bool = False
+    ):
+        """대량 역할 부여/제거"""
+        if role.is_default() or role.managed:
+            await interaction.response.send_message('❌ 이 역할은 직접 관리할 수 없습니다.', ephemeral=True)
+            return
+
+        if role.position >= interaction.guild.me.top_role.position:
+            await interaction.response.send_message('❌ 봇보다 높거나 같은 역할은 관리할 수 없습니다.', ephemeral=True)
+            return
+
+        if role.position >= interaction.user.top_role.position and interaction.user.id != interaction.guild.owner_id:
+            await interaction.response.send_message('❌ 자신보다 높거나 같은 역할은 관리할 수 없습니다.', ephemeral=True)
+            return
+
+        now = discord.utils.utcnow()
+        job = BulkRoleJob(
+            id=None,
+            guild_id=interaction.guild.id,
+            channel_id=interaction.channel.id,
+            role_id=role.id,
+            action=action.value,
+            filter_role_id=has_role.id if has_role else None,
+            joined_after=now - timedelta(days=joined_within_days) if joined_within_days else None,
+            joined_before=now - timedelta(days=joined_over_days) if joined_over_days else None,
+            min_level=min_level
+        )
+
+        try:
+            if dry_run:
+                count, preview = await self.bulk_roles.preview(interaction.guild, job)
+                action_text = "부여" if action.value == "add" else "제거"
+
+                embed = discord.Embed(
+                    title="🔍 대량 역할 작업 미리보기",
+                    description=f'{role.mention} 역할 {action_text} 대상: **{count:,}명**',
+                    color=discord.Color.blue()
+                )
+                embed.add_field(name="대상", value=job.describe_filters(interaction.guild), inline=False)
+                if preview:
+                    embed.add_field(
+                        name="예시",
+                        value="\n".join(member.mention for member in preview),
+                        inline=False
+                    )
+                embed.set_footer(text="dry_run을 끄고 다시 실행하면 실제로 적용됩니다")
+
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            job_id = await self.db.create_bulk_role_job(
+                job.guild_id, job.channel_id, job.role_id, job.action,
+                filter_role_id=job.filter_role_id,
+                joined_after=job.joined_after,
+                joined_before=job.joined_before,
+                min_level=job.min_level,
+                created_by=interaction.user.id
+            )
+            job = BulkRoleJob.from_row(await self.db.get_bulk_role_job(job_id))
+
+            await interaction.response.send_message(
+                f'⏳ 대량 역할 작업 #{job_id}을(를) 시작합니다. 진행 상황은 이 채널에 표시됩니다.\n'
+                f'취소하려면 `/cancelbulkrole job_id:{job_id}`를 사용하세요.'
+            )
+            self.bulk_roles.start(interaction.guild, job, interaction.channel)
+            logger.info(f'{interaction.user.name}이(가) 대량 역할 작업 #{job_id} 시작: {role.name} {action.value}')
+
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'대량 역할 작업 오류: {e}')
+
+    @app_commands.command(name="cancelbulkrole", description="진행 중인 대량 역할 작업을 취소합니다")
+    @app_commands.describe(job_id="취소할 작업 번호")
+    @app_commands.default_permissions(manage_roles=True)
+    async def cancelbulkrole(self, interaction: discord.Interaction, job_id: int):
+        """대량 역할 작업 취소"""
+        try:
+            row = await self.db.get_bulk_role_job(job_id)
+        except Exception as e:
+            await interaction.response.send_message(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'대량 역할 작업 취소 오류: {e}')
+            return
+
+        if row is None or row[1] != interaction.guild.id:
+            await interaction.response.send_message('❌ 해당 작업을 찾을 수 없습니다.', ephemeral=True)
+            return
+
+        job = BulkRoleJob.from_row(row)
+        if job.status != 'running':
+            await interaction.response.send_message(f'❌ 이미 종료된 작업입니다. (상태: {job.status})', ephemeral=True)
+            return
+
+        # 취소는 처리 중이던 멤버 작업과 진행 메시지 수정이 끝날 때까지 기다리므로 3초 응답 제한을 넘길 수 있어 먼저 응답을 미룸
+        await interaction.response.defer()
+
+        try:
+            # 처리 중이던 멤버 작업이 정리된 뒤의 진행 상황으로 안내
+            await self.bulk_roles.cancel(job_id)
+            job = BulkRoleJob.from_row(await self.db.get_bulk_role_job(job_id))
+
+            embed = discord.Embed(
+                title="⏹️ 대량 역할 작업 취소",
+                description=f'작업 #{job_id}이(가) 취소되었습니다. ({job.processed:,}명 처리됨)',
+                color=discord.Color.orange()
+            )
+            embed.add_field(name="취소한 관리자", value=interaction.user.mention, inline=False)
+            embed.timestamp = discord.utils.utcnow()
+
+            await interaction.followup.send(embed=embed)
+            logger.info(f'{interaction.user.name}이(가) 대량 역할 작업 #{job_id} 취소')
+
+        except Exception as e:
+            await interaction.followup.send(f'❌ 오류 발생: {e}', ephemeral=True)
+            logger.error(f'대량 역할 작업 취소 오류: {e}')
+
+    async def _remember_channel(self, payload: discord.RawReactionActionEvent):
+        """채널이 기록되지 않은 이전 반응 역할 메시지는 반응 이벤트에서 채널을 기록 (동기화 대상에 포함)"""
+        if self.db.reaction_roles.get_channel(payload.message_id) is None:
+            try:
+                await self.db.set_reaction_role_channel(payload.message_id, payload.channel_id)
+            except Exception as e:
+                logger.error(f'반응 역할 채널 기록 오류: {e}')
+
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """반응 추가 시 역할 부여"""
         if payload.user_id == self.bot.user.id:
             return
 
-        # 반응 역할 확인
-        emoji_str = str(payload.emoji)
-        role_id = await self.db.get_reaction_role(payload.message_id, emoji_str)
+        # 반응 역할 메시지가 아니면 DB 조회 없이 무시
+        if not self.db.reaction_roles.is_panel(payload.guild_id, payload.message_id):
+            return
+
+        await self._remember_channel(payload)
+
+        role_id = self.db.reaction_roles.get(payload.message_id, str(payload.emoji))
 
         if not role_id:
             return
@@ -206,12 +434,15 @@ class Roles(commands.Cog):
         if not role or not member:
             return
 
-        try:
-            if role not in member.roles:
-                await member.add_roles(role, reason="반응 역할")
-                logger.info(f'{member.name}에게 반응 역할 {role.name} 부여')
-        except Exception as e:
-            logger.error(f'반응 역할 부여 오류: {e}')
+        # 반응 전에 이미 가지고 있던 역할(/role, 자동 역할 등)은 기록하지 않아 동기화에서 회수하지 않음
+        if member.get_role(role.id) is None:
+            try:
+                await self.db.add_reaction_role_grant(guild.id, role.id, member.id)
+            except Exception as e:
+                logger.error(f'반응 역할 부여 기록 오류: {e}')
+
+        # 짧은 구간의 반응 토글을 모아 최종 상태만 반영
+        self.bot.role_queue.queue_add(member, role, reason="반응 역할")
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
@@ -219,9 +450,13 @@ class Roles(commands.Cog):
         if payload.user_id == self.bot.user.id:
             return
 
-        # 반응 역할 확인
-        emoji_str = str(payload.emoji)
-        role_id = await self.db.get_reaction_role(payload.message_id, emoji_str)
+        # 반응 역할 메시지가 아니면 DB 조회 없이 무시
+        if not self.db.reaction_roles.is_panel(payload.guild_id, payload.message_id):
+            return
+
+        await self._remember_channel(payload)
+
+        role_id = self.db.reaction_roles.get(payload.message_id, str(payload.emoji))
 
         if not role_id:
             return
@@ -237,11 +472,11 @@ class Roles(commands.Cog):
             return
 
         try:
-            if role in member.roles:
-                await member.remove_roles(role, reason="반응 역할 제거")
-                logger.info(f'{member.name}의 반응 역할 {role.name} 제거')
+            await self.db.remove_reaction_role_grants(guild.id, role.id, [member.id])
         except Exception as e:
-            logger.error(f'반응 역할 제거 오류: {e}')
+            logger.error(f'반응 역할 부여 기록 삭제 오류: {e}')
+
+        self.bot.role_queue.queue_remove(member, role, reason="반응 역할 제거")
 
 async def setup(bot):
     await bot.add_cog(Roles(bot))
@@ -1,9 +1,13 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import yfinance as yf
 from datetime import datetime
 import logging
+import asyncio
+from utils.guild_settings import normalize_time
+from utils.quote_cache import QuoteCache
+from utils.quote_providers import create_provider
+from utils.quote_service import QuoteService
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +16,12 @@ class Stocks(commands.Cog):
         self.bot = bot
         self.config = bot.config
         self.db = bot.db
+        self.guild_settings = bot.guild_settings
+        # 시세 제공자는 config.json의 stocks 설정으로 선택 (기본 yfinance, 오프라인 테스트는 replay)
+        # 제공자 호출은 전용 스레드 풀에서 실행 (응답을 기다리는 동안 이벤트 루프가 멈추지 않도록)
+        # 명령어, 자동 전송, 감시 목록이 같은 종목을 조회하므로 공용 캐시를 거침
+        provider = create_provider(self.config.get('stocks', default={}))
+        self.quotes = QuoteCache(QuoteService(provider, max_workers=4, timeout=10.0))
 
         # 주요 지표 티커 심볼
         self.indices = {
@@ -31,6 +41,7 @@ class Stocks(commands.Cog):
     def cog_unload(self):
         self.stocks_task.cancel()
         self.watchlist_monitor_task.cancel()
+        self.quotes.close()
 
     @tasks.loop(minutes=1)
     async def stocks_task(self):
@@ -38,24 +49,15 @@ class Stocks(commands.Cog):
         now = datetime.now()
         current_time = now.strftime("%H:%M")
 
-        # 모든 길드의 주식 스케줄 확인
-        stocks_schedules = self.config.get('stocks_schedules', default={})
-
-        for guild_id_str, schedule_info in stocks_schedules.items():
-            if not schedule_info.get('enabled', False):
-                continue
-
-            scheduled_time = schedule_info.get('time', '09:00')
-            channel_id = schedule_info.get('channel_id')
-            indices = schedule_info.get('indices', ['코스피', '코스닥', '나스닥'])
-
-            if current_time == scheduled_time and channel_id:
-                guild = self.bot.get_guild(int(guild_id_str))
+        # 지금 전송할 스케줄만 인덱스로 조회 (전체 서버를 훑지 않음)
+        for schedule in await self.guild_settings.get_due_stocks_schedules(current_time):
+            if schedule.channel_id:
+                guild = self.bot.get_guild(schedule.guild_id)
                 if guild:
-                    channel = guild.get_channel(channel_id)
+                    channel = guild.get_channel(schedule.channel_id)
                     if channel:
                         try:
-                            await self.send_stocks_summary(channel, indices)
+                            await self.send_stocks_summary(channel, list(schedule.indices))
                             logger.info(f'주식 정보를 {guild.name}의 {channel.name}에 전송했습니다.')
                         except Exception as e:
                             logger.error(f'주식 정보 전송 오류: {e}')
@@ -64,38 +66,6 @@ class Stocks(commands.Cog):
     async def before_stocks_task(self):
         await self.bot.wait_until_ready()
 
-    def get_stock_data(self, ticker: str):
-        """주식 데이터 가져오기"""
-        try:
-            stock = yf.Ticker(ticker)
-
-            # 최신 데이터 가져오기
-            hist = stock.history(period="2d")
-
-            if hist.empty or len(hist) < 1:
-                return None
-
-            current_price = hist['Close'].iloc[-1]
-
-            # 전일 종가와 비교
-            if len(hist) >= 2:
-                previous_price = hist['Close'].iloc[-2]
-                change = current_price - previous_price
-                change_percent = (change / previous_price) * 100
-            else:
-                change = 0
-                change_percent = 0
-
-            return {
-                'price': current_price,
-                'change': change,
-                'change_percent': change_percent
-            }
-
-        except Exception as e:
-            logger.error(f'주식 데이터 가져오기 오류 ({ticker}): {e}')
-            return None
-
     def format_price(self, price: float, ticker: str) -> str:
         """가격 포맷팅"""
         if ticker == "KRW=X":  # 원/달러 환율
@@ -116,12 +86,17 @@ class Stocks(commands.Cog):
             timestamp=discord.utils.utcnow()
         )
 
+        # 요청한 지표를 동시에 조회 (일부가 실패해도 나머지는 표시)
+        quotes = await self.quotes.get_quotes(
+            (self.indices[name] for name in indices if name in self.indices), allow_stale=False
+        )
+
         for index_name in indices:
             ticker = self.indices.get(index_name)
             if not ticker:
                 continue
 
-            data = self.get_stock_data(ticker)
+            data = quotes.get(ticker)
             if not data:
                 embed.add_field(
                     name=f"📊 {index_name}",
@@ -231,12 +206,15 @@ class Stocks(commands.Cog):
             timestamp=discord.utils.utcnow()
         )
 
+        # 요청한 지표를 동시에 조회 (일부가 실패해도 나머지는 표시)
+        quotes = await self.quotes.get_quotes(self.indices[name] for name in indices if name in self.indices)
+
         for index_name in indices:
             ticker = self.indices.get(index_name)
             if not ticker:
                 continue
 
-            data = self.get_stock_data(ticker)
+            data = quotes.get(ticker)
             if not data:
                 embed.add_field(
                     name=f"📊 {index_name}",
@@ -289,10 +267,8 @@ class Stocks(commands.Cog):
         """주식 자동 전송 스케줄 설정"""
         # 시간 형식 검증
         try:
-            hour, minute = map(int, time.split(':'))
-            if not (0 <= hour < 24 and 0 <= minute < 60):
-                raise ValueError
-        except:
+            time = normalize_time(time)
+        except ValueError:
             await interaction.response.send_message(
                 '❌ 올바른 시간 형식을 입력해주세요. (예: 09:00, 18:30)',
                 ephemeral=True
@@ -314,17 +290,7 @@ class Stocks(commands.Cog):
             return
 
         # 설정 저장
-        guild_id = str(interaction.guild.id)
-        if 'stocks_schedules' not in self.config.config:
-            self.config.config['stocks_schedules'] = {}
-
-        self.config.config['stocks_schedules'][guild_id] = {
-            'enabled': True,
-            'channel_id': channel.id,
-            'time': time,
-            'indices': valid_indices
-        }
-        self.config._save_config(self.config.config)
+        await self.guild_settings.set_stocks_schedule(interaction.guild.id, channel.id, time, valid_indices)
 
         embed = discord.Embed(
             title="✅ 주식 자동 전송 설정",
@@ -344,15 +310,10 @@ class Stocks(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def stopstocks(self, interaction: discord.Interaction):
         """주식 자동 전송 중지"""
-        guild_id = str(interaction.guild.id)
-
-        if 'stocks_schedules' not in self.config.config or guild_id not in self.config.config['stocks_schedules']:
+        if not await self.guild_settings.set_stocks_enabled(interaction.guild.id, False):
             await interaction.response.send_message('❌ 설정된 주식 스케줄이 없습니다.', ephemeral=True)
             return
 
-        self.config.config['stocks_schedules'][guild_id]['enabled'] = False
-        self.config._save_config(self.config.config)
-
         embed = discord.Embed(
             title="✅ 주식 자동 전송 중지",
             description="주식 자동 전송이 중지되었습니다.",
@@ -368,19 +329,16 @@ class Stocks(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def stocksstatus(self, interaction: discord.Interaction):
         """주식 스케줄 상태 확인"""
-        guild_id = str(interaction.guild.id)
-
-        stocks_schedules = self.config.get('stocks_schedules', default={})
-        schedule_info = stocks_schedules.get(guild_id)
+        schedule = await self.guild_settings.get_stocks_schedule(interaction.guild.id)
 
-        if not schedule_info:
+        if not schedule:
             await interaction.response.send_message('📈 설정된 주식 스케줄이 없습니다.', ephemeral=True)
             return
 
-        enabled = schedule_info.get('enabled', False)
-        channel_id = schedule_info.get('channel_id')
-        scheduled_time = schedule_info.get('time', '미설정')
-        indices = schedule_info.get('indices', [])
+        enabled = schedule.enabled
+        channel_id = schedule.channel_id
+        scheduled_time = schedule.time
+        indices = schedule.indices
 
         channel = interaction.guild.get_channel(channel_id) if channel_id else None
 
@@ -408,48 +366,68 @@ class Stocks(commands.Cog):
     @tasks.loop(minutes=5)
     async def watchlist_monitor_task(self):
         """5분마다 감시 목록의 주식들을 체크"""
-        for guild in self.bot.guilds:
-            try:
-                # 알림 설정 확인
-                alert_config = self.config.get('stock_alerts', str(guild.id), default=None)
-                if not alert_config or not alert_config.get('enabled', False):
-                    continue
+        # 1단계: 알림이 켜진 서버와 알림 채널 확인 (인덱스로 조회)
+        targets = []
+        for alert in await self.guild_settings.get_enabled_stock_alerts():
+            guild = self.bot.get_guild(alert.guild_id)
+            channel = guild.get_channel(alert.channel_id) if guild and alert.channel_id else None
+            if channel:
+                targets.append((guild, channel, alert.threshold))
+
+        if not targets:
+            return
 
-                channel_id = alert_config.get('channel_id')
-                threshold = alert_config.get('threshold', 5.0)  # 기본 5%
+        # 2단계: 모든 서버의 감시 목록을 한 번에 읽고, 여러 서버가 감시하는 종목도 한 번만 일괄 조회
+        # (알림 판단에는 만료된 값을 쓰지 않음)
+        try:
+            watchlists = await self.db.get_watchlists([guild.id for guild, _, _ in targets])
+            tickers = sorted({ticker for watchlist in watchlists.values() for ticker, _, _, _ in watchlist})
+            quotes = await self.quotes.get_quotes_batch(tickers)
+        except Exception as e:
+            logger.error(f'감시 목록 시세 조회 오류: {e}')
+            return
 
-                if not channel_id:
-                    continue
+        # 3단계: 공용 시세로 서버별 임계값을 판단하고 알림은 동시에 전송
+        observed = await asyncio.gather(*(
+            self._check_watchlist(guild, channel, threshold, watchlists[guild.id], quotes)
+            for guild, channel, threshold in targets
+        ))
 
-                channel = guild.get_channel(channel_id)
-                if not channel:
+        # 4단계: 이번 주기에 관측한 시세를 종목당 한 번, 한 트랜잭션으로 저장
+        prices = {ticker: (ticker, price, change) for tickers in observed for ticker, price, change in tickers}
+        try:
+            await self.db.update_stock_prices(list(prices.values()))
+        except Exception as e:
+            logger.error(f'감시 목록 시세 저장 오류: {e}')
+
+    async def _check_watchlist(self, guild: discord.Guild, channel: discord.TextChannel, threshold: float,
+                               watchlist: list, quotes: dict) -> list:
+        """한 서버의 감시 목록 임계값 확인 및 알림 전송 (저장할 시세 [(ticker, price, change_percent)] 반환)"""
+        observed = []
+        try:
+            for ticker, name, last_price, last_change_percent in watchlist:
+                data = quotes.get(ticker)
+                if not data:
                     continue
 
-                # 감시 목록 가져오기
-                watchlist = await self.db.get_watchlist(guild.id)
+                current_price = data['price']
+                change_percent = data['change_percent']
 
-                for ticker, name, last_price, last_change_percent in watchlist:
-                    data = self.get_stock_data(ticker)
-                    if not data:
+                # 변동률이 임계값을 초과하는지 확인
+                if abs(change_percent) >= threshold:
+                    # 이전에 알림을 보낸 적이 있는지 확인 (같은 변동률이면 중복 알림 방지)
+                    if abs(change_percent - last_change_percent) < 0.1:
                         continue
 
-                    current_price = data['price']
-                    change_percent = data['change_percent']
-
-                    # 변동률이 임계값을 초과하는지 확인
-                    if abs(change_percent) >= threshold:
-                        # 이전에 알림을 보낸 적이 있는지 확인 (같은 변동률이면 중복 알림 방지)
-                        if abs(change_percent - last_change_percent) < 0.1:
-                            continue
+                    # 알림 전송
+                    await self.send_alert(channel, ticker, name, data, threshold)
 
-                        # 알림 전송
-                        await self.send_alert(channel, ticker, name, data, threshold)
+                # 가격 업데이트 (모든 서버 확인 후 한 번에 저장)
+                observed.append((ticker, current_price, change_percent))
 
-                    # 가격 업데이트
-                    await self.db.update_stock_price(guild.id, ticker, current_price, change_percent)
-
-            except Exception as e:
-                logger.error(f'감시 목록 모니터링 오류 ({guild.name}): {e}')
+        except Exception as e:
+            logger.error(f'감시 목록 모니터링 오류 ({guild.name}): {e}')
+        return observed
 
     @watchlist_monitor_task.before_loop
     async def before_watchlist_monitor_task(self):
@@ -511,8 +489,8 @@ class Stocks(commands.Cog):
 
         # 주식 정보 확인
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            # 종목 정보와 현재가를 동시에 조회
+            info, data = await asyncio.gather(self.quotes.get_info(ticker), self.quotes.get_quote(ticker))
 
             # 이름이 제공되지 않으면 자동으로 가져오기
             if not name:
@@ -525,10 +503,9 @@ class Stocks(commands.Cog):
                 await interaction.followup.send(f'❌ {ticker}는 이미 감시 목록에 있습니다.', ephemeral=True)
                 return
 
-            # 현재 가격 가져오기
-            data = self.get_stock_data(ticker)
+            # 처음 감시하는 종목이면 현재 가격 기록 (다른 서버가 이미 감시 중이면 공용 기준값을 덮어쓰지 않음)
             if data:
-                await self.db.update_stock_price(interaction.guild.id, ticker, data['price'], data['change_percent'])
+                await self.db.seed_stock_price(ticker, data['price'], data['change_percent'])
 
             embed = discord.Embed(
                 title="✅ 주식 감시 목록 추가",
@@ -591,9 +568,11 @@ class Stocks(commands.Cog):
             timestamp=discord.utils.utcnow()
         )
 
+        # 감시 목록의 종목을 동시에 조회
+        quotes = await self.quotes.get_quotes(ticker for ticker, _, _, _ in watchlist)
+
         for ticker, name, last_price, last_change_percent in watchlist:
-            # 현재 가격 가져오기
-            data = self.get_stock_data(ticker)
+            data = quotes.get(ticker)
 
             if data:
                 price_text = self.format_price(data['price'], ticker)
@@ -633,16 +612,7 @@ class Stocks(commands.Cog):
             return
 
         # 설정 저장
-        guild_id = str(interaction.guild.id)
-        if 'stock_alerts' not in self.config.config:
-            self.config.config['stock_alerts'] = {}
-
-        self.config.config['stock_alerts'][guild_id] = {
-            'enabled': True,
-            'channel_id': channel.id,
-            'threshold': threshold
-        }
-        self.config._save_config(self.config.config)
+        await self.guild_settings.set_stock_alert(interaction.guild.id, channel.id, threshold)
 
         embed = discord.Embed(
             title="✅ 주식 알림 설정",
@@ -662,15 +632,10 @@ class Stocks(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def stopalert(self, interaction: discord.Interaction):
         """주식 알림 중지"""
-        guild_id = str(interaction.guild.id)
-
-        if 'stock_alerts' not in self.config.config or guild_id not in self.config.config['stock_alerts']:
+        if not await self.guild_settings.set_stock_alert_enabled(interaction.guild.id, False):
             await interaction.response.send_message('❌ 설정된 주식 알림이 없습니다.', ephemeral=True)
             return
 
-        self.config.config['stock_alerts'][guild_id]['enabled'] = False
-        self.config._save_config(self.config.config)
-
         embed = discord.Embed(
             title="✅ 주식 알림 중지",
             description="주식 변동 알림이 중지되었습니다.",
@@ -1,7 +1,10 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import asyncio
 import logging
+from utils.join_burst import JoinDigest, JoinRateTracker
+from utils.welcome_renderer import WelcomeRenderer
 
 logger = logging.getLogger(__name__)
 
@@ -10,25 +13,38 @@ class Welcome(commands.Cog):
         self.bot = bot
         self.config = bot.config
         self.db = bot.db
+        self.guild_settings = bot.guild_settings
+        # 10초 안에 10명 이상 참가하면 개별 환영 대신 묶음 환영 메시지로 전환
+        self.join_rate = JoinRateTracker(window=10.0, threshold=10, cooldown=30.0)
+        self.digest = JoinDigest(interval=10.0)
+        # 자동 역할 대기열은 봇 종료 시 역할 변경 큐와 함께 비우도록 봇이 소유
+        self.auto_roles = bot.auto_roles
+        # 서버별로 미리 만들어 둔 환영 임베드
+        self.renderer = WelcomeRenderer(self.guild_settings)
+
+    def cog_unload(self):
+        self.digest.close()
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """새 멤버가 서버에 참가했을 때"""
         logger.info(f'새 멤버 참가: {member.name} (ID: {member.id}) in {member.guild.name}')
 
-        welcome_config = self.config.get_welcome_config(member.guild.id)
+        # 자동 역할 대기열 등록과 환영 메시지 전송을 동시에 진행
+        # (자동 역할은 환영 메시지 설정과 관계없이 처리되며 대기열이 가득 차도 버리지 않음)
+        await asyncio.gather(self.auto_roles.put(member), self._welcome(member))
 
-        if not welcome_config.get('enabled', True):
+    async def _welcome(self, member: discord.Member):
+        welcome = await self.renderer.get(member.guild.id)
+
+        if not welcome.settings.enabled:
             logger.info('환영 메시지가 비활성화되어 있습니다.')
             return
 
         # 환영 채널 결정
         channel = None
-        welcome_channel_id = self.config.get('welcome_channel_id') or \
-                           self.config.get('guilds', str(member.guild.id), 'welcome_channel_id')
-
-        if welcome_channel_id:
-            channel = self.bot.get_channel(int(welcome_channel_id))
+        if welcome.settings.channel_id:
+            channel = self.bot.get_channel(welcome.settings.channel_id)
 
         if not channel:
             channel = member.guild.system_channel
@@ -37,52 +53,15 @@ class Welcome(commands.Cog):
             logger.warning(f'환영 메시지를 보낼 채널을 찾을 수 없습니다: {member.guild.name}')
             return
 
+        if self.join_rate.record(member.guild.id):
+            # 참가가 몰리는 동안은 주기적으로 묶어서 환영
+            self.digest.add(channel, member, welcome.prototype.color)
+            return
+
         try:
-            # 환영 메시지 생성
-            title = welcome_config.get('title', '🎉 새로운 멤버가 도착했습니다!')
-            description = welcome_config.get('description', '{mention}님, 환영합니다!')
-            description = description.format(
-                mention=member.mention,
-                name=member.name,
-                server=member.guild.name,
-                member_count=member.guild.member_count
-            )
-
-            color = welcome_config.get('color', 0x00ff00)
-            embed = discord.Embed(
-                title=title,
-                description=description,
-                color=discord.Color(color)
-            )
-
-            if welcome_config.get('show_avatar', True):
-                embed.set_thumbnail(url=member.display_avatar.url)
-
-            if welcome_config.get('show_member_count', True):
-                embed.add_field(
-                    name="서버 정보",
-                    value=f"현재 멤버 수: {member.guild.member_count}명",
-                    inline=False
-                )
-
-            footer_text = welcome_config.get('footer', '즐거운 시간 되세요!')
-            embed.set_footer(text=footer_text)
-            embed.timestamp = discord.utils.utcnow()
-
-            await channel.send(embed=embed)
+            await channel.send(embed=welcome.render(member, member.guild))
             logger.info(f'환영 메시지 전송 완료: {member.name}')
 
-            # 자동 역할 부여
-            auto_role_id = await self.db.get_auto_role(member.guild.id)
-            if auto_role_id:
-                role = member.guild.get_role(auto_role_id)
-                if role:
-                    try:
-                        await member.add_roles(role, reason="자동 역할 부여")
-                        logger.info(f'{member.name}에게 자동 역할 {role.name} 부여')
-                    except Exception as e:
-                        logger.error(f'자동 역할 부여 실패: {e}')
-
         except Exception as e:
             logger.error(f'환영 메시지 전송 중 오류: {e}')
 
@@ -124,7 +103,8 @@ class Welcome(commands.Cog):
             await interaction.response.send_message('❌ 변경할 설정을 하나 이상 입력해주세요.', ephemeral=True)
             return
 
-        self.config.set_welcome_config(interaction.guild.id, **updates)
+        await self.guild_settings.set_welcome(interaction.guild.id, **updates)
+        self.renderer.invalidate(interaction.guild.id)
 
         embed = discord.Embed(
             title="✅ 환영 메시지 설정 완료",
@@ -142,37 +122,8 @@ class Welcome(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def welcometest(self, interaction: discord.Interaction):
         """현재 환영 메시지 설정 테스트"""
-        welcome_config = self.config.get_welcome_config(interaction.guild.id)
-
-        title = welcome_config.get('title', '🎉 새로운 멤버가 도착했습니다!')
-        description = welcome_config.get('description', '{mention}님, 환영합니다!')
-        description = description.format(
-            mention=interaction.user.mention,
-            name=interaction.user.name,
-            server=interaction.guild.name,
-            member_count=interaction.guild.member_count
-        )
-
-        color = welcome_config.get('color', 0x00ff00)
-        embed = discord.Embed(
-            title=title,
-            description=description,
-            color=discord.Color(color)
-        )
-
-        if welcome_config.get('show_avatar', True):
-            embed.set_thumbnail(url=interaction.user.display_avatar.url)
-
-        if welcome_config.get('show_member_count', True):
-            embed.add_field(
-                name="서버 정보",
-                value=f"현재 멤버 수: {interaction.guild.member_count}명",
-                inline=False
-            )
-
-        footer_text = welcome_config.get('footer', '즐거운 시간 되세요!')
-        embed.set_footer(text=footer_text)
-        embed.timestamp = discord.utils.utcnow()
+        welcome = await self.renderer.get(interaction.guild.id)
+        embed = welcome.render(interaction.user, interaction.guild)
 
         await interaction.response.send_message("환영 메시지 미리보기:", embed=embed, ephemeral=True)
 
@@ -181,14 +132,8 @@ class Welcome(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def welcomechannel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         """환영 메시지 채널 설정"""
-        guild_str = str(interaction.guild.id)
-        if 'guilds' not in self.config.config:
-            self.config.config['guilds'] = {}
-        if guild_str not in self.config.config['guilds']:
-            self.config.config['guilds'][guild_str] = {}
-
-        self.config.config['guilds'][guild_str]['welcome_channel_id'] = channel.id
-        self.config._save_config(self.config.config)
+        await self.guild_settings.set_welcome_channel(interaction.guild.id, channel.id)
+        self.renderer.invalidate(interaction.guild.id)
 
         await interaction.response.send_message(
             f'✅ 환영 메시지 채널이 {channel.mention}로 설정되었습니다.',
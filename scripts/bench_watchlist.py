@@ -0,0 +1,111 @@
+"""감시 목록 모니터링 오프라인 벤치마크 (replay 제공자, 네트워크 불필요)
+
+감시 목록 모니터와 같은 순서(감시 목록 일괄 조회 -> 종목 일괄 시세 조회 -> 시세 일괄 저장)로
+임시 DB에서 여러 주기를 실행하고 주기별 소요 시간과 캐시/조회 통계를 출력
+
+예: python scripts/bench_watchlist.py --tickers 10000 --guilds 2000 --per-guild 10 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+from utils.quote_cache import DEFAULT_TTLS, QuoteCache
+from utils.quote_providers import ReplayProvider
+from utils.quote_service import QuoteService
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='감시 목록 모니터링 오프라인 벤치마크')
+    parser.add_argument('--tickers', type=int, default=10000, help='서로 다른 종목 수')
+    parser.add_argument('--guilds', type=int, default=2000, help='알림이 켜진 서버 수')
+    parser.add_argument('--per-guild', type=int, default=10, help='서버당 감시 종목 수')
+    parser.add_argument('--cycles', type=int, default=3, help='모니터링 주기 수 (주기마다 캐시를 비움)')
+    parser.add_argument('--latency', type=float, default=0.2, help='제공자 호출당 지연(초)')
+    parser.add_argument('--jitter', type=float, default=0.05, help='지연 변동폭(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='제공자 호출 실패 확률')
+    parser.add_argument('--workers', type=int, default=4, help='시세 조회 스레드 수')
+    parser.add_argument('--batch-size', type=int, default=100, help='일괄 조회 묶음 크기')
+    parser.add_argument('--seed', type=int, default=1, help='재현용 시드')
+    parser.add_argument('--replay', help='재생 시세 파일 (없으면 종목별 가격 흐름 생성)')
+    return parser.parse_args()
+
+async def populate(db: Database, args) -> int:
+    """서버별 감시 목록과 알림 설정 생성 (감시 행 수 반환)"""
+    rng = random.Random(args.seed)
+    tickers = [f'T{i:05d}' for i in range(args.tickers)]
+    rows = []
+    for guild_id in range(1, args.guilds + 1):
+        for ticker in rng.sample(tickers, min(args.per_guild, len(tickers))):
+            rows.append((guild_id, ticker, ticker))
+
+    async with db._write() as conn:
+        await conn.executemany('INSERT OR IGNORE INTO stock_watchlist (guild_id, ticker, name) VALUES (?, ?, ?)', rows)
+        await conn.executemany(
+            'INSERT INTO stock_alerts (guild_id, enabled, channel_id, threshold) VALUES (?, 1, ?, 5.0)',
+            [(guild_id, guild_id) for guild_id in range(1, args.guilds + 1)]
+        )
+    return len(rows)
+
+async def run_cycle(db: Database, quotes: QuoteCache, guild_ids: list) -> dict:
+    """모니터링 한 주기 (단계별 소요 시간 반환)"""
+    started = time.perf_counter()
+    watchlists = await db.get_watchlists(guild_ids)
+    loaded = time.perf_counter()
+
+    tickers = sorted({ticker for watchlist in watchlists.values() for ticker, _, _, _ in watchlist})
+    results = await quotes.get_quotes_batch(tickers)
+    fetched = time.perf_counter()
+
+    prices = [(ticker, data['price'], data['change_percent']) for ticker, data in results.items() if data]
+    await db.update_stock_prices(prices)
+    saved = time.perf_counter()
+
+    return {
+        'tickers': len(tickers),
+        'quotes': len(prices),
+        'load_s': loaded - started,
+        'fetch_s': fetched - loaded,
+        'save_s': saved - fetched,
+        'total_s': saved - started,
+    }
+
+async def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    directory = tempfile.mkdtemp(prefix='bench-watchlist-')
+    db = Database(os.path.join(directory, 'bench.db'))
+    await db.setup()
+    provider = ReplayProvider(args.replay, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, seed=args.seed)
+    # 유효 시간을 0으로 두어 매 주기 캐시 없이 제공자에서 다시 조회
+    quotes = QuoteCache(QuoteService(provider, max_workers=args.workers, batch_size=args.batch_size),
+                        ttls={name: 0 for name in DEFAULT_TTLS}, max_size=args.tickers)
+
+    try:
+        watch_rows = await populate(db, args)
+        print(f'서버 {args.guilds}개, 감시 행 {watch_rows}개, 종목 {args.tickers}개 '
+              f'(지연 {args.latency}±{args.jitter}초, 오류 확률 {args.error_rate})')
+
+        guild_ids = list(range(1, args.guilds + 1))
+        for cycle in range(1, args.cycles + 1):
+            result = await run_cycle(db, quotes, guild_ids)
+            print(f'주기 {cycle}: 종목 {result["tickers"]}개 중 {result["quotes"]}개 조회, '
+                  f'{result["total_s"]:.2f}초 (목록 {result["load_s"]:.2f}, 시세 {result["fetch_s"]:.2f}, '
+                  f'저장 {result["save_s"]:.2f}), {result["tickers"] / result["total_s"]:.0f}종목/초')
+
+        print(json.dumps(quotes.get_stats(), ensure_ascii=False, indent=2))
+    finally:
+        quotes.close()
+        await db.close()
+
+if __name__ == '__main__':
+    asyncio.run(main())
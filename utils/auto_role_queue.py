@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import discord
+
+logger = logging.getLogger(__name__)
+
+class AutoRoleQueue:
+    """신규 멤버 자동 역할 부여 대기열 (가득 차면 버리지 않고 자리가 날 때까지 대기)
+
+    작업자는 자동 역할을 확인해 역할 변경 큐에 넘기기만 하고 결과를 기다리지 않음
+    (실제 부여는 역할 변경 큐가 병합 구간마다 처리하므로 참가가 몰려도 작업자가 막히지 않음)
+    """
+
+    def __init__(self, db, role_queue, maxsize: int = 1000, workers: int = 2):
+        self.db = db
+        self.role_queue = role_queue
+        self._queue = asyncio.Queue(maxsize=maxsize)
+        self.worker_count = workers
+        self._workers = []
+        self._stats = {'queued': 0, 'assigned': 0, 'skipped': 0, 'failed': 0, 'full_waits': 0, 'max_depth': 0}
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats['depth'] = self._queue.qsize()
+        return stats
+
+    async def put(self, member: discord.Member):
+        """자동 역할 부여 예약"""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+        if self._queue.full():
+            self._stats['full_waits'] += 1
+        await self._queue.put(member)
+        self._stats['queued'] += 1
+        self._stats['max_depth'] = max(self._stats['max_depth'], self._queue.qsize())
+
+    async def _worker(self):
+        while True:
+            member = await self._queue.get()
+            try:
+                await self._assign(member)
+            except Exception as e:
+                self._stats['failed'] += 1
+                logger.error(f'자동 역할 부여 실패 ({member}): {e}')
+            finally:
+                self._queue.task_done()
+
+    async def _assign(self, member: discord.Member):
+        role_id = await self.db.get_auto_role(member.guild.id)
+        role = member.guild.get_role(role_id) if role_id else None
+        # 대기 중 서버를 나간 멤버는 건너뜀
+        if role is None or member.guild.get_member(member.id) is None:
+            self._stats['skipped'] += 1
+            return
+
+        self.role_queue.queue_add(member, role, reason="자동 역할 부여")
+        self._stats['assigned'] += 1
+        logger.info(f'{member.name}에게 자동 역할 {role.name} 부여 예약')
+
+    async def close(self, timeout: float = 10.0):
+        """대기 중인 멤버를 역할 변경 큐로 모두 넘긴 뒤 작업자 중지 (역할 변경 큐를 닫기 전에 호출)"""
+        if self._workers and not self._queue.empty():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        if not self._queue.empty():
+            logger.warning(f'자동 역할 부여 대기 중이던 {self._queue.qsize()}명을 {timeout}초 안에 처리하지 못했습니다')
+        logger.info(f'자동 역할 대기열 종료 (통계: {self.get_stats()})')
@@ -0,0 +1,283 @@
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+import discord
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class BulkRoleJob:
+    """대량 역할 작업 (bulk_role_jobs 테이블 한 행)"""
+    id: Optional[int]
+    guild_id: int
+    channel_id: int
+    role_id: int
+    action: str
+    filter_role_id: Optional[int] = None
+    joined_after: Optional[datetime] = None
+    joined_before: Optional[datetime] = None
+    min_level: Optional[int] = None
+    last_member_id: int = 0
+    processed: int = 0
+    changed: int = 0
+    failed: int = 0
+    status: str = 'running'
+
+    @classmethod
+    def from_row(cls, row):
+        job = cls(*row)
+        if isinstance(job.joined_after, str):
+            job.joined_after = datetime.fromisoformat(job.joined_after)
+        if isinstance(job.joined_before, str):
+            job.joined_before = datetime.fromisoformat(job.joined_before)
+        return job
+
+    def describe_filters(self, guild: discord.Guild) -> str:
+        """필터 조건 설명"""
+        filters = []
+        if self.filter_role_id:
+            role = guild.get_role(self.filter_role_id)
+            filters.append(f"역할: {role.mention if role else self.filter_role_id}")
+        if self.joined_after:
+            filters.append(f"가입: {self.joined_after.strftime('%Y-%m-%d')} 이후")
+        if self.joined_before:
+            filters.append(f"가입: {self.joined_before.strftime('%Y-%m-%d')} 이전")
+        if self.min_level is not None:
+            filters.append(f"레벨: {self.min_level} 이상")
+        return ", ".join(filters) if filters else "전체 멤버"
+
+class BulkRoleRunner:
+    """대량 역할 작업 실행기 (청크 단위 진행 저장, rate limit에 맞춰 동시 작업 수 조절)"""
+
+    def __init__(self, db, role_queue, max_workers: int = 5, chunk_size: int = 100,
+                 slow_request: float = 2.0, progress_interval: float = 5.0, scan_batch: int = 5000):
+        self.db = db
+        # 역할 변경은 다른 기능과 같은 역할 변경 큐로 보내 같은 멤버에 대한 요청과 합쳐지고 재시도 대기를 공유
+        self.role_queue = role_queue
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        # 요청이 이 시간(초)보다 오래 걸리면 (큐 병합 대기 제외) rate limit 대기로 보고 동시 작업 수를 줄임
+        self.slow_request = slow_request
+        self.progress_interval = progress_interval
+        # 대상 멤버를 찾을 때 이 수만큼 확인할 때마다 이벤트 루프에 양보
+        self.scan_batch = scan_batch
+        self._tasks = {}
+        self._cancelled = set()
+
+    def is_running(self, job_id: int) -> bool:
+        return job_id in self._tasks
+
+    async def _level_user_ids(self, guild: discord.Guild, job: BulkRoleJob):
+        if job.min_level is None:
+            return None
+        return await self.db.get_user_ids_with_min_level(guild.id, job.min_level)
+
+    def _matches(self, member: discord.Member, job: BulkRoleJob, level_user_ids) -> bool:
+        """필터와 일치하고 변경이 필요한 멤버인지"""
+        if member.bot:
+            return False
+        if job.filter_role_id and member.get_role(job.filter_role_id) is None:
+            return False
+        if job.joined_after and (member.joined_at is None or member.joined_at < job.joined_after):
+            return False
+        if job.joined_before and (member.joined_at is None or member.joined_at > job.joined_before):
+            return False
+        if level_user_ids is not None and member.id not in level_user_ids:
+            return False
+        has_role = member.get_role(job.role_id) is not None
+        return has_role != (job.action == 'add')
+
+    async def _matching_member_ids(self, guild: discord.Guild, job: BulkRoleJob, level_user_ids) -> list:
+        """대상 멤버 ID 목록 (ID 오름차순, scan_batch명마다 이벤트 루프에 양보)"""
+        members = guild.members
+        member_ids = []
+        for start in range(0, len(members), self.scan_batch):
+            member_ids.extend(
+                member.id for member in members[start:start + self.scan_batch]
+                if self._matches(member, job, level_user_ids)
+            )
+            await asyncio.sleep(0)
+        member_ids.sort()
+        return member_ids
+
+    async def preview(self, guild: discord.Guild, job: BulkRoleJob, limit: int = 10):
+        """(대상 인원, ID가 가장 작은 limit명의 멤버)"""
+        member_ids = await self._matching_member_ids(guild, job, await self._level_user_ids(guild, job))
+        members = [guild.get_member(member_id) for member_id in member_ids[:limit]]
+        return len(member_ids), [member for member in members if member]
+
+    def start(self, guild: discord.Guild, job: BulkRoleJob, channel=None):
+        """작업을 백그라운드에서 시작"""
+        task = asyncio.create_task(self._run(guild, job, channel))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    async def cancel(self, job_id: int) -> bool:
+        """진행 중인 작업 취소 (처리 중이던 멤버 작업까지 정리된 뒤 반환)"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.db.set_bulk_role_job_status(job_id, 'cancelled')
+        return task is not None
+
+    def close(self):
+        """실행 중인 작업 중단 (상태는 running으로 남아 재시작 시 이어서 실행)"""
+        for task in self._tasks.values():
+            task.cancel()
+
+    def _progress_embed(self, guild: discord.Guild, job: BulkRoleJob, total: int, workers: int, done: bool = False):
+        role = guild.get_role(job.role_id)
+        action_text = "부여" if job.action == 'add' else "제거"
+        if job.status == 'completed':
+            title, color = "✅ 대량 역할 작업 완료", discord.Color.green()
+        elif job.status == 'cancelled':
+            title, color = "⏹️ 대량 역할 작업 취소됨", discord.Color.orange()
+        elif job.status == 'failed':
+            title, color = "❌ 대량 역할 작업 실패", discord.Color.red()
+        else:
+            title, color = "⏳ 대량 역할 작업 진행 중", discord.Color.blue()
+
+        embed = discord.Embed(
+            title=title,
+            description=f"{role.mention if role else job.role_id} 역할 {action_text} (작업 #{job.id})",
+            color=color
+        )
+        embed.add_field(name="대상", value=job.describe_filters(guild), inline=False)
+        embed.add_field(name="진행", value=f"{job.processed:,} / {total:,}", inline=True)
+        embed.add_field(name="변경", value=f"{job.changed:,}", inline=True)
+        embed.add_field(name="실패", value=f"{job.failed:,}", inline=True)
+        if not done:
+            embed.set_footer(text=f"동시 작업 수: {workers}")
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+
+    async def _run(self, guild: discord.Guild, job: BulkRoleJob, channel):
+        role = guild.get_role(job.role_id)
+        if role is None:
+            job.status = 'failed'
+            await self.db.set_bulk_role_job_status(job.id, 'failed')
+            logger.error(f'대량 역할 작업 #{job.id}: 역할을 찾을 수 없습니다 ({job.role_id})')
+            return
+
+        # 대상 목록은 시작할 때 한 번만 만들고, 이어서 실행하면 저장된 진행 위치 다음부터 처리
+        member_ids = await self._matching_member_ids(guild, job, await self._level_user_ids(guild, job))
+        member_ids = member_ids[bisect.bisect_right(member_ids, job.last_member_id):]
+        total = job.processed + len(member_ids)
+        workers = self.max_workers
+
+        message = None
+        last_progress = 0.0
+        if channel:
+            try:
+                message = await channel.send(embed=self._progress_embed(guild, job, total, workers))
+            except discord.HTTPException as e:
+                logger.warning(f'대량 역할 작업 #{job.id} 진행 메시지 전송 실패: {e}')
+
+        try:
+            for start in range(0, len(member_ids), self.chunk_size):
+                chunk = member_ids[start:start + self.chunk_size]
+                workers = await self._apply_chunk(guild, role, job, chunk, workers)
+
+                # 청크가 끝날 때마다 진행 위치 저장 (재시작 시 이 위치부터 이어서 실행)
+                job.last_member_id = chunk[-1]
+                await self.db.update_bulk_role_job(job.id, job.last_member_id, job.processed, job.changed, job.failed)
+
+                if message and time.monotonic() - last_progress >= self.progress_interval:
+                    last_progress = time.monotonic()
+                    try:
+                        await message.edit(embed=self._progress_embed(guild, job, total, workers))
+                    except discord.HTTPException:
+                        pass
+
+            job.status = 'completed'
+            await self.db.update_bulk_role_job(job.id, job.last_member_id, job.processed, job.changed, job.failed, 'completed')
+            logger.info(f'대량 역할 작업 #{job.id} 완료: {job.changed}명 변경, {job.failed}명 실패')
+        except asyncio.CancelledError:
+            # 명령으로 취소된 경우가 아니면 (봇 종료) running 상태로 남겨 재시작 시 이어서 실행
+            if job.id in self._cancelled:
+                self._cancelled.discard(job.id)
+                job.status = 'cancelled'
+                await self.db.update_bulk_role_job(job.id, job.last_member_id, job.processed, job.changed, job.failed, 'cancelled')
+            raise
+        except Exception as e:
+            job.status = 'failed'
+            await self.db.update_bulk_role_job(job.id, job.last_member_id, job.processed, job.changed, job.failed, 'failed')
+            logger.error(f'대량 역할 작업 #{job.id} 오류: {e}')
+        finally:
+            if message:
+                try:
+                    await message.edit(embed=self._progress_embed(guild, job, total, workers, done=job.status != 'running'))
+                except Exception:
+                    pass
+
+    async def _apply_chunk(self, guild: discord.Guild, role: discord.Role, job: BulkRoleJob,
+                           member_ids: list, workers: int) -> int:
+        """청크 하나를 제한된 동시 작업 수로 처리 (AIMD 방식으로 동시 작업 수 조절)"""
+        pending = list(reversed(member_ids))
+        in_flight = set()
+        fast_streak = 0
+
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < workers:
+                    member = guild.get_member(pending.pop())
+                    if member is None:
+                        job.processed += 1
+                        continue
+                    in_flight.add(asyncio.create_task(self._apply_member(member, role, job.action, job.id)))
+
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    changed, elapsed, rate_limited = task.result()
+                    job.processed += 1
+                    if changed:
+                        job.changed += 1
+                    elif changed is None:
+                        job.failed += 1
+
+                    if rate_limited or elapsed >= self.slow_request:
+                        workers = max(1, workers // 2)
+                        fast_streak = 0
+                    else:
+                        fast_streak += 1
+                        if fast_streak >= workers and workers < self.max_workers:
+                            workers += 1
+                            fast_streak = 0
+        except asyncio.CancelledError:
+            # 작업이 취소되면 처리 중이던 멤버 작업도 취소하고 끝날 때까지 기다림
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            raise
+
+        return workers
+
+    async def _apply_member(self, member: discord.Member, role: discord.Role, action: str, job_id: int):
+        """(변경 여부 또는 실패 시 None, 소요 시간, rate limit 여부)"""
+        if (member.get_role(role.id) is not None) == (action == 'add'):
+            return False, 0.0, False
+
+        started = time.monotonic()
+        reason = f'대량 역할 작업 #{job_id}'
+        try:
+            if action == 'add':
+                changed = await self.role_queue.add(member, role, reason=reason)
+            else:
+                changed = await self.role_queue.remove(member, role, reason=reason)
+            # 큐가 요청을 모으는 대기 시간은 빼고 요청 자체의 소요 시간만 판단에 사용
+            return changed, max(0.0, time.monotonic() - started - self.role_queue.window), False
+        except discord.HTTPException as e:
+            logger.warning(f'대량 역할 작업 #{job_id} 실패 ({member}): {e}')
+            return None, max(0.0, time.monotonic() - started - self.role_queue.window), e.status == 429
@@ -1,13 +1,46 @@
 import json
 import os
 import logging
+from dataclasses import dataclass
 from typing import Any, Optional
+from utils.config_watcher import MISSING
+from utils.config_writer import ConfigWriter
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True, slots=True)
+class LevelingSettings:
+    """서버별 레벨링 설정 스냅샷 (GuildSettingsStore에서 생성)"""
+    enabled: bool = True
+    xp_per_message: int = 10
+    xp_cooldown: float = 60
+    announce_level_up: bool = True
+    level_up_message: str = '🎊 {mention}님이 레벨 {level}에 도달했습니다!'
+
+@dataclass(frozen=True, slots=True)
+class WelcomeSettings:
+    """서버별 환영 메시지 설정 스냅샷 (GuildSettingsStore에서 생성)"""
+    enabled: bool = True
+    title: str = '🎉 새로운 멤버가 도착했습니다!'
+    description: str = '{mention}님, 환영합니다!'
+    color: int = 0x00ff00
+    footer: str = '즐거운 시간 되세요!'
+    show_member_count: bool = True
+    show_avatar: bool = True
+    channel_id: Optional[int] = None
+
 class Config:
-    def __init__(self, config_path='data/config.json'):
+    def __init__(self, config_path='data/config.json', save_delay=0.5):
         self.config_path = config_path
+        # ConfigMap 디렉터리처럼 쓸 수 없는 위치면 변경 사항은 메모리에만 반영
+        directory = os.path.dirname(config_path) or '.'
+        self.read_only = os.path.isdir(directory) and not os.access(directory, os.W_OK)
+        if self.read_only:
+            logger.info(f'설정 파일이 읽기 전용 위치에 있어 변경 사항은 저장하지 않습니다: {config_path}')
+        # 변경 사항은 save_delay초 동안 모았다가 작업 스레드에서 원자적으로 기록
+        self._writer = ConfigWriter(config_path, delay=save_delay)
+        # 설정이 바뀔 때마다 증가 (서버별 설정 캐시가 전역 설정 변경을 알아채는 용도)
+        self.version = 0
         self.config = self._load_config()
 
     def _load_config(self) -> dict:
@@ -53,14 +86,22 @@ class Config:
         }
 
     def _save_config(self, config: dict):
-        """설정 파일 저장"""
-        try:
-            os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-            logger.info(f'설정 파일 저장 완료: {self.config_path}')
-        except Exception as e:
-            logger.error(f'설정 파일 저장 실패: {e}')
+        """설정 파일 저장 예약 (이벤트 루프를 막지 않음)"""
+        self.invalidate_settings()
+        if not self.read_only:
+            self._writer.schedule(config)
+
+    def get_save_stats(self) -> dict:
+        """설정 파일 저장 통계"""
+        return self._writer.get_stats()
+
+    async def flush(self):
+        """예약된 설정 저장을 즉시 기록"""
+        await self._writer.flush()
+
+    async def close(self):
+        """남은 설정 변경 기록 후 저장 작업 종료"""
+        await self._writer.close()
 
     def get(self, *keys, default=None) -> Any:
         """설정 값 가져오기 (중첩된 키 지원)"""
@@ -89,30 +130,42 @@ class Config:
         self._save_config(self.config)
         logger.info(f'설정 변경: {".".join(keys)} = {value}')
 
-    def get_welcome_config(self, guild_id: Optional[int] = None) -> dict:
-        """환영 메시지 설정 가져오기 (서버별 설정 지원)"""
-        if guild_id:
-            guild_welcome = self.get('guilds', str(guild_id), 'welcome')
-            if guild_welcome:
-                return guild_welcome
-        return self.get('welcome', default={})
-
-    def set_welcome_config(self, guild_id: int, **kwargs):
-        """서버별 환영 메시지 설정"""
-        guild_str = str(guild_id)
-        if 'guilds' not in self.config:
-            self.config['guilds'] = {}
-        if guild_str not in self.config['guilds']:
-            self.config['guilds'][guild_str] = {}
-        if 'welcome' not in self.config['guilds'][guild_str]:
-            self.config['guilds'][guild_str]['welcome'] = {}
-
-        # 기존 설정 유지하면서 업데이트
-        self.config['guilds'][guild_str]['welcome'].update(kwargs)
-        self._save_config(self.config)
-        logger.info(f'서버 {guild_id}의 환영 메시지 설정 변경')
+    def invalidate_settings(self):
+        """전역 설정 위에 합쳐 둔 서버별 설정 스냅샷 무효화 (다음 조회 시 다시 합침)"""
+        self.version += 1
+
+    def apply_changes(self, changes: list) -> list:
+        """[(키 경로, 이전 값, 새 값)]을 현재 설정에 반영하고 영향받는 스냅샷만 무효화
+
+        현재 값이 이미 새 값과 같은 항목(봇이 직접 저장한 변경 등)은 건너뛰고, 실제로 반영한 항목만 반환
+        """
+        applied = []
+        for path, before, after in changes:
+            parent = self.config
+            for key in path[:-1]:
+                if not isinstance(parent.get(key), dict):
+                    if after is MISSING:
+                        parent = None
+                        break
+                    parent[key] = {}
+                parent = parent[key]
+
+            current = parent.get(path[-1], MISSING) if parent is not None else MISSING
+            if current == after:
+                continue
+            if after is MISSING:
+                del parent[path[-1]]
+            else:
+                parent[path[-1]] = after
+            applied.append((path, current, after))
+
+        if any(path[0] in ('leveling', 'welcome', 'welcome_channel_id') for path, _, _ in applied):
+            # 서버별 레벨링/환영 메시지 스냅샷은 버전이 바뀌면 다음 조회 시 다시 합쳐짐
+            self.version += 1
+        return applied
 
     def reload(self):
         """설정 파일 다시 로드"""
         self.config = self._load_config()
+        self.invalidate_settings()
         logger.info('설정 파일 다시 로드됨')
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# 변경 전후 값 중 키가 없는 쪽을 나타내는 값
+MISSING = object()
+
+def diff_config(old: dict, new: dict, prefix: tuple = ()) -> list:
+    """두 설정의 구조적 차이 [(키 경로, 이전 값, 새 값)] (딕셔너리는 하위 키 단위로 비교)"""
+    changes = []
+    for key in old.keys() | new.keys():
+        path = prefix + (key,)
+        before = old.get(key, MISSING)
+        after = new.get(key, MISSING)
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.extend(diff_config(before, after, path))
+        elif before != after:
+            changes.append((path, before, after))
+    return sorted(changes, key=lambda change: change[0])
+
+def _short(value) -> str:
+    if value is MISSING:
+        return '(없음)'
+    text = repr(value)
+    return text if len(text) <= 80 else text[:77] + '...'
+
+class ConfigWatcher:
+    """설정 파일 변경 감시 (stat 폴링, ConfigMap 심볼릭 링크 교체 포함) 후 바뀐 키만 반영"""
+
+    def __init__(self, config, interval: float = 5.0):
+        self.config = config
+        self.interval = interval
+        self._task = None
+        self._signature = None
+        # 마지막으로 읽은 파일 내용 (메모리 설정과의 비교가 아닌 파일끼리 비교해 외부 변경만 찾음)
+        self._snapshot = None
+        self._stats = {'checks': 0, 'reloads': 0, 'changes': 0, 'errors': 0}
+
+    def get_stats(self) -> dict:
+        return dict(self._stats)
+
+    def _stat(self):
+        path = self.config.config_path
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        # ConfigMap은 ..data 심볼릭 링크를 새 디렉터리로 바꾸므로 실제 경로와 inode도 함께 비교
+        return os.path.realpath(path), st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read(self):
+        with open(self.config.config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def start(self):
+        """감시 시작"""
+        if self._task is not None:
+            return
+        self._signature = self._stat()
+        try:
+            self._snapshot = self._read()
+        except (OSError, ValueError):
+            self._snapshot = {}
+        self._task = asyncio.create_task(self._run())
+        logger.info(f'설정 파일 변경 감시 시작: {self.config.config_path} ({self.interval}초 간격)')
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f'설정 파일 변경 확인 오류: {e}')
+
+    def check(self) -> list:
+        """파일이 바뀌었으면 다시 읽어 반영하고 실제로 바뀐 키 경로 목록 반환"""
+        self._stats['checks'] += 1
+        signature = self._stat()
+        # 교체 도중 파일이 잠시 없을 수 있으므로 다음 확인까지 대기
+        if signature is None or signature == self._signature:
+            return []
+
+        try:
+            new = self._read()
+        except (OSError, ValueError) as e:
+            # 잘못된 파일은 반영하지 않고 현재 설정 유지 (수정되면 다시 시도)
+            self._stats['errors'] += 1
+            logger.error(f'변경된 설정 파일을 읽을 수 없어 현재 설정을 유지합니다: {e}')
+            self._signature = signature
+            return []
+
+        self._signature = signature
+        self._stats['reloads'] += 1
+        changes = diff_config(self._snapshot, new)
+        self._snapshot = new
+
+        applied = self.config.apply_changes(changes)
+        self._stats['changes'] += len(applied)
+        for path, before, after in applied:
+            logger.info(f'설정 변경 감지: {".".join(map(str, path))}: {_short(before)} -> {_short(after)}')
+        return [path for path, _, _ in applied]
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
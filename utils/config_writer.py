@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+def write_atomic(path: str, data: str):
+    """임시 파일에 기록 후 fsync, 이름 변경으로 교체 (중간에 종료되어도 기존 파일 유지)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # 이름 변경까지 디스크에 반영 (디렉터리 fsync를 지원하지 않는 환경은 무시)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+class ConfigWriter:
+    """설정 파일 지연 저장 (짧은 구간의 변경을 합쳐 한 번만 직렬화하고 작업 스레드에서 원자적 기록)"""
+
+    def __init__(self, path: str, delay: float = 0.5):
+        self.path = path
+        self.delay = delay
+        # 기록 순서를 보장하기 위해 작업 스레드는 하나만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='config-writer')
+        self._pending = None
+        self._task = None
+        self._writing = None
+        self._stats = {
+            'requests': 0,
+            'writes': 0,
+            'failures': 0,
+            # 기록 전에 다음 변경이 들어와 따로 기록되지 않은 요청 수
+            'merged': 0,
+            # 이벤트 루프에서 직렬화에 쓴 시간
+            'serialize_ms_max': 0.0,
+            # 작업 스레드에서 파일 기록에 쓴 시간 (이전에는 이벤트 루프를 멈추던 시간)
+            'offloop_ms_total': 0.0,
+            'offloop_ms_max': 0.0,
+        }
+
+    def get_stats(self) -> dict:
+        """저장 통계"""
+        return dict(self._stats)
+
+    def schedule(self, config: dict):
+        """저장 예약 (delay초 안에 들어온 요청은 마지막 설정 한 번으로 기록)"""
+        self._stats['requests'] += 1
+        if self._pending is not None:
+            self._stats['merged'] += 1
+        self._pending = config
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 시작 전 (최초 기본 설정 생성 등)에는 바로 기록
+            config, self._pending = self._pending, None
+            self._record(self._serialize(config))
+            return
+
+        if self._task is None:
+            self._task = loop.create_task(self._write_later())
+
+    async def _write_later(self):
+        await asyncio.sleep(self.delay)
+        # 기록 중 들어온 요청은 다음 예약으로 분리
+        self._task = None
+        await self._write_pending()
+
+    async def _write_pending(self):
+        config, self._pending = self._pending, None
+        if config is None:
+            return
+
+        # 설정 딕셔너리는 이벤트 루프에서 바뀌므로 직렬화는 루프에서 끝내고 작업 스레드에는 문자열만 넘김
+        # (다른 스레드에서 직렬화하면 도중에 바뀐 값이 섞인 내용이 오류 없이 기록될 수 있음)
+        try:
+            data = self._serialize(config)
+        except Exception as e:
+            self._stats['failures'] += 1
+            logger.error(f'설정 파일 저장 실패: {e}')
+            return
+
+        loop = asyncio.get_running_loop()
+        self._writing = loop.run_in_executor(self._executor, self._record, data)
+        try:
+            await self._writing
+        finally:
+            self._writing = None
+
+    def _serialize(self, config: dict) -> str:
+        started = time.perf_counter()
+        data = json.dumps(config, ensure_ascii=False, indent=2)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats['serialize_ms_max'] = max(self._stats['serialize_ms_max'], elapsed_ms)
+        return data
+
+    def _record(self, data: str):
+        started = time.perf_counter()
+        try:
+            write_atomic(self.path, data)
+        except Exception as e:
+            self._stats['failures'] += 1
+            logger.error(f'설정 파일 저장 실패: {e}')
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats['writes'] += 1
+        self._stats['offloop_ms_total'] += elapsed_ms
+        self._stats['offloop_ms_max'] = max(self._stats['offloop_ms_max'], elapsed_ms)
+        logger.info(f'설정 파일 저장 완료: {self.path} ({elapsed_ms:.1f}ms)')
+
+    async def flush(self):
+        """예약된 저장을 즉시 기록하고 완료까지 대기"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writing is not None:
+            await asyncio.shield(self._writing)
+        await self._write_pending()
+
+    async def close(self):
+        """남은 변경 기록 후 작업 스레드 종료"""
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        logger.info(f'설정 파일 저장 통계: {self.get_stats()}')
@@ -0,0 +1,65 @@
+import time
+
+class CooldownTracker:
+    """두 세대 버킷으로 지연 만료되는 쿨다운 기록 (monotonic 시간, 최대 항목 수 제한)"""
+
+    def __init__(self, window: float = 60.0, max_entries: int = 100000):
+        # 한 세대의 길이 (사용되는 가장 긴 쿨다운 이상으로 자동 확장)
+        self.window = window
+        self.max_entries = max_entries
+        self._current = {}
+        self._previous = {}
+        self._rotated_at = time.monotonic()
+        self._stats = {'expired': 0, 'evicted': 0}
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def get_stats(self) -> dict:
+        """크기 및 제거 통계"""
+        stats = dict(self._stats)
+        stats['size'] = len(self)
+        stats['max_entries'] = self.max_entries
+        return stats
+
+    def _rotate(self, now: float):
+        """한 세대가 지나면 이전 세대를 통째로 버림 (모두 만료된 항목)"""
+        elapsed = now - self._rotated_at
+        if elapsed < self.window:
+            return
+
+        self._stats['expired'] += len(self._previous)
+        if elapsed >= self.window * 2:
+            self._stats['expired'] += len(self._current)
+            self._previous = {}
+        else:
+            self._previous = self._current
+        self._current = {}
+        self._rotated_at = now
+
+    def _force_rotate(self, now: float):
+        """현재 세대가 가득 차면 이전 세대를 만료 전이라도 제거하고 세대 교체"""
+        self._stats['evicted'] += len(self._previous)
+        self._previous = self._current
+        self._current = {}
+        self._rotated_at = now
+
+    def hit(self, key, cooldown: float) -> bool:
+        """쿨다운 중이 아니면 현재 시각을 기록하고 True, 쿨다운 중이면 False"""
+        now = time.monotonic()
+        if cooldown > self.window:
+            self.window = cooldown
+        self._rotate(now)
+
+        last = self._current.get(key)
+        if last is None:
+            last = self._previous.get(key)
+        if last is not None and now - last < cooldown:
+            return False
+
+        self._previous.pop(key, None)
+        # 세대당 최대 항목 수의 절반까지만 허용해 전체 크기를 max_entries 이하로 유지
+        if key not in self._current and len(self._current) >= self.max_entries // 2:
+            self._force_rotate(now)
+        self._current[key] = now
+        return True
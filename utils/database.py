@@ -1,17 +1,329 @@
 import sqlite3
 import aiosqlite
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
+from utils.leveling_curve import DEFAULT_CURVE
+from utils.rank_index import RankIndex
+from utils.reaction_role_index import ReactionRoleIndex
+from utils.xp_buffer import XPAccumulator
 
 logger = logging.getLogger(__name__)
 
+# 모든 커넥션에 적용되는 PRAGMA (WAL 모드 기준 튜닝)
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous = NORMAL',   # WAL에서는 NORMAL로도 커밋 내구성이 보장됨
+    'PRAGMA cache_size = -16000',    # 커넥션당 약 16MB 페이지 캐시
+    'PRAGMA mmap_size = 134217728',  # 128MB 메모리 맵 I/O
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA busy_timeout = 5000',
+)
+
+# 스키마 마이그레이션 (PRAGMA user_version 기준, 버전 순서대로 한 번씩 적용)
+MIGRATIONS = [
+    # 1: 순위표/순위 조회 및 경고 조회 인덱스
+    # (reaction_roles의 message_id 조회는 UNIQUE(message_id, emoji) 인덱스가 이미 처리)
+    [
+        'CREATE INDEX IF NOT EXISTS idx_user_levels_guild_xp ON user_levels (guild_id, xp DESC, user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_warnings_guild_user_time ON warnings (guild_id, user_id, timestamp)',
+    ],
+    # 2: 대량 역할 작업 (재시작 시 이어서 실행하기 위한 진행 상태)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS bulk_role_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            role_id INTEGER,
+            action TEXT,
+            filter_role_id INTEGER,
+            joined_after TIMESTAMP,
+            joined_before TIMESTAMP,
+            min_level INTEGER,
+            last_member_id INTEGER DEFAULT 0,
+            processed INTEGER DEFAULT 0,
+            changed INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'running',
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_bulk_role_jobs_status ON bulk_role_jobs (status)',
+    ],
+    # 3: 반응 역할 메시지의 채널 (시작 시 누락된 반응 동기화에 필요, 기존 행은 반응 이벤트 때 채움)
+    [
+        'ALTER TABLE reaction_roles ADD COLUMN channel_id INTEGER',
+    ],
+    # 4: 버튼/선택 메뉴 역할 패널
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS role_panels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            message_id INTEGER,
+            title TEXT,
+            description TEXT,
+            style TEXT DEFAULT 'buttons',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS role_panel_roles (
+            panel_id INTEGER,
+            role_id INTEGER,
+            label TEXT,
+            emoji TEXT,
+            position INTEGER,
+            PRIMARY KEY (panel_id, role_id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_role_panels_guild ON role_panels (guild_id)',
+    ],
+    # 5: config.json에 있던 서버별 설정 (NULL이면 전역 설정 사용)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS guild_welcome (
+            guild_id INTEGER PRIMARY KEY,
+            enabled INTEGER,
+            title TEXT,
+            description TEXT,
+            color INTEGER,
+            footer TEXT,
+            show_member_count INTEGER,
+            show_avatar INTEGER,
+            channel_id INTEGER
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS news_schedules (
+            guild_id INTEGER PRIMARY KEY,
+            enabled INTEGER DEFAULT 1,
+            channel_id INTEGER,
+            time TEXT,
+            news_type TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS stocks_schedules (
+            guild_id INTEGER PRIMARY KEY,
+            enabled INTEGER DEFAULT 1,
+            channel_id INTEGER,
+            time TEXT,
+            indices TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS stock_alerts (
+            guild_id INTEGER PRIMARY KEY,
+            enabled INTEGER DEFAULT 1,
+            channel_id INTEGER,
+            threshold REAL DEFAULT 5.0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS bot_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''',
+        # 매분 실행되는 스케줄 확인은 해당 시각의 활성 스케줄만 조회
+        'CREATE INDEX IF NOT EXISTS idx_news_schedules_due ON news_schedules (enabled, time)',
+        'CREATE INDEX IF NOT EXISTS idx_stocks_schedules_due ON stocks_schedules (enabled, time)',
+        'CREATE INDEX IF NOT EXISTS idx_stock_alerts_enabled ON stock_alerts (enabled)',
+    ],
+    # 6: 종목별 마지막 관측 시세 (서버마다 감시 목록 행에 중복 저장하지 않음)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS stock_prices (
+            ticker TEXT PRIMARY KEY,
+            price REAL DEFAULT 0,
+            change_percent REAL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        INSERT OR IGNORE INTO stock_prices (ticker, price, change_percent)
+        SELECT ticker, last_price, last_change_percent FROM stock_watchlist
+        WHERE id IN (
+            -- 여러 서버가 같은 종목을 감시하면 가장 최근에 추가된 행의 값을 사용
+            SELECT MAX(id) FROM stock_watchlist WHERE last_price != 0 GROUP BY ticker
+        )
+        ''',
+    ],
+    # 7: 반응으로 부여한 역할 기록 (시작 시 동기화에서 봇이 반응으로 준 역할만 회수)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS reaction_role_grants (
+            guild_id INTEGER,
+            role_id INTEGER,
+            user_id INTEGER,
+            PRIMARY KEY (guild_id, role_id, user_id)
+        )
+        ''',
+    ],
+    # 8: config.json에 있던 서버별 레벨링 설정 (NULL이면 전역 설정 사용)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS guild_leveling (
+            guild_id INTEGER PRIMARY KEY,
+            enabled INTEGER,
+            xp_per_message INTEGER,
+            xp_cooldown REAL,
+            announce_level_up INTEGER,
+            level_up_message TEXT
+        )
+        ''',
+    ],
+]
+
+# guild_welcome에서 설정 가능한 열
+GUILD_WELCOME_COLUMNS = ('enabled', 'title', 'description', 'color', 'footer',
+                         'show_member_count', 'show_avatar', 'channel_id')
+
+# guild_leveling에서 설정 가능한 열
+GUILD_LEVELING_COLUMNS = ('enabled', 'xp_per_message', 'xp_cooldown', 'announce_level_up', 'level_up_message')
+
 class Database:
-    def __init__(self, db_path='data/bot.db'):
+    def __init__(self, db_path='data/bot.db', read_pool_size=4,
+                 xp_flush_interval=2.0, xp_flush_size=500, xp_cache_size=50000, curve=None,
+                 rank_index_size=200000):
         self.db_path = db_path
+        self.read_pool_size = read_pool_size
+        # 레벨 곡선 (LevelCurve 구현체로 교체 가능)
+        self.curve = curve or DEFAULT_CURVE
+
+        # 커넥션 풀 (writer 1개 + reader N개, setup()에서 생성)
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._readers = []
+        self._idle_readers = None
+
+        self._pool_stats = {
+            'reads': 0,
+            'writes': 0,
+            'read_waits': 0,
+            'write_waits': 0,
+            'read_wait_ms_max': 0.0,
+            'write_wait_ms_max': 0.0,
+        }
+
+        # XP 쓰기 지연 버퍼 (xp_flush_interval초 또는 xp_flush_size건마다 기록)
+        self.xp_flush_interval = xp_flush_interval
+        self._xp_buffer = XPAccumulator(max_pending=xp_flush_size)
+        self._xp_flush_lock = asyncio.Lock()
+        self._xp_flush_wakeup = asyncio.Event()
+        self._xp_flush_task = None
+        self._xp_closing = False
+        # 레벨업 판정용 메모리 상태: (guild_id, user_id) -> [xp, level] (LRU)
+        self.xp_cache_size = xp_cache_size
+        self._xp_state = OrderedDict()
+
+        # 반응 역할 메모리 인덱스 (setup()에서 적재, 쓰기 시 함께 갱신)
+        self.reaction_roles = ReactionRoleIndex()
+
+        # 자동 역할 캐시: guild_id -> role_id 또는 None (조회 시 채우고 쓰기 시 함께 갱신)
+        self._auto_roles = {}
+
+        # XP 기록 후 호출되는 콜백 (인자: 변경된 guild_id 집합)
+        self._xp_flush_listeners = []
+
+        # 메모리 순위 인덱스 (rank_index_size=0이면 사용하지 않고 SQL로 계산)
+        self.rank_index = RankIndex(self._load_rank_rows, max_entries=rank_index_size) if rank_index_size else None
+
+    async def _connect(self, readonly: bool = False):
+        """튜닝된 PRAGMA가 적용된 커넥션 생성"""
+        conn = await aiosqlite.connect(self.db_path)
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        if readonly:
+            await conn.execute('PRAGMA query_only = ON')
+        return conn
+
+    @asynccontextmanager
+    async def _read(self):
+        """읽기 전용 커넥션 대여"""
+        started = time.perf_counter()
+        if self._idle_readers.empty():
+            self._pool_stats['read_waits'] += 1
+        conn = await self._idle_readers.get()
+        waited_ms = (time.perf_counter() - started) * 1000
+        self._pool_stats['reads'] += 1
+        self._pool_stats['read_wait_ms_max'] = max(self._pool_stats['read_wait_ms_max'], waited_ms)
+        try:
+            yield conn
+        finally:
+            self._idle_readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def _write(self):
+        """쓰기 커넥션 대여 (트랜잭션 단위로 커밋/롤백)"""
+        started = time.perf_counter()
+        if self._write_lock.locked():
+            self._pool_stats['write_waits'] += 1
+        async with self._write_lock:
+            waited_ms = (time.perf_counter() - started) * 1000
+            self._pool_stats['writes'] += 1
+            self._pool_stats['write_wait_ms_max'] = max(self._pool_stats['write_wait_ms_max'], waited_ms)
+            try:
+                yield self._writer
+                await self._writer.commit()
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+    def get_pool_stats(self) -> dict:
+        """커넥션 풀 사용 통계"""
+        stats = dict(self._pool_stats)
+        stats['readers'] = len(self._readers)
+        stats['idle_readers'] = self._idle_readers.qsize() if self._idle_readers else 0
+        stats['writer_busy'] = self._write_lock.locked()
+        return stats
+
+    async def close(self):
+        """커넥션 풀 종료"""
+        if self._writer is None:
+            return
+
+        if self._xp_flush_task:
+            # 기록 도중 취소되면 꺼낸 변경분이 사라질 수 있으므로 취소 대신 루프를 멈추고 끝날 때까지 대기
+            self._xp_closing = True
+            self._xp_flush_wakeup.set()
+            try:
+                await self._xp_flush_task
+            except asyncio.CancelledError:
+                pass
+            self._xp_flush_task = None
+        # 남아 있는 XP 변경분을 모두 기록한 뒤 종료
+        await self.flush_xp()
+
+        async with self._write_lock:
+            for conn in self._readers:
+                await conn.close()
+            await self._writer.close()
+
+        logger.info(f'데이터베이스 커넥션 종료 (통계: {self.get_pool_stats()})')
+        self._readers = []
+        self._idle_readers = None
+        self._writer = None
 
     async def setup(self):
         """데이터베이스 초기화 및 테이블 생성"""
-        async with aiosqlite.connect(self.db_path) as db:
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._writer = await self._connect()
+        # WAL 모드는 데이터베이스 파일에 영구 저장되며 reader와 writer가 서로를 막지 않음
+        async with self._writer.execute('PRAGMA journal_mode = WAL') as cursor:
+            journal_mode = (await cursor.fetchone())[0]
+
+        async with self._write() as db:
             # 레벨링 테이블
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS user_levels (
@@ -71,60 +383,165 @@ class Database:
                 )
             ''')
 
-            await db.commit()
-            logger.info('데이터베이스 초기화 완료')
+            await self._migrate(db)
+
+            async with db.execute('SELECT guild_id, message_id, emoji, role_id FROM reaction_roles') as cursor:
+                self.reaction_roles.load(await cursor.fetchall())
+            async with db.execute(
+                'SELECT DISTINCT message_id, channel_id FROM reaction_roles WHERE channel_id IS NOT NULL'
+            ) as cursor:
+                for message_id, channel_id in await cursor.fetchall():
+                    self.reaction_roles.set_channel(message_id, channel_id)
+
+
+        self._readers = [await self._connect(readonly=True) for _ in range(self.read_pool_size)]
+        self._idle_readers = asyncio.Queue()
+        for conn in self._readers:
+            self._idle_readers.put_nowait(conn)
+
+        self._xp_closing = False
+        self._xp_flush_task = asyncio.create_task(self._xp_flush_loop())
+
+        logger.info(f'데이터베이스 초기화 완료 (journal_mode={journal_mode}, reader {len(self._readers)}개)')
+
+    async def _migrate(self, db):
+        """적용되지 않은 스키마 마이그레이션 실행"""
+        async with db.execute('PRAGMA user_version') as cursor:
+            version = (await cursor.fetchone())[0]
+
+        for target, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                await db.execute(statement)
+            await db.execute(f'PRAGMA user_version = {target}')
+            logger.info(f'데이터베이스 스키마 버전 {target} 적용')
 
     # ===== 레벨링 시스템 =====
     async def add_xp(self, guild_id: int, user_id: int, xp_amount: int = 10):
-        """XP 추가 및 레벨업 확인"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # 현재 XP와 레벨 가져오기
+        """XP 추가 및 레벨업 확인 (메모리 상태 기준으로 즉시 판정, 기록은 지연)"""
+        key = (guild_id, user_id)
+        state = self._xp_state.get(key)
+        if state is None:
+            state = await self._load_xp_state(guild_id, user_id)
+        self._xp_state.move_to_end(key)
+
+        current_level = state[1]
+        state[0] += xp_amount
+        state[1] = self.curve.level_for_xp(state[0])
+
+        self._xp_buffer.add(guild_id, user_id, xp_amount, state[1], datetime.now())
+        if self.rank_index:
+            self.rank_index.update(guild_id, user_id, state[0])
+        if self._xp_buffer.is_full():
+            self._xp_flush_wakeup.set()
+
+        return state[1] if state[1] > current_level else None
+
+    async def _load_xp_state(self, guild_id: int, user_id: int) -> list:
+        """메모리 상태에 없는 사용자의 XP를 DB에서 읽어 캐시"""
+        key = (guild_id, user_id)
+        # 기록 중인 변경분이 DB에 반영된 뒤에 읽어야 누락이 없음
+        async with self._xp_flush_lock:
+            async with self._read() as db:
+                async with db.execute(
+                    'SELECT xp, level FROM user_levels WHERE guild_id = ? AND user_id = ?',
+                    (guild_id, user_id)
+                ) as cursor:
+                    result = await cursor.fetchone()
+
+        # 대기 중 다른 코루틴이 먼저 적재했다면 그 상태를 사용
+        state = self._xp_state.get(key)
+        if state is not None:
+            return state
+
+        xp = (result[0] if result else 0) + self._xp_buffer.pending_xp(guild_id, user_id)
+        state = [xp, self.curve.level_for_xp(xp)]
+        self._xp_state[key] = state
+        while len(self._xp_state) > self.xp_cache_size:
+            self._xp_state.popitem(last=False)
+        return state
+
+    async def _load_rank_rows(self, guild_id: int, limit: int) -> list:
+        """순위 인덱스 적재용 서버 전체 (user_id, xp), limit명을 넘는 서버는 limit + 1명까지만 읽음"""
+        await self.flush_xp()
+        async with self._read() as db:
             async with db.execute(
-                'SELECT xp, level FROM user_levels WHERE guild_id = ? AND user_id = ?',
-                (guild_id, user_id)
+                'SELECT user_id, xp FROM user_levels WHERE guild_id = ? LIMIT ?',
+                (guild_id, limit + 1)
             ) as cursor:
-                result = await cursor.fetchone()
+                rows = {user_id: xp for user_id, xp in await cursor.fetchall()}
+        if len(rows) > limit:
+            return list(rows.items())
 
-            if result:
-                current_xp, current_level = result
-                new_xp = current_xp + xp_amount
-                new_level = self._calculate_level(new_xp)
+        # 읽는 동안 메모리에서 증가한 XP 반영
+        for (state_guild_id, user_id), state in self._xp_state.items():
+            if state_guild_id == guild_id:
+                rows[user_id] = state[0]
+        return list(rows.items())
 
-                await db.execute('''
-                    UPDATE user_levels
-                    SET xp = ?, level = ?, total_messages = total_messages + 1, last_message_time = ?
-                    WHERE guild_id = ? AND user_id = ?
-                ''', (new_xp, new_level, datetime.now(), guild_id, user_id))
+    def add_xp_flush_listener(self, callback):
+        """XP 기록 후 호출될 콜백 등록"""
+        self._xp_flush_listeners.append(callback)
 
-                leveled_up = new_level > current_level
-            else:
-                # 새 사용자
-                new_xp = xp_amount
-                new_level = self._calculate_level(new_xp)
-                await db.execute('''
-                    INSERT INTO user_levels (guild_id, user_id, xp, level, total_messages, last_message_time)
-                    VALUES (?, ?, ?, ?, 1, ?)
-                ''', (guild_id, user_id, new_xp, new_level, datetime.now()))
+    def remove_xp_flush_listener(self, callback):
+        """XP 기록 콜백 제거"""
+        if callback in self._xp_flush_listeners:
+            self._xp_flush_listeners.remove(callback)
 
-                leveled_up = new_level > 0
+    def _notify_xp_flush(self, guild_ids: set):
+        for callback in self._xp_flush_listeners:
+            try:
+                callback(guild_ids)
+            except Exception as e:
+                logger.error(f'XP 기록 콜백 오류: {e}')
 
-            await db.commit()
-            return new_level if leveled_up else None
+    async def flush_xp(self):
+        """버퍼에 쌓인 XP 변경분을 하나의 트랜잭션으로 기록"""
+        async with self._xp_flush_lock:
+            if not len(self._xp_buffer):
+                return
+            rows = self._xp_buffer.drain()
+            try:
+                async with self._write() as db:
+                    await db.executemany('''
+                        INSERT INTO user_levels (guild_id, user_id, xp, level, total_messages, last_message_time)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (guild_id, user_id) DO UPDATE SET
+                            xp = xp + excluded.xp,
+                            level = excluded.level,
+                            total_messages = total_messages + excluded.total_messages,
+                            last_message_time = excluded.last_message_time
+                    ''', rows)
+            except BaseException:
+                # 기록 실패(취소 포함) 시 변경분을 버퍼로 되돌려 다음 주기 또는 종료 시 재시도
+                for guild_id, user_id, xp, level, messages, timestamp in rows:
+                    self._xp_buffer.add(guild_id, user_id, xp, level, timestamp, messages=messages)
+                raise
 
-    def _calculate_level(self, xp: int) -> int:
-        """XP로부터 레벨 계산 (필요 XP: 5 * (level ^ 2) + 50 * level + 100)"""
-        level = 0
-        while xp >= self._xp_for_level(level + 1):
-            level += 1
-        return level
+        self._notify_xp_flush({row[0] for row in rows})
 
-    def _xp_for_level(self, level: int) -> int:
-        """특정 레벨에 도달하기 위한 총 XP"""
-        return 5 * (level ** 2) + 50 * level + 100
+    async def _xp_flush_loop(self):
+        """주기적으로 (또는 버퍼가 가득 차면) XP 변경분 기록"""
+        while not self._xp_closing:
+            try:
+                await asyncio.wait_for(self._xp_flush_wakeup.wait(), timeout=self.xp_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._xp_flush_wakeup.clear()
+            if self._xp_closing:
+                break
+            try:
+                await self.flush_xp()
+            except Exception as e:
+                logger.error(f'XP 기록 오류: {e}')
 
     async def get_user_level(self, guild_id: int, user_id: int):
         """사용자 레벨 정보 가져오기"""
-        async with aiosqlite.connect(self.db_path) as db:
+        await self.flush_xp()
+        return await self._fetch_user_level(guild_id, user_id)
+
+    async def _fetch_user_level(self, guild_id: int, user_id: int):
+        """기록된 사용자 레벨 정보 (호출 전에 flush_xp 필요)"""
+        async with self._read() as db:
             async with db.execute('''
                 SELECT xp, level, total_messages
                 FROM user_levels
@@ -132,21 +549,131 @@ class Database:
             ''', (guild_id, user_id)) as cursor:
                 return await cursor.fetchone()
 
+    async def get_user_level_with_rank(self, guild_id: int, user_id: int):
+        """사용자 레벨 정보와 서버 내 순위를 한 번에 가져오기 (xp, level, total_messages, rank)"""
+        await self.flush_xp()
+        if self.rank_index:
+            user_data = await self._fetch_user_level(guild_id, user_id)
+            if not user_data:
+                return None
+            rank = await self.rank_index.rank(guild_id, user_id)
+            if rank is not None:
+                return (*user_data, rank)
+
+        async with self._read() as db:
+            async with db.execute('''
+                SELECT u.xp, u.level, u.total_messages, (
+                    SELECT COUNT(*) FROM user_levels AS r
+                    WHERE r.guild_id = u.guild_id AND r.xp > u.xp
+                ) + 1
+                FROM user_levels AS u
+                WHERE u.guild_id = ? AND u.user_id = ?
+            ''', (guild_id, user_id)) as cursor:
+                return await cursor.fetchone()
+
+    async def set_user_level(self, guild_id: int, user_id: int, xp: int, level: int):
+        """사용자 XP와 레벨 직접 설정 (관리자용)"""
+        await self.flush_xp()
+        async with self._write() as db:
+            await db.execute('''
+                INSERT INTO user_levels (guild_id, user_id, xp, level, total_messages, last_message_time)
+                VALUES (?, ?, ?, ?, 0, ?)
+                ON CONFLICT (guild_id, user_id) DO UPDATE SET xp = excluded.xp, level = excluded.level
+            ''', (guild_id, user_id, xp, level, datetime.now()))
+
+        # 메모리 상태는 다음 메시지에서 DB 값으로 다시 적재
+        self._xp_state.pop((guild_id, user_id), None)
+        if self.rank_index:
+            self.rank_index.update(guild_id, user_id, xp)
+        self._notify_xp_flush({guild_id})
+
     async def get_leaderboard(self, guild_id: int, limit: int = 10):
         """서버 레벨 순위표"""
-        async with aiosqlite.connect(self.db_path) as db:
+        await self.flush_xp()
+        async with self._read() as db:
             async with db.execute('''
                 SELECT user_id, xp, level, total_messages
                 FROM user_levels
                 WHERE guild_id = ?
-                ORDER BY xp DESC
+                ORDER BY xp DESC, user_id
                 LIMIT ?
             ''', (guild_id, limit)) as cursor:
                 return await cursor.fetchall()
 
+    async def get_leaderboard_page(self, guild_id: int, limit: int = 10, after: tuple = None):
+        """키셋 기반 순위표 페이지 (after: 이전 페이지 마지막 행의 (xp, user_id))"""
+        await self.flush_xp()
+        async with self._read() as db:
+            if after is None:
+                query = '''
+                    SELECT user_id, xp, level, total_messages
+                    FROM user_levels
+                    WHERE guild_id = ?
+                    ORDER BY xp DESC, user_id
+                    LIMIT ?
+                '''
+                params = (guild_id, limit)
+            else:
+                after_xp, after_user_id = after
+                query = '''
+                    SELECT user_id, xp, level, total_messages
+                    FROM user_levels
+                    WHERE guild_id = ? AND xp <= ? AND (xp < ? OR user_id > ?)
+                    ORDER BY xp DESC, user_id
+                    LIMIT ?
+                '''
+                params = (guild_id, after_xp, after_xp, after_user_id, limit)
+
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+
+    async def get_leaderboard_cursor(self, guild_id: int, offset: int):
+        """offset번째 행 직전 위치의 키셋 커서 (xp, user_id), 범위를 벗어나면 None"""
+        if offset <= 0:
+            return None
+
+        if self.rank_index:
+            entries = await self.rank_index.page(guild_id, offset - 1, 1)
+            if entries is not None:
+                return (entries[0][1], entries[0][0]) if entries else None
+
+        await self.flush_xp()
+        async with self._read() as db:
+            # 커버링 인덱스만 건너뛰므로 테이블 행을 읽지 않음
+            async with db.execute('''
+                SELECT xp, user_id
+                FROM user_levels
+                WHERE guild_id = ?
+                ORDER BY xp DESC, user_id
+                LIMIT 1 OFFSET ?
+            ''', (guild_id, offset - 1)) as cursor:
+                return await cursor.fetchone()
+
+    async def get_leaderboard_count(self, guild_id: int) -> int:
+        """순위표에 포함된 사용자 수"""
+        if self.rank_index:
+            count = await self.rank_index.count(guild_id)
+            if count is not None:
+                return count
+
+        await self.flush_xp()
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT COUNT(*) FROM user_levels WHERE guild_id = ?',
+                (guild_id,)
+            ) as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result else 0
+
     async def get_user_rank(self, guild_id: int, user_id: int):
         """사용자의 서버 내 순위"""
-        async with aiosqlite.connect(self.db_path) as db:
+        await self.flush_xp()
+        if self.rank_index:
+            rank = await self.rank_index.rank(guild_id, user_id)
+            if rank is not None:
+                return rank
+
+        async with self._read() as db:
             async with db.execute('''
                 SELECT COUNT(*) + 1
                 FROM user_levels
@@ -160,16 +687,15 @@ class Database:
     # ===== 경고 시스템 =====
     async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str):
         """경고 추가"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute('''
                 INSERT INTO warnings (guild_id, user_id, moderator_id, reason)
                 VALUES (?, ?, ?, ?)
             ''', (guild_id, user_id, moderator_id, reason))
-            await db.commit()
 
     async def get_warnings(self, guild_id: int, user_id: int):
         """사용자의 경고 목록"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute('''
                 SELECT id, moderator_id, reason, timestamp
                 FROM warnings
@@ -180,118 +706,553 @@ class Database:
 
     async def clear_warnings(self, guild_id: int, user_id: int):
         """사용자의 모든 경고 삭제"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 'DELETE FROM warnings WHERE guild_id = ? AND user_id = ?',
                 (guild_id, user_id)
             )
-            await db.commit()
 
     # ===== 자동 역할 =====
     async def set_auto_role(self, guild_id: int, role_id: int):
         """자동 역할 설정"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute('''
                 INSERT OR REPLACE INTO auto_roles (guild_id, role_id)
                 VALUES (?, ?)
             ''', (guild_id, role_id))
-            await db.commit()
+        self._auto_roles[guild_id] = role_id
 
     async def get_auto_role(self, guild_id: int):
-        """자동 역할 가져오기"""
-        async with aiosqlite.connect(self.db_path) as db:
+        """자동 역할 가져오기 (설정이 없는 서버도 캐시)"""
+        if guild_id in self._auto_roles:
+            return self._auto_roles[guild_id]
+
+        async with self._read() as db:
             async with db.execute(
                 'SELECT role_id FROM auto_roles WHERE guild_id = ?',
                 (guild_id,)
             ) as cursor:
                 result = await cursor.fetchone()
-                return result[0] if result else None
+                role_id = result[0] if result else None
+
+        # 조회 중 설정이 바뀌었으면 새 값을 유지
+        return self._auto_roles.setdefault(guild_id, role_id)
 
     async def remove_auto_role(self, guild_id: int):
         """자동 역할 제거"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute('DELETE FROM auto_roles WHERE guild_id = ?', (guild_id,))
-            await db.commit()
+        self._auto_roles[guild_id] = None
 
     # ===== 반응 역할 =====
-    async def add_reaction_role(self, guild_id: int, message_id: int, emoji: str, role_id: int):
+    async def add_reaction_role(self, guild_id: int, message_id: int, emoji: str, role_id: int, channel_id: int = None):
         """반응 역할 추가"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             try:
                 await db.execute('''
-                    INSERT INTO reaction_roles (guild_id, message_id, emoji, role_id)
-                    VALUES (?, ?, ?, ?)
-                ''', (guild_id, message_id, emoji, role_id))
-                await db.commit()
-                return True
+                    INSERT INTO reaction_roles (guild_id, message_id, emoji, role_id, channel_id)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (guild_id, message_id, emoji, role_id, channel_id))
             except sqlite3.IntegrityError:
                 return False
 
+        self.reaction_roles.add(guild_id, message_id, emoji, role_id)
+        if channel_id:
+            self.reaction_roles.set_channel(message_id, channel_id)
+        return True
+
+    async def set_reaction_role_channel(self, message_id: int, channel_id: int):
+        """채널이 기록되지 않은 반응 역할 메시지의 채널 기록"""
+        async with self._write() as db:
+            await db.execute(
+                'UPDATE reaction_roles SET channel_id = ? WHERE message_id = ? AND channel_id IS NULL',
+                (channel_id, message_id)
+            )
+
+        self.reaction_roles.set_channel(message_id, channel_id)
+
     async def get_reaction_role(self, message_id: int, emoji: str):
-        """반응 역할 가져오기"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute('''
-                SELECT role_id FROM reaction_roles
-                WHERE message_id = ? AND emoji = ?
-            ''', (message_id, emoji)) as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else None
+        """반응 역할 가져오기 (메모리 인덱스 조회)"""
+        return self.reaction_roles.get(message_id, emoji)
 
     async def get_message_reaction_roles(self, message_id: int):
         """특정 메시지의 모든 반응 역할"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute('''
-                SELECT emoji, role_id FROM reaction_roles
-                WHERE message_id = ?
-            ''', (message_id,)) as cursor:
-                return await cursor.fetchall()
+        return self.reaction_roles.get_message_roles(message_id)
 
     async def remove_reaction_role(self, message_id: int, emoji: str):
         """반응 역할 제거"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+        async with self._write() as db:
+            cursor = await db.execute(
                 'DELETE FROM reaction_roles WHERE message_id = ? AND emoji = ?',
                 (message_id, emoji)
             )
-            await db.commit()
+            removed = cursor.rowcount > 0
+            await cursor.close()
+
+        self.reaction_roles.remove(message_id, emoji)
+        return removed
+
+    async def remove_reaction_roles(self, message_id: int, emojis):
+        """메시지의 반응 역할 중 지정한 이모지만 제거"""
+        emojis = list(emojis)
+        async with self._write() as db:
+            await db.executemany(
+                'DELETE FROM reaction_roles WHERE message_id = ? AND emoji = ?',
+                [(message_id, emoji) for emoji in emojis]
+            )
+
+        for emoji in emojis:
+            self.reaction_roles.remove(message_id, emoji)
+
+    async def add_reaction_role_grant(self, guild_id: int, role_id: int, user_id: int):
+        """반응으로 부여한 역할 기록"""
+        async with self._write() as db:
+            await db.execute(
+                'INSERT OR IGNORE INTO reaction_role_grants (guild_id, role_id, user_id) VALUES (?, ?, ?)',
+                (guild_id, role_id, user_id)
+            )
+
+    async def remove_reaction_role_grants(self, guild_id: int, role_id: int, user_ids):
+        """반응으로 부여한 역할 기록 삭제"""
+        async with self._write() as db:
+            await db.executemany(
+                'DELETE FROM reaction_role_grants WHERE guild_id = ? AND role_id = ? AND user_id = ?',
+                [(guild_id, role_id, user_id) for user_id in user_ids]
+            )
+
+    async def get_reaction_role_grants(self, guild_id: int, role_id: int) -> set:
+        """반응으로 역할을 받은 멤버 ID"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT user_id FROM reaction_role_grants WHERE guild_id = ? AND role_id = ?',
+                (guild_id, role_id)
+            ) as cursor:
+                return {row[0] for row in await cursor.fetchall()}
+
+    # ===== 역할 패널 =====
+    async def create_role_panel(self, guild_id: int, channel_id: int, title: str, description: str = None,
+                                style: str = 'buttons') -> int:
+        """역할 패널 생성"""
+        async with self._write() as db:
+            cursor = await db.execute('''
+                INSERT INTO role_panels (guild_id, channel_id, title, description, style)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (guild_id, channel_id, title, description, style))
+            panel_id = cursor.lastrowid
+            await cursor.close()
+            return panel_id
+
+    async def set_role_panel_message(self, panel_id: int, message_id: int):
+        """역할 패널 메시지 기록"""
+        async with self._write() as db:
+            await db.execute('UPDATE role_panels SET message_id = ? WHERE id = ?', (message_id, panel_id))
+
+    async def get_role_panel(self, panel_id: int):
+        """역할 패널 가져오기"""
+        async with self._read() as db:
+            async with db.execute('''
+                SELECT id, guild_id, channel_id, message_id, title, description, style
+                FROM role_panels
+                WHERE id = ?
+            ''', (panel_id,)) as cursor:
+                return await cursor.fetchone()
+
+    async def get_role_panels(self, guild_id: int = None):
+        """역할 패널 목록 (guild_id가 없으면 전체)"""
+        query = 'SELECT id, guild_id, channel_id, message_id, title, description, style FROM role_panels'
+        params = ()
+        if guild_id is not None:
+            query += ' WHERE guild_id = ?'
+            params = (guild_id,)
+        async with self._read() as db:
+            async with db.execute(query + ' ORDER BY id', params) as cursor:
+                return await cursor.fetchall()
+
+    async def get_role_panel_roles(self, panel_id: int):
+        """역할 패널의 (role_id, label, emoji) 목록 (추가한 순서)"""
+        async with self._read() as db:
+            async with db.execute('''
+                SELECT role_id, label, emoji
+                FROM role_panel_roles
+                WHERE panel_id = ?
+                ORDER BY position
+            ''', (panel_id,)) as cursor:
+                return await cursor.fetchall()
+
+    async def add_role_panel_role(self, panel_id: int, role_id: int, label: str, emoji: str = None):
+        """역할 패널에 역할 추가"""
+        async with self._write() as db:
+            try:
+                await db.execute('''
+                    INSERT INTO role_panel_roles (panel_id, role_id, label, emoji, position)
+                    VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(position), 0) + 1 FROM role_panel_roles WHERE panel_id = ?))
+                ''', (panel_id, role_id, label, emoji, panel_id))
+            except sqlite3.IntegrityError:
+                return False
+        return True
+
+    async def remove_role_panel_role(self, panel_id: int, role_id: int):
+        """역할 패널에서 역할 제거"""
+        async with self._write() as db:
+            cursor = await db.execute(
+                'DELETE FROM role_panel_roles WHERE panel_id = ? AND role_id = ?',
+                (panel_id, role_id)
+            )
+            removed = cursor.rowcount > 0
+            await cursor.close()
+        return removed
+
+    async def delete_role_panel(self, panel_id: int):
+        """역할 패널 삭제"""
+        async with self._write() as db:
+            await db.execute('DELETE FROM role_panel_roles WHERE panel_id = ?', (panel_id,))
+            await db.execute('DELETE FROM role_panels WHERE id = ?', (panel_id,))
+
+    # ===== 서버별 설정 =====
+    async def get_meta(self, key: str):
+        """봇 메타데이터 값 (없으면 None)"""
+        async with self._read() as db:
+            async with db.execute('SELECT value FROM bot_meta WHERE key = ?', (key,)) as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result else None
+
+    async def set_meta(self, key: str, value: str):
+        """봇 메타데이터 저장"""
+        async with self._write() as db:
+            await db.execute('''
+                INSERT INTO bot_meta (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            ''', (key, value))
+
+    async def import_guild_settings(self, welcome_rows, news_rows, stocks_rows, alert_rows, marker: str):
+        """서버별 설정 일괄 가져오기 (이미 있는 서버 설정은 유지, 한 트랜잭션으로 완료 표시까지 기록)"""
+        async with self._write() as db:
+            await db.executemany(f'''
+                INSERT OR IGNORE INTO guild_welcome (guild_id, {", ".join(GUILD_WELCOME_COLUMNS)})
+                VALUES ({", ".join("?" for _ in range(len(GUILD_WELCOME_COLUMNS) + 1))})
+            ''', welcome_rows)
+            await db.executemany('''
+                INSERT OR IGNORE INTO news_schedules (guild_id, enabled, channel_id, time, news_type)
+                VALUES (?, ?, ?, ?, ?)
+            ''', news_rows)
+            await db.executemany('''
+                INSERT OR IGNORE INTO stocks_schedules (guild_id, enabled, channel_id, time, indices)
+                VALUES (?, ?, ?, ?, ?)
+            ''', stocks_rows)
+            await db.executemany('''
+                INSERT OR IGNORE INTO stock_alerts (guild_id, enabled, channel_id, threshold)
+                VALUES (?, ?, ?, ?)
+            ''', alert_rows)
+            await db.execute(
+                "INSERT OR REPLACE INTO bot_meta (key, value) VALUES (?, datetime('now'))",
+                (marker,)
+            )
+
+    async def get_guild_welcome(self, guild_id: int):
+        """서버별 환영 메시지 설정 (GUILD_WELCOME_COLUMNS 순서, 없으면 None)"""
+        async with self._read() as db:
+            async with db.execute(
+                f'SELECT {", ".join(GUILD_WELCOME_COLUMNS)} FROM guild_welcome WHERE guild_id = ?',
+                (guild_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def update_guild_welcome(self, guild_id: int, **kwargs):
+        """서버별 환영 메시지 설정 변경 (지정한 열만 변경)"""
+        columns = [column for column in kwargs if column in GUILD_WELCOME_COLUMNS]
+        if not columns:
+            return
+
+        async with self._write() as db:
+            await db.execute(f'''
+                INSERT INTO guild_welcome (guild_id, {", ".join(columns)})
+                VALUES (?, {", ".join("?" for _ in columns)})
+                ON CONFLICT(guild_id) DO UPDATE SET {", ".join(f"{c} = excluded.{c}" for c in columns)}
+            ''', (guild_id, *(kwargs[column] for column in columns)))
+
+    async def import_guild_leveling(self, leveling_rows, marker: str):
+        """서버별 레벨링 설정 일괄 가져오기 (이미 있는 서버 설정은 유지, 한 트랜잭션으로 완료 표시까지 기록)"""
+        async with self._write() as db:
+            await db.executemany(f'''
+                INSERT OR IGNORE INTO guild_leveling (guild_id, {", ".join(GUILD_LEVELING_COLUMNS)})
+                VALUES ({", ".join("?" for _ in range(len(GUILD_LEVELING_COLUMNS) + 1))})
+            ''', leveling_rows)
+            await db.execute(
+                "INSERT OR REPLACE INTO bot_meta (key, value) VALUES (?, datetime('now'))",
+                (marker,)
+            )
+
+    async def get_guild_leveling(self, guild_id: int):
+        """서버별 레벨링 설정 (GUILD_LEVELING_COLUMNS 순서, 없으면 None)"""
+        async with self._read() as db:
+            async with db.execute(
+                f'SELECT {", ".join(GUILD_LEVELING_COLUMNS)} FROM guild_leveling WHERE guild_id = ?',
+                (guild_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def update_guild_leveling(self, guild_id: int, **kwargs):
+        """서버별 레벨링 설정 변경 (지정한 열만 변경)"""
+        columns = [column for column in kwargs if column in GUILD_LEVELING_COLUMNS]
+        if not columns:
+            return
+
+        async with self._write() as db:
+            await db.execute(f'''
+                INSERT INTO guild_leveling (guild_id, {", ".join(columns)})
+                VALUES (?, {", ".join("?" for _ in columns)})
+                ON CONFLICT(guild_id) DO UPDATE SET {", ".join(f"{c} = excluded.{c}" for c in columns)}
+            ''', (guild_id, *(kwargs[column] for column in columns)))
+
+    async def get_news_schedule(self, guild_id: int):
+        """뉴스 스케줄 (guild_id, enabled, channel_id, time, news_type)"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT guild_id, enabled, channel_id, time, news_type FROM news_schedules WHERE guild_id = ?',
+                (guild_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def get_due_news_schedules(self, time: str):
+        """해당 시각(HH:MM)에 전송할 활성 뉴스 스케줄 목록"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT guild_id, enabled, channel_id, time, news_type FROM news_schedules WHERE enabled = 1 AND time = ?',
+                (time,)
+            ) as cursor:
+                return await cursor.fetchall()
+
+    async def set_news_schedule(self, guild_id: int, channel_id: int, time: str, news_type: str, enabled: bool = True):
+        """뉴스 스케줄 설정"""
+        async with self._write() as db:
+            await db.execute('''
+                INSERT INTO news_schedules (guild_id, enabled, channel_id, time, news_type)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                    enabled = excluded.enabled,
+                    channel_id = excluded.channel_id,
+                    time = excluded.time,
+                    news_type = excluded.news_type
+            ''', (guild_id, int(enabled), channel_id, time, news_type))
+
+    async def set_news_schedule_enabled(self, guild_id: int, enabled: bool) -> bool:
+        """뉴스 스케줄 활성화/비활성화 (스케줄이 없으면 False)"""
+        async with self._write() as db:
+            cursor = await db.execute(
+                'UPDATE news_schedules SET enabled = ? WHERE guild_id = ?',
+                (int(enabled), guild_id)
+            )
+            updated = cursor.rowcount > 0
+            await cursor.close()
+        return updated
+
+    async def get_stocks_schedule(self, guild_id: int):
+        """주식 스케줄 (guild_id, enabled, channel_id, time, indices)"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT guild_id, enabled, channel_id, time, indices FROM stocks_schedules WHERE guild_id = ?',
+                (guild_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def get_due_stocks_schedules(self, time: str):
+        """해당 시각(HH:MM)에 전송할 활성 주식 스케줄 목록"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT guild_id, enabled, channel_id, time, indices FROM stocks_schedules WHERE enabled = 1 AND time = ?',
+                (time,)
+            ) as cursor:
+                return await cursor.fetchall()
+
+    async def set_stocks_schedule(self, guild_id: int, channel_id: int, time: str, indices: str, enabled: bool = True):
+        """주식 스케줄 설정 (indices는 쉼표로 구분)"""
+        async with self._write() as db:
+            await db.execute('''
+                INSERT INTO stocks_schedules (guild_id, enabled, channel_id, time, indices)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                    enabled = excluded.enabled,
+                    channel_id = excluded.channel_id,
+                    time = excluded.time,
+                    indices = excluded.indices
+            ''', (guild_id, int(enabled), channel_id, time, indices))
+
+    async def set_stocks_schedule_enabled(self, guild_id: int, enabled: bool) -> bool:
+        """주식 스케줄 활성화/비활성화 (스케줄이 없으면 False)"""
+        async with self._write() as db:
+            cursor = await db.execute(
+                'UPDATE stocks_schedules SET enabled = ? WHERE guild_id = ?',
+                (int(enabled), guild_id)
+            )
+            updated = cursor.rowcount > 0
+            await cursor.close()
+        return updated
+
+    async def get_stock_alert(self, guild_id: int):
+        """주식 알림 설정 (guild_id, enabled, channel_id, threshold)"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT guild_id, enabled, channel_id, threshold FROM stock_alerts WHERE guild_id = ?',
+                (guild_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def get_enabled_stock_alerts(self):
+        """활성화된 주식 알림 설정 목록"""
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT guild_id, enabled, channel_id, threshold FROM stock_alerts WHERE enabled = 1'
+            ) as cursor:
+                return await cursor.fetchall()
+
+    async def set_stock_alert(self, guild_id: int, channel_id: int, threshold: float, enabled: bool = True):
+        """주식 알림 설정"""
+        async with self._write() as db:
+            await db.execute('''
+                INSERT INTO stock_alerts (guild_id, enabled, channel_id, threshold)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                    enabled = excluded.enabled,
+                    channel_id = excluded.channel_id,
+                    threshold = excluded.threshold
+            ''', (guild_id, int(enabled), channel_id, threshold))
+
+    async def set_stock_alert_enabled(self, guild_id: int, enabled: bool) -> bool:
+        """주식 알림 활성화/비활성화 (설정이 없으면 False)"""
+        async with self._write() as db:
+            cursor = await db.execute(
+                'UPDATE stock_alerts SET enabled = ? WHERE guild_id = ?',
+                (int(enabled), guild_id)
+            )
+            updated = cursor.rowcount > 0
+            await cursor.close()
+        return updated
+
+    # ===== 대량 역할 작업 =====
+    async def create_bulk_role_job(self, guild_id: int, channel_id: int, role_id: int, action: str,
+                                   filter_role_id: int = None, joined_after: datetime = None,
+                                   joined_before: datetime = None, min_level: int = None,
+                                   created_by: int = None) -> int:
+        """대량 역할 작업 생성"""
+        async with self._write() as db:
+            cursor = await db.execute('''
+                INSERT INTO bulk_role_jobs (guild_id, channel_id, role_id, action, filter_role_id,
+                                            joined_after, joined_before, min_level, created_by)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (guild_id, channel_id, role_id, action, filter_role_id,
+                  joined_after.isoformat() if joined_after else None,
+                  joined_before.isoformat() if joined_before else None,
+                  min_level, created_by))
+            job_id = cursor.lastrowid
+            await cursor.close()
+            return job_id
+
+    async def get_bulk_role_job(self, job_id: int):
+        """대량 역할 작업 가져오기"""
+        async with self._read() as db:
+            async with db.execute('''
+                SELECT id, guild_id, channel_id, role_id, action, filter_role_id, joined_after, joined_before,
+                       min_level, last_member_id, processed, changed, failed, status
+                FROM bulk_role_jobs
+                WHERE id = ?
+            ''', (job_id,)) as cursor:
+                return await cursor.fetchone()
+
+    async def get_running_bulk_role_jobs(self):
+        """진행 중인 대량 역할 작업 목록"""
+        async with self._read() as db:
+            async with db.execute('''
+                SELECT id, guild_id, channel_id, role_id, action, filter_role_id, joined_after, joined_before,
+                       min_level, last_member_id, processed, changed, failed, status
+                FROM bulk_role_jobs
+                WHERE status = 'running'
+                ORDER BY id
+            ''') as cursor:
+                return await cursor.fetchall()
+
+    async def update_bulk_role_job(self, job_id: int, last_member_id: int, processed: int,
+                                   changed: int, failed: int, status: str = 'running'):
+        """대량 역할 작업 진행 상태 저장"""
+        async with self._write() as db:
+            await db.execute('''
+                UPDATE bulk_role_jobs
+                SET last_member_id = ?, processed = ?, changed = ?, failed = ?, status = ?
+                WHERE id = ?
+            ''', (last_member_id, processed, changed, failed, status, job_id))
+
+    async def set_bulk_role_job_status(self, job_id: int, status: str):
+        """대량 역할 작업 상태 변경"""
+        async with self._write() as db:
+            await db.execute('UPDATE bulk_role_jobs SET status = ? WHERE id = ?', (status, job_id))
+
+    async def get_user_ids_with_min_level(self, guild_id: int, min_level: int) -> set:
+        """특정 레벨 이상인 사용자 ID 집합"""
+        await self.flush_xp()
+        async with self._read() as db:
+            async with db.execute(
+                'SELECT user_id FROM user_levels WHERE guild_id = ? AND level >= ?',
+                (guild_id, min_level)
+            ) as cursor:
+                return {row[0] for row in await cursor.fetchall()}
 
     # ===== 주식 감시 목록 =====
     async def add_stock_to_watchlist(self, guild_id: int, ticker: str, name: str):
         """주식 감시 목록에 추가"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             try:
                 await db.execute('''
                     INSERT INTO stock_watchlist (guild_id, ticker, name)
                     VALUES (?, ?, ?)
                 ''', (guild_id, ticker, name))
-                await db.commit()
                 return True
             except:
                 return False
 
     async def remove_stock_from_watchlist(self, guild_id: int, ticker: str):
         """주식 감시 목록에서 제거"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 'DELETE FROM stock_watchlist WHERE guild_id = ? AND ticker = ?',
                 (guild_id, ticker)
             )
-            await db.commit()
 
     async def get_watchlist(self, guild_id: int):
         """서버의 주식 감시 목록 가져오기"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute('''
-                SELECT ticker, name, last_price, last_change_percent
-                FROM stock_watchlist
-                WHERE guild_id = ?
-                ORDER BY added_at
+                SELECT w.ticker, w.name, COALESCE(p.price, 0), COALESCE(p.change_percent, 0)
+                FROM stock_watchlist w
+                LEFT JOIN stock_prices p ON p.ticker = w.ticker
+                WHERE w.guild_id = ?
+                ORDER BY w.added_at
             ''', (guild_id,)) as cursor:
                 return await cursor.fetchall()
 
+    async def get_watchlists(self, guild_ids: list) -> dict:
+        """알림이 켜진 서버 중 guild_ids의 주식 감시 목록을 한 번에 가져오기 (guild_id -> 감시 목록)"""
+        watchlists = {guild_id: [] for guild_id in guild_ids}
+        if not watchlists:
+            return watchlists
+
+        async with self._read() as db:
+            # 서버 ID를 바인딩 변수로 나열하면 서버 수가 SQLite 변수 개수 상한(구버전 999)을 넘을 수 있으므로
+            # 알림 설정과 조인해서 가져온 뒤 요청한 서버만 남김
+            async with db.execute('''
+                SELECT w.guild_id, w.ticker, w.name, COALESCE(p.price, 0), COALESCE(p.change_percent, 0)
+                FROM stock_watchlist w
+                JOIN stock_alerts a ON a.guild_id = w.guild_id AND a.enabled = 1
+                LEFT JOIN stock_prices p ON p.ticker = w.ticker
+                ORDER BY w.added_at
+            ''') as cursor:
+                async for guild_id, *row in cursor:
+                    watchlist = watchlists.get(guild_id)
+                    if watchlist is not None:
+                        watchlist.append(tuple(row))
+        return watchlists
+
     async def get_watchlist_count(self, guild_id: int):
         """서버의 주식 감시 목록 개수"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute(
                 'SELECT COUNT(*) FROM stock_watchlist WHERE guild_id = ?',
                 (guild_id,)
@@ -299,12 +1260,32 @@ class Database:
                 result = await cursor.fetchone()
                 return result[0] if result else 0
 
-    async def update_stock_price(self, guild_id: int, ticker: str, price: float, change_percent: float):
-        """주식 가격 업데이트"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                UPDATE stock_watchlist
-                SET last_price = ?, last_change_percent = ?
-                WHERE guild_id = ? AND ticker = ?
-            ''', (price, change_percent, guild_id, ticker))
-            await db.commit()
+    async def update_stock_price(self, ticker: str, price: float, change_percent: float):
+        """종목의 마지막 관측 시세 저장"""
+        await self.update_stock_prices([(ticker, price, change_percent)])
+
+    async def seed_stock_price(self, ticker: str, price: float, change_percent: float):
+        """아직 관측 시세가 없는 종목만 시세 저장 (다른 서버의 중복 알림 기준값은 바꾸지 않음)"""
+        async with self._write() as db:
+            await db.execute(
+                'INSERT OR IGNORE INTO stock_prices (ticker, price, change_percent) VALUES (?, ?, ?)',
+                (ticker, float(price), float(change_percent))
+            )
+
+    async def update_stock_prices(self, prices: list):
+        """[(ticker, price, change_percent)] 시세를 한 트랜잭션으로 저장 (감시 주기마다 한 번 호출)
+
+        관측 시세는 종목당 하나로 모든 서버가 공유하므로, 중복 알림 판단 기준값도 서버와 관계없이 마지막 관측값
+        """
+        if not prices:
+            return
+
+        async with self._write() as db:
+            await db.executemany('''
+                INSERT INTO stock_prices (ticker, price, change_percent, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    price = excluded.price,
+                    change_percent = excluded.change_percent,
+                    updated_at = excluded.updated_at
+            ''', [(ticker, float(price), float(change_percent)) for ticker, price, change_percent in prices])
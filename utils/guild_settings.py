@@ -0,0 +1,339 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from utils.config import LevelingSettings, WelcomeSettings
+from utils.database import GUILD_LEVELING_COLUMNS, GUILD_WELCOME_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class NewsSchedule:
+    """서버별 뉴스 자동 전송 설정"""
+    guild_id: int
+    enabled: bool
+    channel_id: Optional[int]
+    time: str
+    news_type: str
+
+    @classmethod
+    def from_row(cls, row):
+        guild_id, enabled, channel_id, time, news_type = row
+        return cls(guild_id, bool(enabled), channel_id, time, news_type)
+
+@dataclass(frozen=True, slots=True)
+class StocksSchedule:
+    """서버별 주식 자동 전송 설정"""
+    guild_id: int
+    enabled: bool
+    channel_id: Optional[int]
+    time: str
+    indices: tuple
+
+    @classmethod
+    def from_row(cls, row):
+        guild_id, enabled, channel_id, time, indices = row
+        return cls(guild_id, bool(enabled), channel_id, time, tuple(filter(None, (indices or '').split(','))))
+
+@dataclass(frozen=True, slots=True)
+class StockAlert:
+    """서버별 주식 변동 알림 설정"""
+    guild_id: int
+    enabled: bool
+    channel_id: Optional[int]
+    threshold: float
+
+    @classmethod
+    def from_row(cls, row):
+        guild_id, enabled, channel_id, threshold = row
+        return cls(guild_id, bool(enabled), channel_id, float(threshold))
+
+def normalize_time(value: str) -> str:
+    """HH:MM 형식으로 정규화 (예: 9:5 -> 09:05, 올바르지 않으면 ValueError)"""
+    hour, minute = map(int, value.split(':'))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(value)
+    return f'{hour:02d}:{minute:02d}'
+
+class GuildSettingsStore:
+    """서버별 설정 저장소 (SQLite 테이블, 서버 단위 조회 결과는 LRU 캐시)"""
+
+    # config.json에서 가져오기를 마쳤는지 기록하는 bot_meta 키
+    IMPORT_MARKER = 'config_guild_settings_imported'
+    LEVELING_IMPORT_MARKER = 'config_guild_leveling_imported'
+
+    def __init__(self, db, config, cache_size: int = 4096):
+        self.db = db
+        self.config = config
+        self.cache_size = cache_size
+        # (종류, guild_id) -> 조회 결과 (설정이 없는 서버도 None으로 캐시)
+        self._cache = OrderedDict()
+        # 무효화 세대 (조회 도중 무효화된 키는 조회 결과를 캐시하지 않음)
+        self._generation = 0
+        self._key_generations = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats['size'] = len(self._cache)
+        return stats
+
+    async def _cached(self, kind: str, guild_id: int, loader):
+        key = (kind, guild_id)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self._stats['hits'] += 1
+            return self._cache[key]
+
+        self._stats['misses'] += 1
+        generation = (self._generation, self._key_generations.get(key, 0))
+        value = await loader(guild_id)
+        if generation != (self._generation, self._key_generations.get(key, 0)):
+            # 읽는 동안 설정이 바뀌었으므로 읽은 값은 이번 호출에만 사용
+            return value
+
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self._stats['evictions'] += 1
+        return value
+
+    def invalidate(self, kind: str = None, guild_id: int = None):
+        """캐시 무효화 (kind가 없으면 전체)"""
+        if kind is None:
+            self._cache.clear()
+            self._key_generations.clear()
+            self._generation += 1
+        else:
+            key = (kind, guild_id)
+            self._cache.pop(key, None)
+            self._key_generations[key] = self._key_generations.get(key, 0) + 1
+
+    # ===== 환영 메시지 =====
+    async def _load_welcome(self, guild_id: int):
+        row = await self.db.get_guild_welcome(guild_id)
+        # [전역 설정 버전, 서버 설정 행, 합쳐진 설정] (전역 설정이 바뀌면 행은 그대로 두고 다시 합침)
+        return [None, row, None]
+
+    async def welcome_settings(self, guild_id: int) -> WelcomeSettings:
+        """서버별 환영 메시지 설정 스냅샷 (전역 설정 위에 서버 설정을 덮어씀)"""
+        entry = await self._cached('welcome', guild_id, self._load_welcome)
+        if entry[0] != self.config.version:
+            entry[2] = self._merge_welcome(entry[1])
+            entry[0] = self.config.version
+        return entry[2]
+
+    def _merge_welcome(self, row) -> WelcomeSettings:
+        merged = dict(self.config.get('welcome', default={}))
+        if row:
+            merged.update({column: value for column, value in zip(GUILD_WELCOME_COLUMNS, row) if value is not None})
+
+        defaults = WelcomeSettings()
+        # 전역 환영 채널(WELCOME_CHANNEL_ID)이 있으면 우선 사용
+        channel_id = self.config.get('welcome_channel_id') or merged.get('channel_id')
+        return WelcomeSettings(
+            enabled=bool(merged.get('enabled', defaults.enabled)),
+            title=merged.get('title', defaults.title),
+            description=merged.get('description', defaults.description),
+            color=int(merged.get('color', defaults.color)),
+            footer=merged.get('footer', defaults.footer),
+            show_member_count=bool(merged.get('show_member_count', defaults.show_member_count)),
+            show_avatar=bool(merged.get('show_avatar', defaults.show_avatar)),
+            channel_id=int(channel_id) if channel_id else None
+        )
+
+    async def set_welcome(self, guild_id: int, **kwargs):
+        """서버별 환영 메시지 설정 변경"""
+        await self.db.update_guild_welcome(guild_id, **kwargs)
+        self.invalidate('welcome', guild_id)
+        logger.info(f'서버 {guild_id}의 환영 메시지 설정 변경')
+
+    async def set_welcome_channel(self, guild_id: int, channel_id: int):
+        """서버별 환영 메시지 채널 설정"""
+        await self.set_welcome(guild_id, channel_id=channel_id)
+
+    # ===== 레벨링 =====
+    async def _load_leveling(self, guild_id: int):
+        row = await self.db.get_guild_leveling(guild_id)
+        # [전역 설정 버전, 서버 설정 행, 합쳐진 설정]
+        return [None, row, None]
+
+    async def leveling_settings(self, guild_id: int) -> LevelingSettings:
+        """서버별 레벨링 설정 스냅샷 (전역 설정 위에 서버 설정을 덮어씀)"""
+        entry = await self._cached('leveling', guild_id, self._load_leveling)
+        if entry[0] != self.config.version:
+            entry[2] = self._merge_leveling(entry[1])
+            entry[0] = self.config.version
+        return entry[2]
+
+    def _merge_leveling(self, row) -> LevelingSettings:
+        merged = dict(self.config.get('leveling', default={}))
+        if row:
+            merged.update({column: value for column, value in zip(GUILD_LEVELING_COLUMNS, row) if value is not None})
+
+        defaults = LevelingSettings()
+        return LevelingSettings(
+            enabled=bool(merged.get('enabled', defaults.enabled)),
+            xp_per_message=int(merged.get('xp_per_message', defaults.xp_per_message)),
+            xp_cooldown=float(merged.get('xp_cooldown', defaults.xp_cooldown)),
+            announce_level_up=bool(merged.get('announce_level_up', defaults.announce_level_up)),
+            level_up_message=merged.get('level_up_message') or defaults.level_up_message
+        )
+
+    async def set_leveling(self, guild_id: int, **kwargs):
+        """서버별 레벨링 설정 변경"""
+        await self.db.update_guild_leveling(guild_id, **kwargs)
+        self.invalidate('leveling', guild_id)
+        logger.info(f'서버 {guild_id}의 레벨링 설정 변경')
+
+    # ===== 뉴스 스케줄 =====
+    async def _load_news(self, guild_id: int):
+        row = await self.db.get_news_schedule(guild_id)
+        return NewsSchedule.from_row(row) if row else None
+
+    async def get_news_schedule(self, guild_id: int) -> Optional[NewsSchedule]:
+        return await self._cached('news', guild_id, self._load_news)
+
+    async def get_due_news_schedules(self, time: str) -> list:
+        """해당 시각에 전송할 뉴스 스케줄 (인덱스로 조회, 캐시하지 않음)"""
+        return [NewsSchedule.from_row(row) for row in await self.db.get_due_news_schedules(time)]
+
+    async def set_news_schedule(self, guild_id: int, channel_id: int, time: str, news_type: str):
+        await self.db.set_news_schedule(guild_id, channel_id, time, news_type)
+        self.invalidate('news', guild_id)
+
+    async def set_news_enabled(self, guild_id: int, enabled: bool) -> bool:
+        updated = await self.db.set_news_schedule_enabled(guild_id, enabled)
+        self.invalidate('news', guild_id)
+        return updated
+
+    # ===== 주식 스케줄 =====
+    async def _load_stocks(self, guild_id: int):
+        row = await self.db.get_stocks_schedule(guild_id)
+        return StocksSchedule.from_row(row) if row else None
+
+    async def get_stocks_schedule(self, guild_id: int) -> Optional[StocksSchedule]:
+        return await self._cached('stocks', guild_id, self._load_stocks)
+
+    async def get_due_stocks_schedules(self, time: str) -> list:
+        """해당 시각에 전송할 주식 스케줄 (인덱스로 조회, 캐시하지 않음)"""
+        return [StocksSchedule.from_row(row) for row in await self.db.get_due_stocks_schedules(time)]
+
+    async def set_stocks_schedule(self, guild_id: int, channel_id: int, time: str, indices: list):
+        await self.db.set_stocks_schedule(guild_id, channel_id, time, ','.join(indices))
+        self.invalidate('stocks', guild_id)
+
+    async def set_stocks_enabled(self, guild_id: int, enabled: bool) -> bool:
+        updated = await self.db.set_stocks_schedule_enabled(guild_id, enabled)
+        self.invalidate('stocks', guild_id)
+        return updated
+
+    # ===== 주식 알림 =====
+    async def _load_alert(self, guild_id: int):
+        row = await self.db.get_stock_alert(guild_id)
+        return StockAlert.from_row(row) if row else None
+
+    async def get_stock_alert(self, guild_id: int) -> Optional[StockAlert]:
+        return await self._cached('alert', guild_id, self._load_alert)
+
+    async def get_enabled_stock_alerts(self) -> list:
+        return [StockAlert.from_row(row) for row in await self.db.get_enabled_stock_alerts()]
+
+    async def set_stock_alert(self, guild_id: int, channel_id: int, threshold: float):
+        await self.db.set_stock_alert(guild_id, channel_id, threshold)
+        self.invalidate('alert', guild_id)
+
+    async def set_stock_alert_enabled(self, guild_id: int, enabled: bool) -> bool:
+        updated = await self.db.set_stock_alert_enabled(guild_id, enabled)
+        self.invalidate('alert', guild_id)
+        return updated
+
+    # ===== config.json 가져오기 =====
+    async def import_from_config(self) -> bool:
+        """config.json의 서버별 설정을 DB로 한 번만 옮기고 config.json에서 제거 (새로 옮긴 것이 있으면 True)"""
+        imported = await self._import_guild_settings()
+        imported = await self._import_guild_leveling() or imported
+        # 읽기 전용 마운트(ConfigMap)는 다시 쓸 수 없으므로 파일은 그대로 둠 (완료 표시 덕분에 다시 가져오지 않음)
+        if imported and not self.config.read_only:
+            self.config._save_config(self.config.config)
+        return imported
+
+    async def _import_guild_settings(self) -> bool:
+        if await self.db.get_meta(self.IMPORT_MARKER):
+            return False
+
+        config = self.config.config
+        guilds = config.get('guilds') or {}
+
+        welcome_rows = []
+        for guild_id, guild_config in guilds.items():
+            welcome = dict(guild_config.get('welcome') or {})
+            if guild_config.get('welcome_channel_id'):
+                welcome['channel_id'] = int(guild_config['welcome_channel_id'])
+            if welcome:
+                welcome_rows.append((int(guild_id), *(welcome.get(column) for column in GUILD_WELCOME_COLUMNS)))
+
+        news_rows = []
+        for guild_id, schedule in (config.get('news_schedules') or {}).items():
+            time = self._import_time(schedule.get('time', '09:00'), guild_id)
+            news_rows.append((int(guild_id), int(bool(schedule.get('enabled', False))), schedule.get('channel_id'),
+                              time, schedule.get('news_type', '구글_뉴스_한국')))
+
+        stocks_rows = []
+        for guild_id, schedule in (config.get('stocks_schedules') or {}).items():
+            time = self._import_time(schedule.get('time', '09:00'), guild_id)
+            indices = schedule.get('indices', ['코스피', '코스닥', '나스닥'])
+            stocks_rows.append((int(guild_id), int(bool(schedule.get('enabled', False))), schedule.get('channel_id'),
+                                time, ','.join(indices)))
+
+        alert_rows = []
+        for guild_id, alert in (config.get('stock_alerts') or {}).items():
+            alert_rows.append((int(guild_id), int(bool(alert.get('enabled', False))), alert.get('channel_id'),
+                               float(alert.get('threshold', 5.0))))
+
+        await self.db.import_guild_settings(welcome_rows, news_rows, stocks_rows, alert_rows, self.IMPORT_MARKER)
+        self.invalidate()
+
+        # 옮긴 설정은 메모리의 설정에서 제거 (전역 설정만 남김)
+        self._strip_guild_keys('welcome', 'welcome_channel_id')
+        for key in ('news_schedules', 'stocks_schedules', 'stock_alerts'):
+            config.pop(key, None)
+
+        logger.info(
+            f'config.json 서버별 설정 가져오기 완료: 환영 {len(welcome_rows)}, 뉴스 {len(news_rows)}, '
+            f'주식 {len(stocks_rows)}, 알림 {len(alert_rows)}'
+        )
+        return bool(welcome_rows or news_rows or stocks_rows or alert_rows)
+
+    async def _import_guild_leveling(self) -> bool:
+        if await self.db.get_meta(self.LEVELING_IMPORT_MARKER):
+            return False
+
+        leveling_rows = []
+        for guild_id, guild_config in (self.config.get('guilds') or {}).items():
+            leveling = guild_config.get('leveling') or {}
+            if leveling:
+                leveling_rows.append((int(guild_id), *(leveling.get(column) for column in GUILD_LEVELING_COLUMNS)))
+
+        await self.db.import_guild_leveling(leveling_rows, self.LEVELING_IMPORT_MARKER)
+        self.invalidate()
+        self._strip_guild_keys('leveling')
+
+        logger.info(f'config.json 서버별 레벨링 설정 가져오기 완료: {len(leveling_rows)}')
+        return bool(leveling_rows)
+
+    def _strip_guild_keys(self, *keys):
+        guilds = self.config.get('guilds') or {}
+        for guild_id in list(guilds):
+            for key in keys:
+                guilds[guild_id].pop(key, None)
+            if not guilds[guild_id]:
+                del guilds[guild_id]
+
+    @staticmethod
+    def _import_time(value: str, guild_id: str) -> str:
+        try:
+            return normalize_time(value)
+        except (ValueError, AttributeError):
+            logger.warning(f'서버 {guild_id}의 스케줄 시간이 올바르지 않아 09:00으로 가져옵니다: {value}')
+            return '09:00'
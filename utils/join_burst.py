@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import discord
+
+logger = logging.getLogger(__name__)
+
+# 임베드 하나에 담는 멤버 수와 메시지 하나에 담는 임베드 수 (메시지당 임베드 글자 수 합계 6000자 제한)
+MEMBERS_PER_EMBED = 40
+EMBEDS_PER_MESSAGE = 5
+
+class JoinRateTracker:
+    """서버별 슬라이딩 윈도우 참가 속도 측정 (window초 안에 threshold명 이상이면 몰림 상태)"""
+
+    def __init__(self, window: float = 10.0, threshold: int = 10, cooldown: float = 30.0):
+        self.window = window
+        self.threshold = threshold
+        # 몰림이 끝난 뒤에도 이 시간(초) 동안은 묶음 모드 유지 (모드가 자주 바뀌지 않도록)
+        self.cooldown = cooldown
+        # guild_id -> 최근 참가 시각 (최대 threshold개만 보관)
+        self._joins = {}
+        self._burst_until = {}
+
+    def record(self, guild_id: int) -> bool:
+        """참가 기록 후 몰림 상태 여부 반환"""
+        now = time.monotonic()
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            joins = self._joins[guild_id] = deque(maxlen=self.threshold)
+        joins.append(now)
+
+        # 가장 오래된 기록이 창 안에 있으면 창 안에 threshold명 이상 참가한 것
+        if len(joins) >= self.threshold and now - joins[0] <= self.window:
+            self._burst_until[guild_id] = now + self.cooldown
+
+        until = self._burst_until.get(guild_id)
+        if until is None:
+            return False
+        if now >= until:
+            del self._burst_until[guild_id]
+            return False
+        return True
+
+class JoinDigest:
+    """몰림 상태에서 참가한 멤버를 모아 주기적으로 묶음 환영 임베드로 전송"""
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        # channel_id -> (채널, 멤버 멘션 목록, 임베드 색상)
+        self._pending = {}
+        self._tasks = {}
+        self._stats = {'members': 0, 'messages': 0}
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats['pending'] = sum(len(mentions) for _, mentions, _ in self._pending.values())
+        return stats
+
+    def add(self, channel, member: discord.Member, color: discord.Color = None):
+        """묶음 전송 대기열에 추가"""
+        entry = self._pending.get(channel.id)
+        if entry is None:
+            entry = self._pending[channel.id] = (channel, [], color)
+        entry[1].append(member.mention)
+        self._stats['members'] += 1
+
+        if channel.id not in self._tasks:
+            self._tasks[channel.id] = asyncio.create_task(self._flush_later(channel.id))
+
+    def _build_embeds(self, guild: discord.Guild, mentions: list, color) -> list:
+        embeds = []
+        for start in range(0, len(mentions), MEMBERS_PER_EMBED):
+            embed = discord.Embed(
+                description=", ".join(mentions[start:start + MEMBERS_PER_EMBED]),
+                color=color or discord.Color.green()
+            )
+            embeds.append(embed)
+
+        embeds[0].title = f"🎉 새로운 멤버 {len(mentions)}명이 도착했습니다!"
+        embeds[-1].add_field(name="서버 정보", value=f"현재 멤버 수: {guild.member_count}명", inline=False)
+        embeds[-1].set_footer(text="모두 환영합니다!")
+        embeds[-1].timestamp = discord.utils.utcnow()
+        return embeds
+
+    async def _flush_later(self, channel_id: int):
+        await asyncio.sleep(self.interval)
+        # 전송 중 참가한 멤버는 다음 묶음으로 분리
+        self._tasks.pop(channel_id, None)
+        channel, mentions, color = self._pending.pop(channel_id)
+
+        embeds = self._build_embeds(channel.guild, mentions, color)
+        for start in range(0, len(embeds), EMBEDS_PER_MESSAGE):
+            try:
+                await channel.send(embeds=embeds[start:start + EMBEDS_PER_MESSAGE])
+                self._stats['messages'] += 1
+            except Exception as e:
+                logger.error(f'묶음 환영 메시지 전송 오류: {e}')
+        logger.info(f'묶음 환영 메시지 전송: {len(mentions)}명 in {channel.guild.name}')
+
+    def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
@@ -0,0 +1,84 @@
+import time
+
+class LeaderboardSnapshot:
+    """서버 하나의 순위표 스냅샷 (조회한 페이지만 보관)"""
+
+    __slots__ = ('total_count', 'pages', 'created_at', 'expires_at')
+
+    def __init__(self, total_count: int, created_at: float, expires_at: float):
+        self.total_count = total_count
+        self.pages = {}
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+class LeaderboardCache:
+    """서버별 순위표 스냅샷 캐시 (짧은 TTL, XP 기록 시 min_age초 이상 지난 스냅샷만 무효화)"""
+
+    def __init__(self, db, ttl: float = 30.0, page_size: int = 10, min_age: float = 10.0):
+        self.db = db
+        self.ttl = ttl
+        self.page_size = page_size
+        # XP는 몇 초마다 기록되므로 그때마다 버리면 만드는 도중이거나 막 만든 스냅샷도 사라져 캐시가 동작하지 않음
+        self.min_age = min_age
+        self._snapshots = {}
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get_stats(self) -> dict:
+        """캐시 사용 통계"""
+        stats = dict(self._stats)
+        stats['guilds'] = len(self._snapshots)
+        return stats
+
+    def invalidate(self, guild_ids, force: bool = False):
+        """XP가 기록된 서버의 스냅샷 제거 (force가 아니면 min_age초가 지나지 않은 스냅샷은 유지)"""
+        now = time.monotonic()
+        for guild_id in guild_ids:
+            snapshot = self._snapshots.get(guild_id)
+            if snapshot is None or (not force and now - snapshot.created_at < self.min_age):
+                continue
+            del self._snapshots[guild_id]
+            self._stats['invalidations'] += 1
+
+    async def _snapshot(self, guild_id: int) -> LeaderboardSnapshot:
+        now = time.monotonic()
+        snapshot = self._snapshots.get(guild_id)
+        if snapshot is None or snapshot.expires_at <= now:
+            total_count = await self.db.get_leaderboard_count(guild_id)
+            snapshot = LeaderboardSnapshot(total_count, now, now + self.ttl)
+            self._snapshots[guild_id] = snapshot
+
+            # 만료된 다른 서버 스냅샷 정리
+            for expired_id in [gid for gid, s in self._snapshots.items() if s.expires_at <= now]:
+                del self._snapshots[expired_id]
+        return snapshot
+
+    async def get_page(self, guild_id: int, page: int) -> tuple:
+        """(페이지 행 목록, 전체 사용자 수) 반환 (page는 1부터)"""
+        snapshot = await self._snapshot(guild_id)
+        rows = snapshot.pages.get(page)
+        if rows is not None:
+            self._stats['hits'] += 1
+            return rows, snapshot.total_count
+
+        self._stats['misses'] += 1
+        offset = (page - 1) * self.page_size
+        if offset >= snapshot.total_count:
+            return [], snapshot.total_count
+
+        # 이전 페이지가 캐시에 있으면 마지막 행을 커서로 사용
+        previous = snapshot.pages.get(page - 1)
+        if page == 1:
+            cursor = None
+        elif previous:
+            cursor = (previous[-1][1], previous[-1][0])
+        else:
+            cursor = await self.db.get_leaderboard_cursor(guild_id, offset)
+
+        rows = []
+        if page == 1 or cursor is not None:
+            rows = await self.db.get_leaderboard_page(guild_id, limit=self.page_size, after=cursor)
+
+        # 조회 도중 무효화되지 않았을 때만 저장
+        if self._snapshots.get(guild_id) is snapshot:
+            snapshot.pages[page] = rows
+        return rows, snapshot.total_count
@@ -0,0 +1,120 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import discord
+
+logger = logging.getLogger(__name__)
+
+# 디스코드 메시지 최대 길이보다 조금 작게 잡은 한 메시지 최대 길이
+MAX_MESSAGE_LENGTH = 1900
+
+class _ChannelQueue:
+    __slots__ = ('notices', 'dropped', 'interval', 'task')
+
+    def __init__(self, interval: float):
+        self.notices = []  # (priority, 순번, 텍스트) 최소 힙
+        self.dropped = 0
+        # 전송 후 다음 전송까지 알림을 모으는 시간 (rate limit에 걸리면 늘어남)
+        self.interval = interval
+        self.task = None
+
+class LevelUpAnnouncer:
+    """채널별 레벨업 알림 큐 (한가한 채널은 바로 전송, 직전 전송 직후에 몰린 알림만 한 메시지로 합침)"""
+
+    def __init__(self, window: float = 2.0, max_interval: float = 5.0, max_pending: int = 20,
+                 delete_after: float = 10, slow_send: float = 1.0):
+        # 전송 후 window초 안에 들어온 알림은 모아서 다음 메시지로 전송
+        self.window = window
+        # 전송이 slow_send초 이상 걸리면 (rate limit 대기) 합치는 간격을 max_interval초까지 두 배씩 늘림
+        self.max_interval = max_interval
+        self.slow_send = slow_send
+        self.max_pending = max_pending
+        self.delete_after = delete_after
+        self._channels = {}
+        self._counter = itertools.count()
+        self._stats = {'notices': 0, 'messages': 0, 'immediate': 0, 'dropped': 0, 'rate_limited': 0}
+
+    def get_stats(self) -> dict:
+        """알림 처리 통계"""
+        stats = dict(self._stats)
+        stats['pending_channels'] = len(self._channels)
+        return stats
+
+    def announce(self, channel, text: str, priority: int = 0):
+        """알림 예약 (priority가 낮은 알림부터 합쳐지거나 버려짐)"""
+        queue = self._channels.get(channel.id)
+        if queue is None:
+            queue = self._channels[channel.id] = _ChannelQueue(self.window)
+
+        self._stats['notices'] += 1
+        heapq.heappush(queue.notices, (priority, next(self._counter), text))
+
+        # 큐가 밀리면 우선순위가 가장 낮은 알림은 개수로만 표시
+        while len(queue.notices) > self.max_pending:
+            heapq.heappop(queue.notices)
+            queue.dropped += 1
+            self._stats['dropped'] += 1
+
+        if queue.task is None:
+            queue.task = asyncio.create_task(self._flush_channel(channel, queue))
+
+    def _render(self, queue: _ChannelQueue) -> str:
+        """대기 중인 알림을 우선순위 높은 순으로 한 메시지에 담기"""
+        notices = sorted(queue.notices, key=lambda n: (-n[0], n[1]))
+        queue.notices = []
+        remaining = queue.dropped
+        queue.dropped = 0
+
+        lines = []
+        length = 0
+        for index, (_, _, text) in enumerate(notices):
+            if length + len(text) + 1 > MAX_MESSAGE_LENGTH:
+                remaining += len(notices) - index
+                break
+            lines.append(text)
+            length += len(text) + 1
+
+        if remaining:
+            lines.append(f'… 외 {remaining}건의 레벨업')
+        return '\n'.join(lines)
+
+    async def _flush_channel(self, channel, queue: _ChannelQueue):
+        try:
+            # 한가한 채널은 첫 알림을 기다리지 않고 바로 전송
+            self._stats['immediate'] += 1
+            while queue.notices:
+                content = self._render(queue)
+                started = time.monotonic()
+                rate_limited = False
+                try:
+                    await channel.send(content, delete_after=self.delete_after)
+                    self._stats['messages'] += 1
+                except discord.HTTPException as e:
+                    rate_limited = e.status == 429
+                    logger.error(f'레벨업 메시지 전송 오류: {e}')
+                except Exception as e:
+                    logger.error(f'레벨업 메시지 전송 오류: {e}')
+
+                # discord.py는 rate limit 헤더에 따라 전송 전에 대기하므로 오래 걸린 전송은 제한에 걸린 것으로 판단
+                finished = time.monotonic()
+                if rate_limited or finished - started >= self.slow_send:
+                    self._stats['rate_limited'] += 1
+                    queue.interval = min(self.max_interval, queue.interval * 2)
+                else:
+                    queue.interval = self.window
+
+                # 그동안 들어온 알림을 모아 한 메시지로 전송 (없으면 채널이 다시 한가해진 것으로 보고 종료)
+                await asyncio.sleep(queue.interval)
+        finally:
+            queue.task = None
+            if not queue.notices:
+                self._channels.pop(channel.id, None)
+
+    def close(self):
+        """대기 중인 전송 작업 취소"""
+        for queue in self._channels.values():
+            if queue.task:
+                queue.task.cancel()
+        self._channels.clear()
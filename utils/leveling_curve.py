@@ -0,0 +1,71 @@
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+
+class LevelCurve(ABC):
+    """레벨 곡선 기본 클래스 (레벨별 필요 총 XP와 그 역함수)"""
+
+    @abstractmethod
+    def xp_for_level(self, level: int) -> int:
+        """특정 레벨에 도달하기 위한 총 XP"""
+
+    @abstractmethod
+    def level_for_xp(self, xp: int) -> int:
+        """XP로부터 레벨 계산 (xp_for_level(L) <= xp 인 가장 큰 L, 최소 0)"""
+
+    def progress(self, xp: int, level: int) -> tuple:
+        """현재 레벨 구간에서의 진행 XP와 구간 전체 XP"""
+        current_level_xp = self.xp_for_level(level)
+        next_level_xp = self.xp_for_level(level + 1)
+        return xp - current_level_xp, next_level_xp - current_level_xp
+
+class QuadraticCurve(LevelCurve):
+    """필요 XP = a * (level ^ 2) + b * level + c 곡선 (근의 공식으로 역산)"""
+
+    def __init__(self, a: int = 5, b: int = 50, c: int = 100):
+        self.a = a
+        self.b = b
+        self.c = c
+
+    def xp_for_level(self, level: int) -> int:
+        return self.a * level * level + self.b * level + self.c
+
+    def level_for_xp(self, xp: int) -> int:
+        if xp < self.xp_for_level(1):
+            return 0
+
+        # a*L^2 + b*L + (c - xp) <= 0 의 양의 근을 정수 제곱근으로 계산
+        discriminant = self.b * self.b - 4 * self.a * (self.c - xp)
+        level = (math.isqrt(discriminant) - self.b) // (2 * self.a)
+
+        # 정수 나눗셈 오차 보정 (최대 한두 단계)
+        while self.xp_for_level(level + 1) <= xp:
+            level += 1
+        while level > 0 and self.xp_for_level(level) > xp:
+            level -= 1
+        return level
+
+class TableCurve(LevelCurve):
+    """임의의 단조 증가 함수를 미리 계산한 임계값 배열로 이분 탐색하는 곡선"""
+
+    def __init__(self, xp_for_level, initial_levels: int = 200):
+        self._xp_for_level = xp_for_level
+        # thresholds[L] = 레벨 L 도달에 필요한 총 XP (레벨 0은 조건 없음)
+        self._thresholds = [0]
+        self._extend(initial_levels)
+
+    def _extend(self, max_level: int):
+        for level in range(len(self._thresholds), max_level + 1):
+            self._thresholds.append(self._xp_for_level(level))
+
+    def xp_for_level(self, level: int) -> int:
+        return self._xp_for_level(level)
+
+    def level_for_xp(self, xp: int) -> int:
+        # 표 범위를 넘어서는 XP는 표를 두 배씩 늘려서 처리
+        while xp >= self._thresholds[-1]:
+            self._extend(len(self._thresholds) * 2)
+        return max(bisect_right(self._thresholds, xp) - 1, 0)
+
+# 기본 레벨 곡선: 5 * (level ^ 2) + 50 * level + 100
+DEFAULT_CURVE = QuadraticCurve()
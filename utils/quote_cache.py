@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 자산 종류별 시세 유효 시간(초) (암호화폐는 24시간 거래되어 더 자주 갱신)
+DEFAULT_TTLS = {
+    'crypto': 30.0,
+    'fx': 60.0,
+    'index': 60.0,
+    'equity': 60.0,
+}
+
+def asset_class(ticker: str) -> str:
+    """티커로 자산 종류 구분 (crypto, fx, index, equity)"""
+    if ticker.endswith('=X'):
+        return 'fx'
+    if ticker.startswith('^'):
+        return 'index'
+    if ticker.endswith(('-USD', '-KRW', '-USDT')):
+        return 'crypto'
+    return 'equity'
+
+class QuoteCache:
+    """공용 시세 캐시 (자산 종류별 TTL, 같은 종목 동시 요청은 한 번만 조회, 만료 직후에는 이전 값을 주고 백그라운드 갱신)"""
+
+    def __init__(self, service, ttls: dict = None, stale_for: float = 300.0, max_size: int = 1024):
+        self.service = service
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        # 유효 시간이 지난 뒤에도 이 시간(초) 동안은 이전 값을 바로 반환하면서 갱신
+        self.stale_for = stale_for
+        self.max_size = max_size
+        # ticker -> (시세, 조회 시각)
+        self._entries = OrderedDict()
+        # ticker -> 진행 중인 조회 작업 (동시 요청이 같은 작업을 기다림)
+        self._inflight = {}
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'fetches': 0, 'fetch_failures': 0,
+                       'batch_fetches': 0}
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats['size'] = len(self._entries)
+        stats['inflight'] = len(self._inflight)
+        stats['upstream'] = self.service.get_stats()
+        return stats
+
+    def _fetch(self, ticker: str) -> asyncio.Task:
+        task = self._inflight.get(ticker)
+        if task is not None:
+            self._stats['coalesced'] += 1
+            return task
+
+        task = self._inflight[ticker] = asyncio.create_task(self._load(ticker))
+        return task
+
+    async def _load(self, ticker: str) -> Optional[dict]:
+        self._stats['fetches'] += 1
+        try:
+            data = await self.service.get_quote(ticker)
+        finally:
+            self._inflight.pop(ticker, None)
+
+        return self._store(ticker, data)
+
+    def _store(self, ticker: str, data: Optional[dict]) -> Optional[dict]:
+        if data is None:
+            # 조회 실패 시 이전 값은 유지 (만료 전까지 계속 사용)
+            self._stats['fetch_failures'] += 1
+            return None
+
+        self._entries[ticker] = (data, time.monotonic())
+        self._entries.move_to_end(ticker)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return data
+
+    def _fresh(self, ticker: str) -> Optional[dict]:
+        entry = self._entries.get(ticker)
+        if entry is not None and time.monotonic() - entry[1] < self.ttls[asset_class(ticker)]:
+            return entry[0]
+        return None
+
+    async def get_quote(self, ticker: str, allow_stale: bool = True) -> Optional[dict]:
+        """종목 시세 (allow_stale이면 만료 직후 이전 값을 바로 반환하고 백그라운드에서 갱신)"""
+        entry = self._entries.get(ticker)
+        if entry is not None:
+            data, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            ttl = self.ttls[asset_class(ticker)]
+            if age < ttl:
+                self._stats['hits'] += 1
+                return data
+            if allow_stale and age < ttl + self.stale_for:
+                self._stats['stale_hits'] += 1
+                self._fetch(ticker)
+                return data
+
+        self._stats['misses'] += 1
+        # 한 요청이 취소되어도 같은 조회를 기다리는 다른 요청에는 영향 없도록 shield
+        data = await asyncio.shield(self._fetch(ticker))
+        if data is None and entry is not None and allow_stale:
+            # 갱신에 실패하면 오래된 값이라도 반환
+            return entry[0]
+        return data
+
+    async def get_quotes(self, tickers, allow_stale: bool = True) -> dict:
+        """여러 종목 동시 조회 (ticker -> 시세, 실패한 종목은 None)"""
+        unique = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(*(self.get_quote(ticker, allow_stale) for ticker in unique))
+        return dict(zip(unique, results))
+
+    async def get_quotes_batch(self, tickers) -> dict:
+        """여러 종목을 일괄 조회로 갱신 (유효한 캐시 값과 진행 중인 조회는 재사용, 만료된 값은 쓰지 않음)"""
+        unique = list(dict.fromkeys(tickers))
+        results = {}
+        pending = {}
+        missing = []
+        for ticker in unique:
+            data = self._fresh(ticker)
+            if data is not None:
+                self._stats['hits'] += 1
+                results[ticker] = data
+            elif ticker in self._inflight:
+                self._stats['coalesced'] += 1
+                pending[ticker] = self._inflight[ticker]
+            else:
+                self._stats['misses'] += 1
+                missing.append(ticker)
+
+        if missing:
+            # 일괄 조회 중 들어온 같은 종목 요청도 이 조회를 기다리도록 종목별 future 등록
+            loop = asyncio.get_running_loop()
+            futures = {ticker: loop.create_future() for ticker in missing}
+            self._inflight.update(futures)
+            self._stats['batch_fetches'] += 1
+            quotes = {}
+            try:
+                quotes = await self.service.get_quotes_batch(missing)
+            finally:
+                for ticker, future in futures.items():
+                    if self._inflight.get(ticker) is future:
+                        del self._inflight[ticker]
+                    data = self._store(ticker, quotes.get(ticker))
+                    results[ticker] = data
+                    if not future.done():
+                        future.set_result(data)
+
+        for ticker, task in pending.items():
+            results[ticker] = await asyncio.shield(task)
+        return results
+
+    async def get_info(self, ticker: str) -> dict:
+        """종목 정보 (캐시하지 않음)"""
+        return await self.service.get_info(ticker)
+
+    def close(self):
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+        logger.info(f'시세 캐시 통계: {self.get_stats()}')
+        self.service.close()
@@ -0,0 +1,208 @@
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+def quote_from_closes(closes: list) -> Optional[dict]:
+    """종가 목록의 마지막 두 값으로 현재가와 전일 대비 변동 계산"""
+    if not closes:
+        return None
+
+    current_price = float(closes[-1])
+    if len(closes) >= 2:
+        previous_price = float(closes[-2])
+        change = current_price - previous_price
+        change_percent = (change / previous_price) * 100
+    else:
+        change = 0
+        change_percent = 0
+
+    return {
+        'price': current_price,
+        'change': change,
+        'change_percent': change_percent
+    }
+
+class QuoteProvider(ABC):
+    """시세 제공자 기본 클래스 (동기 호출, QuoteService가 스레드 풀에서 실행)"""
+
+    name = 'base'
+
+    @abstractmethod
+    def fetch_quote(self, ticker: str) -> Optional[dict]:
+        """종목 시세 (데이터가 없으면 None)"""
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        """여러 종목 일괄 조회 (ticker -> 시세 또는 None)"""
+        return {ticker: self.fetch_quote(ticker) for ticker in tickers}
+
+    @abstractmethod
+    def fetch_info(self, ticker: str) -> dict:
+        """종목 정보 (longName, shortName 등)"""
+
+class YFinanceProvider(QuoteProvider):
+    """Yahoo Finance 시세 (yfinance, 네트워크 필요)"""
+
+    name = 'yfinance'
+
+    def __init__(self, download_threads: int = 4):
+        # 오프라인 제공자만 쓰는 환경에서는 yfinance가 없어도 되도록 여기서 가져옴
+        import yfinance
+        self._yf = yfinance
+        # yf.download는 종목마다 따로 요청하므로 한 묶음 안에서 동시에 보내는 요청 수
+        self.download_threads = download_threads
+
+    def fetch_quote(self, ticker: str) -> Optional[dict]:
+        hist = self._yf.Ticker(ticker).history(period="2d")
+        if hist.empty:
+            return None
+        return quote_from_closes(hist['Close'].dropna().tolist())
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        """yf.download로 여러 종목 조회
+
+        yf.download는 하나의 요청이 아니라 종목마다 요청을 보내고 결과를 한 표로 합치므로
+        download_threads개 스레드로 나눠 동시에 요청 (묶음 크기와 제한 시간은 QuoteService에서 관리)
+        거래일이 다른 종목(한국/미국 주식, 24시간 거래되는 암호화폐)이 한 표에 섞이면 날짜가 맞지 않는 칸이 비므로
+        5일치를 받아 종목별로 마지막 두 종가를 사용
+        """
+        threads = max(min(self.download_threads, len(tickers)), 1)
+        frame = self._yf.download(tickers, period="5d", group_by='ticker', progress=False,
+                                  threads=threads if threads > 1 else False)
+        quotes = {}
+        for ticker in tickers:
+            try:
+                # yfinance 버전에 따라 종목이 하나면 열이 (종목, 항목)이 아닌 항목만으로 구성됨
+                closes = frame[ticker]['Close'] if frame.columns.nlevels > 1 else frame['Close']
+            except KeyError:
+                quotes[ticker] = None
+                continue
+            quotes[ticker] = quote_from_closes(closes.dropna().tolist())
+        return quotes
+
+    def fetch_info(self, ticker: str) -> dict:
+        return self._yf.Ticker(ticker).info
+
+class ReplayProvider(QuoteProvider):
+    """기록된 가격 시계열을 재생하는 오프라인 제공자 (부하 테스트, 벤치마크용)
+
+    파일 형식: {"AAPL": {"name": "Apple Inc.", "closes": [189.1, 190.4, ...]}, ...}
+    조회할 때마다 종목별 위치가 한 칸씩 앞으로 이동하고, 끝에 도달하면 처음부터 반복
+    지연과 오류는 (seed, 요청 대상, 몇 번째 호출인지)로 정해지므로 스레드 실행 순서와 관계없이 같은 결과를 재현
+    """
+
+    name = 'replay'
+
+    def __init__(self, path: str = None, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 synthesize: bool = True, seed: int = 0):
+        # 호출마다 latency초 ± jitter초 지연, error_rate 확률로 오류 발생
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        # 파일에 없는 종목은 종목 이름으로 정해지는 무작위 가격 흐름을 생성 (대량 종목 테스트용)
+        self.synthesize = synthesize
+        self.seed = seed
+        self._lock = threading.Lock()
+        # 요청 대상 -> 호출 횟수 (호출별 난수 시드 결정)
+        self._calls = {}
+        self._series = {}
+        self._names = {}
+        # ticker -> 다음에 반환할 위치
+        self._positions = {}
+        if path:
+            self._load(path)
+
+    def _load(self, path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+        for ticker, entry in recorded.items():
+            closes = [float(close) for close in entry.get('closes', [])]
+            if closes:
+                self._series[ticker] = closes
+                self._names[ticker] = entry.get('name', ticker)
+        logger.info(f'재생 시세 로드 완료: {path} ({len(self._series)}개 종목)')
+
+    def _synthesize(self, ticker: str) -> list:
+        # 실행마다 같은 결과가 나오도록 hash() 대신 crc32로 시드 결정
+        rng = random.Random(zlib.crc32(ticker.encode()))
+        price = rng.uniform(10, 1000)
+        closes = []
+        for _ in range(64):
+            price *= 1 + rng.gauss(0, 0.03)
+            closes.append(round(price, 4))
+        return closes
+
+    def _series_for(self, ticker: str) -> Optional[list]:
+        series = self._series.get(ticker)
+        if series is None and self.synthesize:
+            series = self._series[ticker] = self._synthesize(ticker)
+        return series
+
+    def _delay_and_fail(self, key: str):
+        # 여러 스레드가 공유하는 난수열을 쓰면 어느 호출이 어떤 값을 받을지 실행 순서에 따라 달라지므로
+        # 요청 대상별 호출 순번으로 난수 시드를 정함
+        with self._lock:
+            count = self._calls.get(key, 0)
+            self._calls[key] = count + 1
+        rng = random.Random(zlib.crc32(f'{self.seed}:{key}:{count}'.encode()))
+        delay = max(self.latency + rng.uniform(-self.jitter, self.jitter), 0)
+        fail = rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ConnectionError('재생 제공자 주입 오류')
+
+    def _next(self, ticker: str) -> Optional[dict]:
+        with self._lock:
+            series = self._series_for(ticker)
+            if not series:
+                return None
+            position = self._positions.get(ticker, 0)
+            self._positions[ticker] = position + 1
+        if len(series) == 1:
+            return quote_from_closes(series)
+        # 마지막 종가 다음에는 첫 종가와 비교하지 않도록 두 번째 값부터 다시 시작 (가짜 급등락 방지)
+        index = 1 + position % (len(series) - 1)
+        return quote_from_closes([series[index - 1], series[index]])
+
+    def fetch_quote(self, ticker: str) -> Optional[dict]:
+        self._delay_and_fail(ticker)
+        return self._next(ticker)
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        # 일괄 조회도 한 번의 요청처럼 지연과 오류를 한 번만 적용
+        self._delay_and_fail(','.join(tickers))
+        return {ticker: self._next(ticker) for ticker in tickers}
+
+    def fetch_info(self, ticker: str) -> dict:
+        self._delay_and_fail(f'info:{ticker}')
+        with self._lock:
+            if self._series_for(ticker) is None:
+                raise KeyError(ticker)
+        return {'longName': self._names.get(ticker, ticker), 'shortName': ticker}
+
+# config.json의 stocks.provider 값 -> 제공자 클래스
+PROVIDERS = {
+    YFinanceProvider.name: YFinanceProvider,
+    ReplayProvider.name: ReplayProvider,
+}
+
+def create_provider(settings: dict = None) -> QuoteProvider:
+    """설정으로 시세 제공자 생성
+
+    예: {"provider": "replay", "replay": {"path": "data/quotes.json", "latency": 0.2, "error_rate": 0.01}}
+    """
+    settings = settings or {}
+    name = settings.get('provider', YFinanceProvider.name)
+    provider_class = PROVIDERS.get(name)
+    if provider_class is None:
+        raise ValueError(f'알 수 없는 시세 제공자: {name} (사용 가능: {", ".join(PROVIDERS)})')
+    provider = provider_class(**(settings.get(name) or {}))
+    logger.info(f'시세 제공자: {name}')
+    return provider
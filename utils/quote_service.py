@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from utils.quote_providers import QuoteProvider
+
+logger = logging.getLogger(__name__)
+
+class QuoteService:
+    """시세 조회 서비스 (제공자를 전용 스레드 풀에서 호출, 호출별 제한 시간, 여러 종목 동시 조회)"""
+
+    def __init__(self, provider: QuoteProvider, max_workers: int = 4, timeout: float = 10.0,
+                 batch_timeout: float = 30.0, batch_size: int = 100):
+        self.provider = provider
+        self.timeout = timeout
+        # 일괄 조회는 batch_size개 종목씩 나눠 묶음마다 batch_timeout초 제한 (실패한 묶음만 종목별로 다시 조회)
+        self.batch_timeout = batch_timeout
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='quotes')
+        # 제한 시간이 지나도 스레드의 호출은 끝까지 실행되므로 스레드가 실제로 끝날 때 자리를 반납
+        # (응답 없는 호출이 쌓여 풀 대기열이 끝없이 늘어나지 않도록)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._stats = {'requests': 0, 'ok': 0, 'empty': 0, 'errors': 0, 'timeouts': 0, 'batches': 0, 'batch_tickers': 0}
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats['provider'] = self.provider.name
+        return stats
+
+    async def _submit(self, func, *args):
+        await self._slots.acquire()
+        return await self._run(func, *args)
+
+    async def _run(self, func, *args):
+        """자리를 확보한 상태에서 스레드 풀에 제출 (스레드가 끝나면 자리 반납)"""
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._slots.release)
+            except RuntimeError:
+                # 이벤트 루프가 이미 종료됨
+                pass
+
+        try:
+            future = self._executor.submit(func, *args)
+        except RuntimeError:
+            # 스레드 풀 종료 후 호출
+            self._slots.release()
+            raise
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def _call(self, func, *args, timeout: float = None):
+        """스레드 풀에서 실행 (자리 대기 시간을 포함해 timeout초 제한)"""
+        return await asyncio.wait_for(self._submit(func, *args), timeout=timeout or self.timeout)
+
+    async def _call_after_slot(self, func, *args, timeout: float = None):
+        """자리가 날 때까지 기다린 뒤 실행 (실행 시간만 timeout초 제한, 묶음이 대기열에서 시간 초과되지 않도록)"""
+        await self._slots.acquire()
+        return await asyncio.wait_for(self._run(func, *args), timeout=timeout or self.timeout)
+
+    async def get_quote(self, ticker: str) -> Optional[dict]:
+        """종목 시세 (실패하거나 제한 시간을 넘기면 None)"""
+        self._stats['requests'] += 1
+        try:
+            data = await self._call(self.provider.fetch_quote, ticker)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            logger.warning(f'주식 데이터 조회 시간 초과 ({ticker}, {self.timeout}초)')
+            return None
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f'주식 데이터 가져오기 오류 ({ticker}): {e}')
+            return None
+
+        self._stats['ok' if data else 'empty'] += 1
+        return data
+
+    async def get_quotes(self, tickers) -> dict:
+        """여러 종목 동시 조회 (ticker -> 시세, 실패한 종목은 None으로 나머지 결과는 그대로 반환)"""
+        unique = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(*(self.get_quote(ticker) for ticker in unique))
+        return dict(zip(unique, results))
+
+    async def get_quotes_batch(self, tickers) -> dict:
+        """여러 종목을 batch_size개씩 묶어 일괄 조회 (묶음은 스레드 풀 크기만큼 동시에 실행)"""
+        unique = list(dict.fromkeys(tickers))
+        chunks = [unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)]
+        results = {}
+        for quotes in await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks)):
+            results.update(quotes)
+        return results
+
+    async def _fetch_chunk(self, chunk: list) -> dict:
+        """한 묶음 일괄 조회 (실패하거나 제한 시간을 넘기면 이 묶음만 종목별 동시 조회로 대체)"""
+        self._stats['batches'] += 1
+        self._stats['batch_tickers'] += len(chunk)
+        try:
+            quotes = await self._call_after_slot(self.provider.fetch_quotes, chunk, timeout=self.batch_timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            logger.warning(f'주식 데이터 일괄 조회 시간 초과 ({len(chunk)}개 종목), 종목별로 다시 조회합니다')
+            return await self.get_quotes(chunk)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f'주식 데이터 일괄 조회 오류 ({len(chunk)}개 종목): {e}, 종목별로 다시 조회합니다')
+            return await self.get_quotes(chunk)
+
+        for data in quotes.values():
+            self._stats['ok' if data else 'empty'] += 1
+        return quotes
+
+    async def get_info(self, ticker: str) -> dict:
+        """종목 정보 (실패하거나 제한 시간을 넘기면 예외)"""
+        return await self._call(self.provider.fetch_info, ticker)
+
+    def close(self):
+        """대기 중인 호출 취소 후 스레드 풀 종료 (실행 중인 호출은 기다리지 않음)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(f'시세 조회 통계: {self.get_stats()}')
@@ -0,0 +1,242 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, height: int):
+        self.key = key
+        self.next = [None] * height
+        self.width = [1] * height
+
+class IndexableSkipList:
+    """순위(인덱스) 조회가 가능한 스킵 리스트 (삽입/삭제/순위/k번째 모두 O(log n))"""
+
+    MAX_HEIGHT = 32
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_HEIGHT)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_height(self) -> int:
+        height = 1
+        while height < self.MAX_HEIGHT and random.random() < 0.5:
+            height += 1
+        return height
+
+    def insert(self, key):
+        """키 삽입"""
+        chain = [None] * self.MAX_HEIGHT
+        steps = [0] * self.MAX_HEIGHT
+        node = self._head
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = self._random_height()
+        new_node = _Node(key, height)
+        steps_to_here = 0
+        for level in range(height):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps_to_here
+            prev.width[level] = steps_to_here + 1
+            steps_to_here += steps[level]
+        for level in range(height, self.MAX_HEIGHT):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        """키 삭제 (없으면 KeyError)"""
+        chain = [None] * self.MAX_HEIGHT
+        node = self._head
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.MAX_HEIGHT):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def count_less(self, key) -> int:
+        """key보다 작은 키의 개수"""
+        count = 0
+        node = self._head
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.next[level].key < key:
+                count += node.width[level]
+                node = node.next[level]
+        return count
+
+    def slice(self, offset: int, limit: int) -> list:
+        """offset번째부터 limit개의 키"""
+        if offset < 0 or offset >= self._size:
+            return []
+
+        # offset번째 노드까지 폭을 이용해 건너뛰기
+        node = self._head
+        remaining = offset + 1
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+
+        keys = []
+        while node is not None and len(keys) < limit:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class GuildRankIndex:
+    """서버 하나의 XP 순위 구조 (키: (-xp, user_id))"""
+
+    __slots__ = ('_ranks', '_xp')
+
+    def __init__(self, rows):
+        self._ranks = IndexableSkipList()
+        self._xp = {}
+        for user_id, xp in rows:
+            self.update(user_id, xp)
+
+    def __len__(self) -> int:
+        return len(self._xp)
+
+    def update(self, user_id: int, xp: int):
+        """사용자 XP 갱신"""
+        old_xp = self._xp.get(user_id)
+        if old_xp == xp:
+            return
+        if old_xp is not None:
+            self._ranks.remove((-old_xp, user_id))
+        self._ranks.insert((-xp, user_id))
+        self._xp[user_id] = xp
+
+    def rank(self, user_id: int):
+        """순위 (XP가 더 높은 사용자 수 + 1, 동점은 같은 순위)"""
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return None
+        return self._ranks.count_less((-xp, float('-inf'))) + 1
+
+    def page(self, offset: int, limit: int) -> list:
+        """XP 내림차순 offset번째부터 limit명의 (user_id, xp)"""
+        return [(user_id, -neg_xp) for neg_xp, user_id in self._ranks.slice(offset, limit)]
+
+class RankIndex:
+    """서버별 순위 구조를 지연 적재하고 전체 항목 수를 LRU로 제한하는 메모리 순위 인덱스"""
+
+    def __init__(self, loader, max_entries: int = 200000, oversized_ttl: float = 600.0):
+        # loader: async (guild_id, limit) -> [(user_id, xp), ...] (limit명을 넘으면 limit + 1명까지만 반환해도 됨)
+        self._loader = loader
+        self.max_entries = max_entries
+        # 용량을 넘는 서버는 oversized_ttl초 동안 다시 적재하지 않고 바로 SQL로 계산
+        self.oversized_ttl = oversized_ttl
+        self._guilds = OrderedDict()
+        self._loading = {}
+        # guild_id -> 다시 적재를 시도할 시각
+        self._oversized = {}
+        self._entries = 0
+        self._stats = {'loads': 0, 'evictions': 0, 'oversized': 0}
+
+    def get_stats(self) -> dict:
+        """인덱스 사용 통계"""
+        stats = dict(self._stats)
+        stats['guilds'] = len(self._guilds)
+        stats['entries'] = self._entries
+        stats['oversized_guilds'] = len(self._oversized)
+        return stats
+
+    async def _get(self, guild_id: int):
+        """서버 순위 구조 가져오기 (없으면 적재, 용량 초과 서버는 None)"""
+        index = self._guilds.get(guild_id)
+        if index is not None:
+            self._guilds.move_to_end(guild_id)
+            return index
+
+        retry_at = self._oversized.get(guild_id)
+        if retry_at is not None:
+            if time.monotonic() < retry_at:
+                return None
+            del self._oversized[guild_id]
+
+        # 같은 서버를 동시에 여러 번 적재하지 않도록 진행 중인 적재를 공유
+        task = self._loading.get(guild_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(guild_id))
+            self._loading[guild_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(guild_id, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, guild_id: int):
+        rows = await self._loader(guild_id, self.max_entries)
+        self._stats['loads'] += 1
+        if len(rows) > self.max_entries:
+            self._stats['oversized'] += 1
+            self._oversized[guild_id] = time.monotonic() + self.oversized_ttl
+            return None
+
+        index = GuildRankIndex(rows)
+        self._guilds[guild_id] = index
+        self._entries += len(index)
+        self._evict(keep=guild_id)
+        return index
+
+    def _evict(self, keep: int):
+        """항목 수가 상한을 넘으면 가장 오래 사용하지 않은 서버부터 제거"""
+        while self._entries > self.max_entries and len(self._guilds) > 1:
+            guild_id, index = next(iter(self._guilds.items()))
+            if guild_id == keep:
+                self._guilds.move_to_end(guild_id)
+                continue
+            del self._guilds[guild_id]
+            self._entries -= len(index)
+            self._stats['evictions'] += 1
+
+    def update(self, guild_id: int, user_id: int, xp: int):
+        """XP 변경 반영 (적재된 서버만, 적재 전 서버는 적재 시점의 값을 사용)"""
+        index = self._guilds.get(guild_id)
+        if index is None:
+            return
+        size = len(index)
+        index.update(user_id, xp)
+        if len(index) != size:
+            self._entries += 1
+            self._evict(keep=guild_id)
+
+    def discard(self, guild_id: int):
+        """서버 순위 구조 제거"""
+        index = self._guilds.pop(guild_id, None)
+        if index is not None:
+            self._entries -= len(index)
+
+    async def rank(self, guild_id: int, user_id: int):
+        """사용자 순위 (인덱스를 쓸 수 없으면 None)"""
+        index = await self._get(guild_id)
+        return index.rank(user_id) if index is not None else None
+
+    async def page(self, guild_id: int, offset: int, limit: int):
+        """순위표 한 페이지의 (user_id, xp) 목록 (인덱스를 쓸 수 없으면 None)"""
+        index = await self._get(guild_id)
+        return index.page(offset, limit) if index is not None else None
+
+    async def count(self, guild_id: int):
+        """순위에 포함된 사용자 수 (인덱스를 쓸 수 없으면 None)"""
+        index = await self._get(guild_id)
+        return len(index) if index is not None else None
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import discord
+
+logger = logging.getLogger(__name__)
+
+class ReactionRoleReconciler:
+    """봇이 꺼져 있던 동안 누락된 반응 이벤트를 반응 목록과 비교해 보정
+
+    반응한 멤버에게 없는 역할은 부여하고, 제거는 봇이 반응으로 부여했다고 기록된 멤버 중
+    반응이 사라진 멤버로만 한정 (/role, 자동 역할, 대량 역할, 역할 패널로 받은 역할은 건드리지 않음)
+    """
+
+    def __init__(self, db, role_queue, max_concurrency: int = 3, max_pending_edits: int = 10,
+                 remove_stale: bool = True):
+        self.db = db
+        self.role_queue = role_queue
+        # 모든 서버를 합쳐 동시에 확인하는 반응 역할 메시지 수
+        self._panel_slots = asyncio.Semaphore(max_concurrency)
+        # 모든 서버를 합쳐 동시에 대기하는 역할 변경 수
+        self._edit_slots = asyncio.Semaphore(max_pending_edits)
+        # False면 부여만 하고 기록된 부여도 회수하지 않음
+        self.remove_stale = remove_stale
+        self._stats = {}
+
+    def get_stats(self) -> dict:
+        """마지막 동기화 통계"""
+        return dict(self._stats)
+
+    async def run(self, guilds):
+        """전체 서버 동기화 (서버끼리는 동시에, 메시지 확인은 전역 상한 안에서)"""
+        self._stats = {'panels': 0, 'skipped': 0, 'added': 0, 'removed': 0, 'failed': 0}
+        guilds = [guild for guild in guilds if self.db.reaction_roles.get_panels(guild.id)]
+        if not guilds:
+            return
+
+        await asyncio.gather(*(self._reconcile_guild(guild) for guild in guilds))
+        logger.info(f'반응 역할 동기화 완료 ({len(guilds)}개 서버): {self._stats}')
+
+    async def _reconcile_guild(self, guild: discord.Guild):
+        # 같은 역할이 여러 메시지/이모지에 연결될 수 있으므로 역할 단위로 모아서 비교
+        sources = {}
+        for message_id in self.db.reaction_roles.get_panels(guild.id):
+            for emoji, role_id in self.db.reaction_roles.get_message_roles(message_id):
+                sources.setdefault(role_id, []).append((message_id, emoji))
+
+        # 진행 중인 역할 변경 작업 (끝나면 스스로 빠짐)
+        edits = set()
+        try:
+            for role_id, role_sources in sources.items():
+                role = guild.get_role(role_id)
+                if role is None or role.position >= guild.me.top_role.position:
+                    self._stats['skipped'] += len(role_sources)
+                    continue
+                await self._reconcile_role(guild, role, role_sources, edits)
+        except Exception as e:
+            logger.error(f'반응 역할 동기화 오류 ({guild.name}): {e}')
+        finally:
+            if edits:
+                await asyncio.gather(*list(edits), return_exceptions=True)
+
+    async def _reconcile_role(self, guild: discord.Guild, role: discord.Role, sources: list, edits: set):
+        # 반응한 멤버 ID만 기록 (사용자 객체는 페이지 단위로 흘려보내고 보관하지 않음)
+        reacted = set()
+        complete = True
+
+        for message_id, emoji in sources:
+            async with self._panel_slots:
+                found, reaction = await self._fetch_reaction(guild, message_id, emoji)
+                if not found:
+                    complete = False
+                    continue
+
+                self._stats['panels'] += 1
+                if reaction is None:
+                    continue
+                # users()는 100명 단위로 페이지를 나눠 가져오므로 전체 목록을 한 번에 들고 있지 않음
+                async for user in reaction.users(limit=None):
+                    if user.bot:
+                        continue
+                    member = guild.get_member(user.id)
+                    if member is None:
+                        continue
+                    reacted.add(member.id)
+                    if member.get_role(role.id) is None:
+                        await self._queue_edit(edits, member, role, add=True)
+
+        # 반응 목록을 모두 확인한 경우에만, 반응으로 부여한 기록이 있고 반응이 사라진 멤버의 역할 제거
+        if not complete or not self.remove_stale:
+            return
+        stale = await self.db.get_reaction_role_grants(guild.id, role.id) - reacted
+        if not stale:
+            return
+        for user_id in stale:
+            member = guild.get_member(user_id)
+            if member is not None and member.get_role(role.id) is not None:
+                await self._queue_edit(edits, member, role, add=False)
+        await self.db.remove_reaction_role_grants(guild.id, role.id, stale)
+
+    async def _fetch_reaction(self, guild: discord.Guild, message_id: int, emoji: str):
+        """(메시지 확인 여부, 해당 이모지 반응 또는 반응이 없으면 None)"""
+        channel_id = self.db.reaction_roles.get_channel(message_id)
+        channel = guild.get_channel_or_thread(channel_id) if channel_id else None
+        if channel is None:
+            self._stats['skipped'] += 1
+            logger.debug(f'반응 역할 동기화 건너뜀: 메시지 {message_id}의 채널을 알 수 없습니다')
+            return False, None
+
+        try:
+            message = await channel.fetch_message(message_id)
+        except discord.HTTPException as e:
+            self._stats['skipped'] += 1
+            logger.warning(f'반응 역할 동기화 건너뜀: 메시지 {message_id}를 가져올 수 없습니다 ({e})')
+            return False, None
+
+        for reaction in message.reactions:
+            if str(reaction.emoji) == emoji:
+                return True, reaction
+        return True, None
+
+    async def _queue_edit(self, edits: set, member: discord.Member, role: discord.Role, add: bool):
+        """역할 변경 큐에 등록 (대기 중인 변경 수가 상한에 닿으면 자리가 날 때까지 대기)"""
+        await self._edit_slots.acquire()
+        task = asyncio.create_task(self._apply(member, role, add))
+        edits.add(task)
+        task.add_done_callback(edits.discard)
+
+    async def _apply(self, member: discord.Member, role: discord.Role, add: bool):
+        try:
+            if add:
+                changed = await self.role_queue.add(member, role, reason="반응 역할 동기화")
+            else:
+                changed = await self.role_queue.remove(member, role, reason="반응 역할 동기화")
+            if changed:
+                self._stats['added' if add else 'removed'] += 1
+                if add:
+                    await self.db.add_reaction_role_grant(member.guild.id, role.id, member.id)
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.warning(f'반응 역할 동기화 실패 ({member}, {role.name}): {e}')
+        finally:
+            self._edit_slots.release()
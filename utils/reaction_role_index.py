@@ -0,0 +1,76 @@
+class ReactionRoleIndex:
+    """반응 역할 메모리 인덱스 (시작 시 전체 적재, DB 변경 시 함께 갱신)"""
+
+    def __init__(self):
+        # message_id -> {emoji: role_id}
+        self._roles = {}
+        # guild_id -> 반응 역할이 설정된 message_id 집합
+        self._panels = {}
+        # message_id -> guild_id
+        self._message_guild = {}
+        # message_id -> channel_id (기록된 메시지만)
+        self._message_channel = {}
+
+    def __len__(self) -> int:
+        return sum(len(emojis) for emojis in self._roles.values())
+
+    def load(self, rows):
+        """(guild_id, message_id, emoji, role_id) 목록으로 전체 다시 적재"""
+        self._roles.clear()
+        self._panels.clear()
+        self._message_guild.clear()
+        self._message_channel.clear()
+        for guild_id, message_id, emoji, role_id in rows:
+            self.add(guild_id, message_id, emoji, role_id)
+
+    def add(self, guild_id: int, message_id: int, emoji: str, role_id: int):
+        self._roles.setdefault(message_id, {})[emoji] = role_id
+        self._panels.setdefault(guild_id, set()).add(message_id)
+        self._message_guild[message_id] = guild_id
+
+    def set_channel(self, message_id: int, channel_id: int):
+        if message_id in self._roles:
+            self._message_channel[message_id] = channel_id
+
+    def get_channel(self, message_id: int):
+        """메시지가 있는 채널 ID (기록되지 않았으면 None)"""
+        return self._message_channel.get(message_id)
+
+    def remove(self, message_id: int, emoji: str):
+        emojis = self._roles.get(message_id)
+        if not emojis:
+            return
+        emojis.pop(emoji, None)
+        if not emojis:
+            self.remove_message(message_id)
+
+    def remove_message(self, message_id: int):
+        """메시지의 반응 역할 전체 제거"""
+        self._roles.pop(message_id, None)
+        self._message_channel.pop(message_id, None)
+        guild_id = self._message_guild.pop(message_id, None)
+        panels = self._panels.get(guild_id)
+        if panels is not None:
+            panels.discard(message_id)
+            if not panels:
+                del self._panels[guild_id]
+
+    def is_panel(self, guild_id: int, message_id: int) -> bool:
+        """반응 역할이 설정된 메시지인지 여부"""
+        panels = self._panels.get(guild_id)
+        return panels is not None and message_id in panels
+
+    def get(self, message_id: int, emoji: str):
+        """반응 역할 ID (없으면 None)"""
+        emojis = self._roles.get(message_id)
+        return emojis.get(emoji) if emojis else None
+
+    def get_message_roles(self, message_id: int) -> list:
+        """메시지의 (emoji, role_id) 목록"""
+        return list(self._roles.get(message_id, {}).items())
+
+    def get_panels(self, guild_id: int = None) -> list:
+        """반응 역할 메시지 ID 목록 (guild_id가 없으면 전체 (guild_id, message_id))"""
+        if guild_id is not None:
+            return list(self._panels.get(guild_id, ()))
+        return [(guild_id, message_id) for message_id, guild_id in self._message_guild.items()]
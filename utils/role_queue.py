@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import discord
+
+logger = logging.getLogger(__name__)
+
+class _PendingEdit:
+    __slots__ = ('member', 'changes', 'reasons', 'waiters', 'task', 'requests')
+
+    def __init__(self, member: discord.Member):
+        self.member = member
+        # role_id -> (역할, 부여 여부), 같은 역할에 대한 마지막 요청이 우선
+        self.changes = {}
+        self.reasons = []
+        self.waiters = []
+        self.task = None
+        self.requests = 0
+
+class RoleMutationQueue:
+    """멤버별 역할 추가/제거 요청을 짧은 구간 동안 모아 한 번의 멤버 수정으로 처리"""
+
+    def __init__(self, window: float = 1.0, max_retries: int = 3, backoff: float = 2.0):
+        self.window = window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._pending = {}
+        # 서버별 재시도 대기 종료 시각 (rate limit 또는 서버 오류 이후)
+        self._guild_backoff = {}
+        self._stats = {'requests': 0, 'edits': 0, 'noops': 0, 'retries': 0, 'failures': 0}
+
+    def get_stats(self) -> dict:
+        """요청 병합 통계 (merged: 다른 요청과 한 묶음으로 합쳐진 요청 수, 변경할 것이 없던 묶음은 noops)"""
+        stats = dict(self._stats)
+        stats['merged'] = stats['requests'] - stats['edits'] - stats['noops']
+        stats['pending_members'] = len(self._pending)
+        return stats
+
+    def _submit(self, member: discord.Member, add=(), remove=(), reason: str = None, waiter=None):
+        key = (member.guild.id, member.id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingEdit(member)
+            pending.task = asyncio.create_task(self._run(key, pending))
+
+        pending.member = member
+        for role in add:
+            pending.changes[role.id] = (role, True)
+        for role in remove:
+            pending.changes[role.id] = (role, False)
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+        if waiter is not None:
+            pending.waiters.append(waiter)
+        pending.requests += 1
+        self._stats['requests'] += 1
+
+    def queue_add(self, member: discord.Member, role: discord.Role, reason: str = None):
+        """역할 부여 예약 (결과를 기다리지 않음)"""
+        self._submit(member, add=(role,), reason=reason)
+
+    def queue_remove(self, member: discord.Member, role: discord.Role, reason: str = None):
+        """역할 제거 예약 (결과를 기다리지 않음)"""
+        self._submit(member, remove=(role,), reason=reason)
+
+    async def edit(self, member: discord.Member, add=(), remove=(), reason: str = None) -> bool:
+        """역할 변경 요청 후 처리 완료까지 대기 (실제로 변경되었으면 True, 실패 시 예외 전달)"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._submit(member, add=add, remove=remove, reason=reason, waiter=waiter)
+        return await waiter
+
+    async def add(self, member: discord.Member, role: discord.Role, reason: str = None) -> bool:
+        return await self.edit(member, add=(role,), reason=reason)
+
+    async def remove(self, member: discord.Member, role: discord.Role, reason: str = None) -> bool:
+        return await self.edit(member, remove=(role,), reason=reason)
+
+    async def _run(self, key, pending: _PendingEdit, delay: bool = True):
+        if delay:
+            await asyncio.sleep(self.window)
+        # 대기 중 들어온 요청까지 포함해 이 시점부터는 새 요청을 다음 묶음으로 분리
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+
+        try:
+            changed = await self._apply(pending)
+        except Exception as e:
+            self._stats['failures'] += 1
+            logger.error(f'역할 변경 실패 ({pending.member}): {e}')
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+
+        for waiter in pending.waiters:
+            if not waiter.done():
+                waiter.set_result(changed)
+
+    async def _apply(self, pending: _PendingEdit) -> bool:
+        member = pending.member.guild.get_member(pending.member.id) or pending.member
+        current = {role.id for role in member.roles}
+
+        to_add = [role for role, wanted in pending.changes.values() if wanted and role.id not in current]
+        to_remove = [role for role, wanted in pending.changes.values() if not wanted and role.id in current]
+
+        if not to_add and not to_remove:
+            self._stats['noops'] += 1
+            return False
+
+        reason = ', '.join(pending.reasons) or None
+        self._stats['edits'] += 1
+        attempt = 0
+        while True:
+            await self._wait_backoff(member.guild.id)
+            try:
+                if len(to_add) + len(to_remove) == 1:
+                    # 역할 하나만 바뀌면 단일 역할 API 사용 (다른 봇의 동시 변경과 충돌하지 않음)
+                    if to_add:
+                        await member.add_roles(*to_add, reason=reason)
+                    else:
+                        await member.remove_roles(*to_remove, reason=reason)
+                else:
+                    remove_ids = {role.id for role in to_remove}
+                    roles = [role for role in member.roles if not role.is_default() and role.id not in remove_ids]
+                    await member.edit(roles=roles + to_add, reason=reason)
+                return True
+            except discord.HTTPException as e:
+                if isinstance(e, (discord.Forbidden, discord.NotFound)) or attempt >= self.max_retries:
+                    raise
+                if e.status != 429 and e.status < 500:
+                    raise
+                attempt += 1
+                self._stats['retries'] += 1
+                delay = self.backoff * (2 ** (attempt - 1))
+                self._guild_backoff[member.guild.id] = asyncio.get_running_loop().time() + delay
+                logger.warning(f'역할 변경 재시도 {attempt}/{self.max_retries} ({member}): {e.status}, {delay:.1f}초 대기')
+
+    async def _wait_backoff(self, guild_id: int):
+        until = self._guild_backoff.get(guild_id)
+        if until is None:
+            return
+        remaining = until - asyncio.get_running_loop().time()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        else:
+            self._guild_backoff.pop(guild_id, None)
+
+    async def close(self):
+        """대기 중인 변경을 즉시 처리"""
+        pending_items = list(self._pending.items())
+        for key, pending in pending_items:
+            pending.task.cancel()
+        await asyncio.gather(
+            *(self._run(key, pending, delay=False) for key, pending in pending_items),
+            return_exceptions=True
+        )
+        logger.info(f'역할 변경 큐 종료 (통계: {self.get_stats()})')
@@ -0,0 +1,78 @@
+import logging
+from string import Formatter
+import discord
+from utils.config import WelcomeSettings
+
+logger = logging.getLogger(__name__)
+
+# 환영 메시지 내용에서 사용할 수 있는 항목
+TEMPLATE_FIELDS = ('mention', 'name', 'server', 'member_count')
+
+class CompiledWelcome:
+    """미리 만들어 둔 환영 임베드 (멤버별 항목만 채워서 복사본 생성)"""
+    __slots__ = ('settings', 'prototype', 'parts')
+
+    def __init__(self, settings: WelcomeSettings):
+        self.settings = settings
+        self.prototype = discord.Embed(title=settings.title, color=discord.Color(settings.color))
+        self.prototype.set_footer(text=settings.footer)
+        self.parts = compile_template(settings.description)
+
+    def render(self, member: discord.abc.User, guild: discord.Guild) -> discord.Embed:
+        values = {
+            'mention': member.mention,
+            'name': member.name,
+            'server': guild.name,
+            'member_count': guild.member_count,
+        }
+
+        embed = self.prototype.copy()
+        embed.description = ''.join(
+            literal if field is None else format(values[field], spec)
+            for literal, field, spec in self.parts
+        )
+        if self.settings.show_avatar:
+            embed.set_thumbnail(url=member.display_avatar.url)
+        if self.settings.show_member_count:
+            embed.add_field(name="서버 정보", value=f"현재 멤버 수: {guild.member_count}명", inline=False)
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+
+def compile_template(template: str) -> list:
+    """str.format 템플릿을 (문자열, 항목 이름 또는 None, 형식) 목록으로 미리 분해"""
+    parts = []
+    try:
+        for literal, field, spec, _ in Formatter().parse(template):
+            if literal:
+                parts.append((literal, None, ''))
+            if field is not None:
+                if field not in TEMPLATE_FIELDS:
+                    raise KeyError(field)
+                parts.append(('', field, spec or ''))
+    except (ValueError, KeyError) as e:
+        # 잘못된 템플릿은 매 참가마다 실패하지 않도록 원문 그대로 사용
+        logger.warning(f'환영 메시지 템플릿 오류 ({e}), 원문을 그대로 사용합니다: {template}')
+        return [(template, None, '')]
+    return parts
+
+class WelcomeRenderer:
+    """서버별 환영 임베드 캐시 (설정 스냅샷이 바뀌면 다시 컴파일)"""
+
+    def __init__(self, settings_store):
+        self.settings_store = settings_store
+        # guild_id -> CompiledWelcome
+        self._compiled = {}
+
+    async def get(self, guild_id: int) -> CompiledWelcome:
+        settings = await self.settings_store.welcome_settings(guild_id)
+        compiled = self._compiled.get(guild_id)
+        if compiled is None or compiled.settings is not settings:
+            compiled = self._compiled[guild_id] = CompiledWelcome(settings)
+        return compiled
+
+    def invalidate(self, guild_id: int = None):
+        """캐시 무효화 (guild_id가 없으면 전체)"""
+        if guild_id is None:
+            self._compiled.clear()
+        else:
+            self._compiled.pop(guild_id, None)
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+class XPAccumulator:
+    """(guild_id, user_id)별 XP/메시지 수 변경분을 모아 두는 쓰기 지연 버퍼"""
+
+    def __init__(self, max_pending: int = 500):
+        self.max_pending = max_pending
+        # (guild_id, user_id) -> [xp 증가분, 메시지 수 증가분, 현재 레벨, 마지막 메시지 시간]
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def is_full(self) -> bool:
+        """즉시 기록이 필요한 크기에 도달했는지 여부"""
+        return len(self._pending) >= self.max_pending
+
+    def add(self, guild_id: int, user_id: int, xp_amount: int, level: int, timestamp: datetime, messages: int = 1):
+        """변경분 병합"""
+        entry = self._pending.get((guild_id, user_id))
+        if entry is None:
+            self._pending[(guild_id, user_id)] = [xp_amount, messages, level, timestamp]
+        else:
+            entry[0] += xp_amount
+            entry[1] += messages
+            # 기록 실패로 되돌려진 이전 변경분이 더 최근 값을 덮어쓰지 않도록 최신 시각의 레벨만 반영
+            if timestamp >= entry[3]:
+                entry[2] = level
+                entry[3] = timestamp
+
+    def pending_xp(self, guild_id: int, user_id: int) -> int:
+        """아직 기록되지 않은 XP 증가분"""
+        entry = self._pending.get((guild_id, user_id))
+        return entry[0] if entry else 0
+
+    def pending_messages(self, guild_id: int, user_id: int) -> int:
+        """아직 기록되지 않은 메시지 수 증가분"""
+        entry = self._pending.get((guild_id, user_id))
+        return entry[1] if entry else 0
+
+    def drain(self) -> list:
+        """버퍼를 비우고 executemany용 행 목록 반환"""
+        pending, self._pending = self._pending, {}
+        return [
+            (guild_id, user_id, xp, level, messages, timestamp)
+            for (guild_id, user_id), (xp, messages, level, timestamp) in pending.items()
+        ]